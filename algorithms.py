@@ -1,177 +1,555 @@
-from collections import defaultdict
-import networkx as nx
+from collections import deque
 
-from utility import PriorityQueue, haversine
+import numpy as np
+
+from csr import as_csr
+from matrix import MatrixView, floyd_warshall_matrix, johnson_matrix, johnson_rows
+from instrumentation import SearchStats, tracer_of
+from results import SearchResult, search_arrays
+from utility import PriorityQueue, heuristic_vector
 
 INF = 99999
 
 """ Alle Methoden sind so angelegt, dass sie den Graphen und ggf. Start- und Endknoten annehmen.
 dijkstra, a_star und bellman_ford geben 2 Dictionaries zurück, die zu jeden Punkt den Vorgänger und den Abstand enthalten
-sowie die Anzahl der inneren Durchläufe. Es werden die Durchläufe gezählt und nicht die einzelnen Operationen. Daher der 
+sowie die Anzahl der inneren Durchläufe. Intern sind das kompakte Arrays mit einer schreibgeschützten Sicht (siehe results.py). Es werden die Durchläufe gezählt und nicht die einzelnen Operationen. Daher der 
 Unterschied zu der im Dokument angegebenen Komplexitätsangabe. Ignorierte Knoten werden nicht als Durchlauf gezählt. 
 
-Ich kann nur davor warnen, Floyd-Warshall auf andere Graphen als das Beispiel in Evaluation loszulassen!
+Alle Algorithmen nehmen sowohl networkx-Graphen als auch bereits kompilierte CSRGraphen (siehe csr.py) an.
+Parallele Kanten werden dabei auf die kürzeste reduziert.
+
+Floyd-Warshall bleibt Θ(V³), läuft dank numpy aber für Stadtgraphen mit einigen tausend Knoten in Sekunden bis Minuten.
+Für noch größere Graphen empfiehlt sich memmap_dir.
 
 floyd_warshall gibt 2 Matrizen zurück. Die erste enthält die Entfernung, die zweite den nächsten Knoten auf dem Weg zum Ziel. Für ein Beispiel siehe die Ausarbeitung, Punkt III.4.
+johnson liefert dieselben Matrizen, rechnet auf dünnen Straßengraphen aber je Start nur einen Dijkstra (parallel, siehe matrix.py).
 """
 
 
-def dijkstra(G, p):
+def dijkstra(G, p, dest=None, stats: SearchStats=None, cutoff: float=None):
     """Der Dijkstra-Algorithmus bestimmt den Abstand aller Punkte von einem Startpunkt aus.
     Rückgabe ist ein dictionary, das zu jedem Punkt den Abstand und den Vorgänger enthält.
+    Ist dest angegeben, bricht die Suche ab, sobald dest abgeschlossen ist (Punkt-zu-Punkt-Suche).
+    Mit cutoff (Budget in der Einheit der Kantengewichte, z.B. Meter) werden nur Knoten mit Abstand <= cutoff markiert;
+    Laufzeit und Speicher hängen dann nur vom erreichbaren Gebiet ab.
+    Wird stats übergeben, wird es mit einheitlichen Kennzahlen gefüllt, ein Tracer erhält 'label'/'settle'-Ereignisse (siehe instrumentation.py).
     
     Übernommen von Prof. Gawron und lediglich Benennung angepasst.
+    Läuft auf der CSR-Form von G (siehe csr.py), die Ergebnisse sind wieder nach den ursprünglichen Knoten benannt.
     """
+    C = as_csr(G)
+    targets = None if dest is None else {C.to_index(dest)}
+    result, count = _dijkstra(C, [C.to_index(p)], targets, cutoff, stats)
+    return result.dist_map(), result.pred_map(), count
 
-    dist = dict()
-    pred = dict()
-    
+def multi_source_dijkstra(G, sources, cutoff: float=None, stats: SearchStats=None):
+    """Dijkstra von mehreren Startknoten gleichzeitig: dist[v] ist der Abstand zum nächstgelegenen Start, pred führt
+    zurück zu diesem Start. cutoff wie bei dijkstra. Rückgabe wie bei dijkstra.
+    """
+    C = as_csr(G)
+    result, count = _dijkstra(C, [C.to_index(p) for p in sources], None, cutoff, stats)
+    return result.dist_map(), result.pred_map(), count
+
+def one_to_many_dijkstra(G, p, dests, stats: SearchStats=None):
+    """Dijkstra von p aus, der endet, sobald alle Ziele dests abgeschlossen sind (statt eines vollständigen Baums).
+    Rückgabe ist das SearchResult der Suche (distance(node) und path(node) je Ziel, inf bzw. [] falls unerreichbar) und count.
+    """
+    C = as_csr(G)
+    return _dijkstra(C, [C.to_index(p)], {C.to_index(d) for d in dests}, None, stats)
+
+def _dijkstra(C, sources, targets, cutoff, stats):
+    """Gemeinsame Schleife der Dijkstra-Varianten auf Index-Ebene (targets: Menge der Ziel-Indizes oder None für alle).
+    Markiert wird in den wiederverwendeten Feldern aus results.search_arrays; zurückgegeben werden das SearchResult und count.
+    """
+    off, tgt, wgt = C.adjacency()
+    limit = float('inf') if cutoff is None else cutoff
+    unlabelled = float('inf')
+
+    with search_arrays(C) as arrays:
+        dist, pred, touched = arrays.dist, arrays.pred, arrays.touched
+        pq = PriorityQueue()
+
+        # Initialisierung: Die Startpunkte haben Abstand 0 und keinen Vorgänger
+        for s in sources:
+            if dist[s] == unlabelled:
+                touched.append(s)
+            pq.push(s, 0)
+            dist[s] = 0
+            pred[s] = -1
+
+        count = 1
+        relaxations = 0
+        trace = tracer_of(stats)
+        ids = C.ids() if trace is not None else None
+        # Wähle den Punkt mit dem kleinsten Abstand und aktualisiere von ihm aus die Abstände
+        while len(pq) > 0:
+            u = pq.pop()
+            du = dist[u]
+            if trace is not None:
+                trace('settle', ids[u], du)
+            if targets is not None and u in targets:
+                targets.discard(u)
+                if not targets:
+                    break # alle Ziele abgeschlossen, ihre Abstände ändern sich nicht mehr
+            relaxations += off[u + 1] - off[u]
+            for e in range(off[u], off[u + 1]):
+                count += 1
+                v = tgt[e]
+                dv = du + wgt[e]
+                if dv > limit:
+                    continue # außerhalb des Budgets, wird gar nicht erst markiert
+
+                if dv < dist[v]:
+                    count += 1
+                    # Kürzeren Weg nach v gefunden
+                    if dist[v] == unlabelled:
+                        touched.append(v)
+                    dist[v] = dv
+                    pred[v] = u
+                    if trace is not None:
+                        trace('label', ids[v], dv)
+                    if pq.is_in(v): # decrease-key statt eines weiteren (veralteten) Eintrags
+                        pq.update(v, dv)
+                    else:
+                        pq.push(v, dv)
+
+        if stats is not None:
+            stats.record(touched, relaxations, pq)
+        return arrays.result(C), count
+
+def shortest_path_tree(G, p, reverse: bool=False):
+    """Vollständiger Dijkstra auf Index-Ebene: gibt Listen dist (inf für unerreichbar) und pred (-1 für keinen Vorgänger)
+    über alle Knoten-Indizes der CSR-Form zurück. Mit reverse=True wird auf dem umgedrehten Graphen gesucht, dist[v] ist dann
+    der Abstand von v nach p. p ist hier bereits ein Knoten-Index.
+    Gedacht für Vorberechnungen (z.B. Landmarken), bei denen ohnehin der ganze Graph besucht wird.
+    """
+    C = as_csr(G)
+    if reverse:
+        C = C.reverse()
+    off, tgt, wgt = C.adjacency()
+    dist = [float('inf')] * len(C)
+    pred = [-1] * len(C)
+    dist[p] = 0
     pq = PriorityQueue()
-    
-    # Initialisierung: Der Startpunkt hat Abstand 0 und keinen Vorgänger
     pq.push(p, 0)
-    dist[p] = 0
-    pred[p] = None
-    
-    count = 1
-    # Wähle den Punkt mit dem kleinsten Abstand und aktualisiere von ihm aus die Abstände
     while len(pq) > 0:
         u = pq.pop()
-        for v in nx.neighbors(G, u):
-            count += 1 
-            length = G[u][v][0]['length']
-            
-            if (v not in dist) or (dist[u] + length < dist[v]):
-                count += 1 
-                # Kürzeren Weg nach r gefunden
-                dist[v] = dist[u] + length
+        du = dist[u]
+        for e in range(off[u], off[u + 1]):
+            v = tgt[e]
+            if du + wgt[e] < dist[v]:
+                dist[v] = du + wgt[e]
                 pred[v] = u
                 pq.push(v, dist[v])
-    
-    return dist, pred, count
+    return dist, pred
 
-def a_star(G, start, dest):
+def a_star(G, start, dest, landmarks=None, heuristic: str='haversine', stats: SearchStats=None, cutoff: float=None):
     """Der A-Stern-Algorithmus versucht, den optimalen Weg zwischen start und dest zu ermitteln, indem er den Weg verfolgt, der *wahrscheinlich* zum Ziel führt.
+    Werden Landmarken (siehe landmarks.py) übergeben, ist die Heuristik max(Haversine, Landmarken-Schranke) (ALT).
+    heuristic wählt die Luftlinie: 'haversine' oder die günstigere Näherung 'equirect' (siehe utility.heuristic_vector).
+    Die Heuristik wird einmal je Anfrage für alle Knoten vektorisiert berechnet.
+    Mit cutoff (Meter) werden Knoten verworfen, deren Abstand plus Heuristik das Budget übersteigt; ist die Route länger
+    als cutoff, wird dest nicht erreicht (fehlt in dist).
     """
-    # initialize fields
-    openlist = PriorityQueue()
-    closedset = set()
-    dist = dict()
-    pred = dict()
-    
+    C = as_csr(G)
+    off, tgt, wgt = C.adjacency()
+
     # add root-node
-    openlist.push(start, 0)
-    dist[start] = 0
-    pred[start] = None
-    
-    count = 0
-    while len(openlist) >= 0: # while openlist is not empty
-        u = openlist.pop() # get node from openlist
-        if u == dest: 
-            return dist, pred, count # destination reached
-        
-        closedset.add(u) 
-
-        for v in nx.neighbors(G, u): # for each neighbour of u
-            if v in closedset: # v already found and checked
-                continue
-            # v has not been "found" yet
-            count += 1
+    s = C.to_index(start)
+    d = C.to_index(dest)
+    h = heuristic_vector(C, d, heuristic)
+    if landmarks is not None: # landmark lower bound where it is tighter
+        h = np.maximum(h, landmarks.bound_to(d))
+    h = h.tolist()
+    limit = float('inf') if cutoff is None else cutoff
+    unlabelled = float('inf')
 
-            length = G[u][v][0]['length']  # get length of edge[u][v]
-            tentative_g = dist[u] + length # get length from start to v
+    # initialize fields (wiederverwendete Felder je Knoten statt Dictionaries, siehe results.search_arrays)
+    with search_arrays(C) as arrays:
+        dist, pred, closedset, touched = arrays.dist, arrays.pred, arrays.closed, arrays.touched
+        openlist = PriorityQueue()
+        openlist.push(s, 0)
+        dist[s] = 0
+        pred[s] = -1
+        touched.append(s)
 
-            if v in dist and tentative_g >= dist[v]: # if has a distance and if this distance is smaller than the possible new distance - continue
-                continue
-            # else - v is not yet in dist[] or the possible new distance is smaller than the saved distance
-            pred[v] = u # (new) predecessor of v is u
-            dist[v] = tentative_g # (new) dist from start to v is tentative_g
+        count = 0
+        relaxations = 0
+        trace = tracer_of(stats)
+        ids = C.ids() if trace is not None else None
+        while len(openlist) > 0: # while openlist is not empty
+            u = openlist.pop() # get node from openlist
+            if trace is not None:
+                trace('settle', ids[u], dist[u])
+            if u == d:
+                break # destination reached
 
-            h = haversine(G.nodes[v]['y'], G.nodes[v]['x'], G.nodes[dest]['y'], G.nodes[dest]['x'])*1000 # get predicted distance
-            f = tentative_g + h # add predicted distance to existing distance
+            closedset[u] = 1
+            relaxations += off[u + 1] - off[u]
 
-            if openlist.is_in(v): # if v has already been discovered (= exists in the openlist) update its predicted distance
-                openlist.update(v, f)
-            else: # else add it with its predicted distance
-                openlist.push(v, f)
+            for e in range(off[u], off[u + 1]): # for each neighbour of u
+                v = tgt[e]
+                if closedset[v]: # v already found and checked
+                    continue
+                # v has not been "found" yet
+                count += 1
 
-    return dist, pred, count
+                tentative_g = dist[u] + wgt[e] # get length from start to v
+
+                if tentative_g >= dist[v]: # if has a distance and if this distance is smaller than the possible new distance - continue
+                    continue
+                f = tentative_g + h[v] # add predicted distance to existing distance
+                if f > limit:
+                    continue # every route via v exceeds the budget
+                # else - v is not yet labelled or the possible new distance is smaller than the saved distance
+                if dist[v] == unlabelled:
+                    touched.append(v)
+                pred[v] = u # (new) predecessor of v is u
+                dist[v] = tentative_g # (new) dist from start to v is tentative_g
+
+                if trace is not None:
+                    trace('label', ids[v], tentative_g)
+
+                if openlist.is_in(v): # if v has already been discovered (= exists in the openlist) update its predicted distance
+                    openlist.update(v, f)
+                else: # else add it with its predicted distance
+                    openlist.push(v, f)
+
+        if stats is not None:
+            stats.record(touched, relaxations, openlist)
+        result = arrays.result(C)
+    return result.dist_map(), result.pred_map(), count
+
+def bidirectional_dijkstra(G, start, dest, stats: SearchStats=None):
+    """Bidirektionaler Dijkstra: sucht gleichzeitig vorwärts von start und rückwärts (auf dem umgedrehten Graphen) von dest aus.
+    Die Suche endet, sobald die Summe der kleinsten Schlüssel beider Warteschlangen den besten gefundenen Weg nicht mehr unterbieten kann.
+
+    dist enthält die Vorwärts-Abstände sowie die exakten Abstände aller Knoten auf der Route, pred die Route bis dest.
+    """
+    return _bidirectional(as_csr(G), start, dest, None, stats)
 
-def bellman_ford(G, start):
+def bidirectional_a_star(G, start, dest, stats: SearchStats=None):
+    """Bidirektionaler A-Stern mit dem durchschnittlichen Potential p(v) = (h_dest(v) - h_start(v)) / 2 (Haversine).
+    Beide Richtungen verwenden so dieselben reduzierten Kantengewichte, wodurch das Abbruchkriterium des bidirektionalen Dijkstra gültig bleibt.
+    """
+    C = as_csr(G)
+    to_dest = heuristic_vector(C, C.to_index(dest))
+    from_start = heuristic_vector(C, C.to_index(start))
+    potentials = ((to_dest - from_start) / 2).tolist()
+    return _bidirectional(C, start, dest, potentials.__getitem__, stats)
+
+def _bidirectional(C, start, dest, potential, stats=None):
+    """Gemeinsamer Kern von bidirectional_dijkstra und bidirectional_a_star. potential ist None oder eine Funktion p(v),
+    die Vorwärtsschlüssel sind d_f(v) + p(v), die Rückwärtsschlüssel d_b(v) - p(v).
+    """
+    s = C.to_index(start)
+    t = C.to_index(dest)
+    graphs = (C.adjacency(), C.reverse().adjacency())
+    queues = (PriorityQueue(), PriorityQueue())
+    signs = (1, -1)
+    unlabelled = float('inf')
+
+    # Vorwärts- und Rückwärtssuche markieren in eigenen Feldern je Knoten (siehe results.search_arrays)
+    with search_arrays(C) as forward, search_arrays(C.reverse()) as backward:
+        sides = (forward, backward)
+        for side, root in ((0, s), (1, t)):
+            sides[side].dist[root] = 0
+            sides[side].pred[root] = -1
+            sides[side].touched.append(root)
+            queues[side].push(root, 0 if potential is None else signs[side] * potential(root))
+
+        best = 0 if s == t else float('inf')
+        meet = s if s == t else -1
+        count = 0
+        trace = tracer_of(stats)
+        ids = C.ids() if trace is not None else None
+        while len(queues[0]) > 0 and len(queues[1]) > 0:
+            top = queues[0].priority(queues[0].peek()) + queues[1].priority(queues[1].peek())
+            if top >= best:
+                break
+            # die Seite mit der kleineren Warteschlange expandieren
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            off, tgt, wgt = graphs[side]
+            dist, pred, touched, pq = sides[side].dist, sides[side].pred, sides[side].touched, queues[side]
+            other = sides[1 - side].dist
+
+            u = pq.pop()
+            du = dist[u]
+            if trace is not None:
+                trace('settle', ids[u], du)
+            count += off[u + 1] - off[u]
+            for e in range(off[u], off[u + 1]):
+                v = tgt[e]
+                dv = du + wgt[e]
+                if dv < dist[v]:
+                    if dist[v] == unlabelled:
+                        touched.append(v)
+                    dist[v] = dv
+                    pred[v] = u
+                    if trace is not None:
+                        trace('label', ids[v], dv)
+                    pq.push(v, dv if potential is None else dv + signs[side] * potential(v))
+                if dist[v] + other[v] < best: # other[v] ist inf, solange die Gegenrichtung v nicht markiert hat
+                    best = dist[v] + other[v]
+                    meet = v
+
+        if stats is not None:
+            stats.record(set(forward.touched) | set(backward.touched), count, *queues)
+
+        # Vorwärts-Ergebnis um die zweite Hälfte der Route (meet -> dest) ergänzen
+        dist, pred = forward.dist, forward.pred
+        if meet != -1:
+            u = meet
+            while backward.pred[u] != -1:
+                v = backward.pred[u]
+                if dist[v] == unlabelled:
+                    forward.touched.append(v)
+                pred[v] = u
+                dist[v] = dist[u] + (backward.dist[u] - backward.dist[v])
+                u = v
+        result = forward.result(C)
+    return result.dist_map(), result.pred_map(), count
+
+class NegativeCycle(ValueError):
+    """Vom Start aus ist ein Kreis mit negativem Gesamtgewicht erreichbar; kürzeste Wege existieren dann nicht.
+    cycle enthält die Knoten des Kreises (ursprüngliche IDs, in Kantenrichtung), weight sein Gesamtgewicht.
+    """
+
+    def __init__(self, cycle, weight):
+        super().__init__(f"Negative weight cycle ({weight:g}): {' -> '.join(map(str, cycle + cycle[:1]))}")
+        self.cycle = cycle
+        self.weight = weight
+
+BELLMAN_FORD_MODES = ('queue', 'passes', 'numpy')
+
+def bellman_ford(G, start, mode: str='queue', stats: SearchStats=None):
     """Der Bellman-Ford-Algorithmus ermittelt zu jedem Punkt den kürzesten Weg, ähnlich dem Dijkstra-Algorithmus. 
     Allerdings kann der Bellman-Ford-Algorithmus auch mit negativen Kantengewichtungen umgehen.
+
+    mode wählt die Variante:
+    * queue:  SPFA, es werden nur die Kanten von Knoten betrachtet, deren Abstand sich geändert hat (Standard)
+    * passes: klassische Durchläufe über alle Kanten, Abbruch sobald ein Durchlauf nichts mehr ändert
+    * numpy:  ganze Durchläufe vektorisiert über die Kanten-Arrays (lohnt sich bei vielen Durchläufen auf großen Graphen)
+    Ist vom Start aus ein negativer Kreis erreichbar, wird NegativeCycle mit dem Kreis ausgelöst.
+    Wie bei den anderen Algorithmen enthält dist nur die erreichten Knoten (siehe results.py).
     """
-    # initialize fields
-    dist = dict()
-    pred = dict()
-    for node in G:
-        dist[node] = INF
-        pred[node] = None
-    # set start = 0
-    dist[start] = 0
-    pred[start] = None
+    C = as_csr(G)
+    s = C.to_index(start)
+    if mode == 'queue':
+        dist, pred, count = _bellman_ford_queue(C, s)
+    elif mode == 'passes':
+        dist, pred, count = _bellman_ford_passes(C, s)
+    elif mode == 'numpy':
+        dist, pred, count = _bellman_ford_numpy(C, s)
+    else:
+        raise ValueError(f"Unbekannter Modus: {mode}")
+
+    result = SearchResult(C, dist, pred)
+    if stats is not None:
+        stats.record(result.reached(), count)
+    return result.dist_map(), result.pred_map(), count
+
+def _bellman_ford_passes(C, s):
+    off, tgt, wgt = C.adjacency()
+    n = len(C)
+    dist = [float('inf')] * n
+    pred = [-1] * n
+    dist[s] = 0
+
+    count = 0
+    for i in range(n): # höchstens |V| - 1 Durchläufe ändern etwas, der |V|-te nur bei negativen Kreisen
+        changed = False
+        for u in range(n):
+            du = dist[u]
+            if du == float('inf'):
+                continue # von unerreichten Knoten aus kann nicht relaxiert werden
+            for e in range(off[u], off[u + 1]):
+                count += 1
+                v = tgt[e]
+                # RELAX
+                if du + wgt[e] < dist[v]:
+                    dist[v] = du + wgt[e]
+                    pred[v] = u
+                    changed = True
+        if not changed:
+            return dist, pred, count
+    _raise_negative_cycle(C, dist, pred)
+
+def _bellman_ford_queue(C, s):
+    off, tgt, wgt = C.adjacency()
+    n = len(C)
+    dist = [float('inf')] * n
+    pred = [-1] * n
+    edges = [0] * n # Kantenzahl des aktuellen Weges; erreicht sie |V|, enthält er einen Kreis
+    queued = [False] * n
+    dist[s] = 0
+    queue = deque([s])
+    queued[s] = True
 
     count = 0
-    for i in range(len(G.nodes)): # for the amount of nodes in G
-        for edge in G.edges: # visit all edges
+    while queue:
+        u = queue.popleft()
+        queued[u] = False
+        du = dist[u]
+        for e in range(off[u], off[u + 1]):
             count += 1
-            u = edge[0]
-            v = edge[1]
-            length = G[u][v][0]['length']
-            # RELAX
-            if dist[v] > dist[u] + length:
-                dist[v] = dist[u] + length
+            v = tgt[e]
+            if du + wgt[e] < dist[v]:
+                dist[v] = du + wgt[e]
                 pred[v] = u
+                edges[v] = edges[u] + 1
+                if edges[v] >= n:
+                    _raise_negative_cycle(C, dist, pred)
+                if not queued[v]:
+                    queued[v] = True
+                    queue.append(v)
+    return dist, pred, count
 
-    # check for negative weight cycles
-    for node in G:
-        for v in nx.neighbors(G, u):
-            assert dist[v] <= dist[u] + G[u][v][0]['length'], "Negative weight cycle."
+def _bellman_ford_numpy(C, s):
+    n = len(C)
+    sources, targets, weights = C.edges()
+    # Kanten einmalig nach Ziel sortieren, damit je Durchlauf das Minimum je Ziel per reduceat bestimmt werden kann
+    order = np.argsort(targets, kind='stable')
+    sources, targets, weights = sources[order], targets[order], weights[order]
+    heads, starts = np.unique(targets, return_index=True)
+    dist = np.full(n, np.inf)
+    pred = np.full(n, -1, dtype=np.int64)
+    dist[s] = 0
 
-    # if none are found the result is valid
-    return dist, pred, count
+    count = 0
+    for i in range(n):
+        candidates = dist[sources] + weights
+        count += len(candidates)
+        if len(candidates) == 0:
+            break
+        best = np.minimum.reduceat(candidates, starts)
+        improved = best < dist[heads]
+        if not improved.any():
+            break
+        # je verbessertem Ziel die erste Kante, die das Minimum erreicht
+        hit = candidates == np.repeat(best, np.diff(np.append(starts, len(candidates))))
+        hit &= np.repeat(improved, np.diff(np.append(starts, len(candidates))))
+        first = np.nonzero(hit)[0]
+        first = first[np.unique(targets[first], return_index=True)[1]]
+        dist[targets[first]] = candidates[first]
+        pred[targets[first]] = sources[first]
+    else:
+        _raise_negative_cycle(C, dist.tolist(), pred.tolist())
+    return dist.tolist(), pred.tolist(), count
 
-def floyd_warshall(G):
-    """Der Floyd-Warshall-Algorithmus findet die kürzesten Pfade zwischen *allen* Knotenpaaren eines Graphes mitsamt der jeweiligen Pfadlänge. 
-    Dabei werden unerreichbare Graphen mit 'x' gekennzeichnet. Laufzeittechnisch schwierig.
+def _pred_cycle(pred):
+    """Sucht einen Kreis im Vorgängergraphen und gibt seine Knoten (in Kantenrichtung) zurück, sonst None."""
+    state = [0] * len(pred) # 0 = offen, 1 = auf dem aktuellen Weg, 2 = erledigt
+    for root in range(len(pred)):
+        path = []
+        v = root
+        while v != -1 and state[v] == 0:
+            state[v] = 1
+            path.append(v)
+            v = pred[v]
+        if v != -1 and state[v] == 1:
+            cycle = path[path.index(v):]
+            cycle.reverse() # pred zeigt entgegen der Kantenrichtung
+            return cycle
+        for u in path:
+            state[u] = 2
+    return None
+
+def _raise_negative_cycle(C, dist, pred):
+    """Wird aufgerufen, wenn ein negativer Kreis festgestellt wurde. Solange der Vorgängergraph noch keinen Kreis enthält,
+    wird weiter relaxiert; da die Abstände auf dem Kreis beliebig fallen, schließt sich der Kreis im Vorgängergraphen nach
+    endlich vielen Durchläufen. Löst NegativeCycle mit dem gefundenen Kreis aus.
     """
-    # preparing the matrix
-    dist = defaultdict(dict)
-    next = defaultdict(dict)
+    off, tgt, wgt = C.adjacency()
+    dist = list(dist)
+    pred = list(pred)
+    cycle = _pred_cycle(pred)
+    while cycle is None:
+        for u in range(len(C)):
+            du = dist[u]
+            if du == float('inf'):
+                continue
+            for e in range(off[u], off[u + 1]):
+                v = tgt[e]
+                if du + wgt[e] < dist[v]:
+                    dist[v] = du + wgt[e]
+                    pred[v] = u
+        cycle = _pred_cycle(pred)
 
-    for u in G.nodes:
-        for v in G.nodes:
-            dist[u][v] = INF
-            next[u][v] = 'x'
+    weight = 0
+    for u, v in zip(cycle, cycle[1:] + cycle[:1]):
+        weight += min(wgt[e] for e in range(off[u], off[u + 1]) if tgt[e] == v)
+    raise NegativeCycle([C.to_id(v) for v in cycle], weight)
 
-    # the distance from A to A is 0, from B to B 0 ...
-    for i in dist.keys():
-        dist[i][i] = 0
+def floyd_warshall(G, progress=None, dtype=np.float64, memmap_dir: str=None):
+    """Der Floyd-Warshall-Algorithmus findet die kürzesten Pfade zwischen *allen* Knotenpaaren eines Graphes mitsamt der jeweiligen Pfadlänge. 
+    Dabei werden unerreichbare Graphen mit 'x' gekennzeichnet.
 
-    # for each edge in G get u, v, length and save the values in the matrix
-    for edge in G.edges:
-        u = edge[0]
-        v = edge[1]
-        dist[u][v] = G[u][v][0]['length']
-        next[u][v] = v
+    Die eigentliche Arbeit erledigt die numpy-Matrix-Engine in matrix.py. Zurückgegeben werden zwei MatrixViews, die sich wie
+    die früheren dict-of-dicts verhalten (dist[u][v], next[u][v]), aber nur die Arrays halten. next.path(u, v) liefert die Route
+    oder None, falls v von u aus unerreichbar ist.
+    progress ist ein optionaler Callback progress(k, n); mit memmap_dir werden die Matrizen auf der Festplatte abgelegt.
+    """
+    C = as_csr(G)
+    dist, succ, count = floyd_warshall_matrix(C, dtype=dtype, memmap_dir=memmap_dir, progress=progress)
+    return MatrixView(dist, C, INF), MatrixView(succ, C, 'x', nodes=True, distances=dist), count
 
-    max = len(dist.keys())*len(dist.keys())*len(dist.keys()) # get amount of operations and initialize counter
-    count = 0
+def johnson(G, workers: int=None, progress=None, dtype=np.float64, memmap_dir: str=None):
+    """Kürzeste Pfade zwischen allen Knotenpaaren nach Johnson: bei negativen Kanten wird einmal mit Bellman-Ford (SPFA von
+    einem virtuellen Start) umgewichtet, danach läuft je Start ein Dijkstra, verteilt auf workers Prozesse.
+    Rückgabe wie bei floyd_warshall (dist[u][v], next[u][v], count), d.h. die Routen lassen sich mit next.path(u, v) ablesen.
+    Ist ein negativer Kreis vorhanden, wird NegativeCycle ausgelöst.
+    """
+    C = as_csr(G)
+    potential, count = _johnson_potential(C)
+    dist, succ, searched = johnson_matrix(C, potential, dtype=dtype, memmap_dir=memmap_dir, workers=workers, progress=progress)
+    return MatrixView(dist, C, INF), MatrixView(succ, C, 'x', nodes=True, distances=dist), count + searched
 
-    # main-part of the Floyd-Warshall-Algorithm
-    # for i, j, k -- using dist.keys() to make sure freely named/ numbered nodes can be used too
-    for i in dist.keys():
-        for j in dist.keys():
-            for k in dist.keys():
-                if (count) % 10000000 == 0: # trust me, this is needed
-                    print("{0} / {1}: {2}".format(count, max, count/max))
-                possibleNewLow = dist[i][k] + dist[k][j]
-                if dist[i][j] > possibleNewLow:
-                    dist[i][j] = possibleNewLow
-                    next[i][j]  = next[i][k]
-                count += 1
+def johnson_distances(G, origins, destinations):
+    """Distanzmatrix len(origins) x len(destinations) (numpy, inf = unerreichbar) nach Johnson: einmal umgewichten wie bei
+    johnson, danach nur je Start ein Dijkstra. Speicher und Laufzeit wachsen so mit der Zahl der Starts statt mit n².
+    origins und destinations sind ursprüngliche Knoten-IDs; bei einem negativen Kreis wird NegativeCycle ausgelöst.
+    """
+    C = as_csr(G)
+    potential, _ = _johnson_potential(C)
+    sources = [C.to_index(node) for node in origins]
+    rows, _ = johnson_rows(C, potential, sources)
+    columns = np.array([C.to_index(node) for node in destinations], dtype=np.int64)
+    return np.array([rows[s][columns] for s in sources], dtype=np.float64).reshape(len(sources), len(columns))
 
-    return dist, next, count
+def _johnson_potential(C):
+    """Potential h für Johnson: Abstände von einem virtuellen Start, der mit Gewicht 0 auf jeden Knoten zeigt (SPFA wie
+    _bellman_ford_queue). Ohne negative Kanten wird nichts berechnet und (None, 0) zurückgegeben.
+    """
+    n = len(C)
+    if n == 0 or C.edge_count == 0 or C.weights.min() >= 0:
+        return None, 0
+    off, tgt, wgt = C.adjacency()
+    dist = [0.0] * n
+    pred = [-1] * n
+    edges = [1] * n # Kante vom virtuellen Start mitgezählt; der Graph hat n + 1 Knoten
+    queued = [True] * n
+    queue = deque(range(n))
+
+    count = 0
+    while queue:
+        u = queue.popleft()
+        queued[u] = False
+        du = dist[u]
+        for e in range(off[u], off[u + 1]):
+            count += 1
+            v = tgt[e]
+            if du + wgt[e] < dist[v]:
+                dist[v] = du + wgt[e]
+                pred[v] = u
+                edges[v] = edges[u] + 1
+                if edges[v] > n:
+                    _raise_negative_cycle(C, dist, pred)
+                if not queued[v]:
+                    queued[v] = True
+                    queue.append(v)
+    return np.array(dist), count
 
 def nx_shortest_path(G, orig_node, dest_node, weight):
+    import networkx as nx
     return nx.shortest_path(G, orig_node, dest_node, weight=weight)
@@ -0,0 +1,261 @@
+import argparse
+import csv
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from cache import GraphCache
+from ch import hierarchy_for
+from csr import from_arrays
+from instrumentation import SearchStats
+from landmarks import landmarks_for
+from routing import find_route
+from utility import haversine_vec
+
+"""Diese Datei enthält eine reproduzierbare, netzwerkfreie Benchmark-Suite für die Algorithmen.
+
+Eingaben:
+    - der Graph aus test_beispiel()
+    - synthetische, straßenähnliche Gitter ('grid') und zufällige geometrische Graphen ('geometric') von 1k bis 1M Knoten,
+      die direkt als CSRGraph erzeugt werden (Koordinaten in Südwestfalen, Kantenlängen >= Luftlinie)
+    - alle gültigen Graphen im persistenten Graphen-Cache (siehe cache.py), falls vorhanden
+
+Gemessen werden je Algorithmus Laufzeit, markierte und abgeschlossene Knoten, betrachtete Kanten, Heap-Operationen
+und der Spitzenspeicher (tracemalloc, in einem getrennten Durchlauf, damit die Zeitmessung unbeeinflusst bleibt).
+Vorberechnungen (Landmarken, Contraction Hierarchies) werden getrennt als 'preprocess' gemessen.
+
+Die Ergebnisse werden als CSV/JSON geschrieben und können mit --compare gegen einen früheren Lauf (z.B. eines anderen
+Commits) geprüft werden; bei Verschlechterungen über --threshold endet das Skript mit Exit-Code 1.
+
+Beispiel:
+    python benchmark.py --sizes 1000 10000 --queries 20 --json bench.json --csv bench.csv --compare baseline.json
+"""
+
+# größte Knotenzahl, bis zu der ein Algorithmus noch gemessen wird (Laufzeit/Speicher wachsen sonst zu stark)
+SIZE_LIMITS = {
+    'floyd-warshall': 2000,
+    'johnson': 5000,
+    'bellman-ford': 100000,
+    'contraction-hierarchies': 10000,
+    'a-star-alt': 200000,
+}
+ALGORITHMS = ('dijkstra', 'dijkstra-p2p', 'a-star', 'a-star-alt', 'bidirectional-dijkstra', 'bidirectional-a-star',
+              'contraction-hierarchies', 'bellman-ford', 'johnson', 'floyd-warshall')
+METRICS = ('seconds', 'labelled', 'settled', 'relaxations', 'pushes', 'pops', 'decrease_keys', 'max_frontier', 'peak_kb')
+
+def example_graph():
+    """Der Graph aus test_beispiel() (ohne Koordinaten)."""
+    edges = [(1, 4, 10), (1, 2, 5), (2, 3, 3), (3, 4, 1), (3, 5, 8), (4, 3, 1)]
+    node_ids = np.array([1, 2, 3, 4, 5], dtype=np.int64)
+    sources = [u - 1 for u, _, _ in edges]
+    targets = [v - 1 for _, v, _ in edges]
+    weights = [w for _, _, w in edges]
+    nan = np.full(5, np.nan)
+    return from_arrays(node_ids, sources, targets, weights, nan, nan)
+
+def _lengths(x, y, sources, targets, rng):
+    """Kantenlängen in Metern: Luftlinie mit zufälligem Umweg von bis zu 30 %, damit die Heuristiken zulässig bleiben."""
+    straight = haversine_vec(x[sources], y[sources], x[targets], y[targets]) * 1000
+    return straight * (1 + 0.3 * rng.random(len(sources))) + 1e-3
+
+def grid_graph(n: int, seed: int=0, removed: float=0.1):
+    """Straßenähnliches Gitter mit etwa n Knoten (~110 m Abstand); ein Anteil removed der gerichteten Kanten fehlt (Einbahnstraßen)."""
+    rng = np.random.default_rng(seed)
+    side = max(int(round(n ** 0.5)), 2)
+    rows, cols = np.divmod(np.arange(side * side), side)
+    y = 51.2 + rows * 0.001
+    x = 7.4 + cols * 0.0016
+    index = rows * side + cols
+
+    sources, targets = [], []
+    for dr, dc in ((0, 1), (1, 0)):
+        ok = (rows + dr < side) & (cols + dc < side)
+        a = index[ok]
+        b = (rows[ok] + dr) * side + cols[ok] + dc
+        sources += [a, b]
+        targets += [b, a]
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    keep = rng.random(len(sources)) >= removed
+    sources, targets = sources[keep], targets[keep]
+    return from_arrays(np.arange(side * side, dtype=np.int64), sources, targets, _lengths(x, y, sources, targets, rng), x, y)
+
+def geometric_graph(n: int, seed: int=0, window: int=2):
+    """Zufälliger geometrischer Graph mit n Knoten in Südwestfalen. Die Knoten werden zeilen- bzw. spaltenweise nach
+    Gitterzellen sortiert und mit ihren window Nachfolgern verbunden, sofern diese nah genug liegen (vollständig vektorisiert).
+    """
+    rng = np.random.default_rng(seed)
+    y = 51.2 + rng.random(n) * 0.4
+    x = 7.4 + rng.random(n) * 1.0
+    # Zellgröße so, dass im Schnitt etwa 2 Knoten in einer Zelle liegen
+    cell = (0.4 * 1.0 / n * 2) ** 0.5
+    cy = (y / cell).astype(np.int64)
+    cx = (x / (cell * 1.6)).astype(np.int64)
+    radius = 2.5 * cell
+
+    sources, targets = [], []
+    for order in (np.lexsort((x, cy)), np.lexsort((y, cx))):
+        for step in range(1, window + 1):
+            a, b = order[:-step], order[step:]
+            near = (np.abs(y[a] - y[b]) < radius) & (np.abs(x[a] - x[b]) < radius * 1.6)
+            sources += [a[near], b[near]]
+            targets += [b[near], a[near]]
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    return from_arrays(np.arange(n, dtype=np.int64), sources, targets, _lengths(x, y, sources, targets, rng), x, y)
+
+def cached_graphs():
+    """Alle gültigen Einträge des persistenten Graphen-Caches als (Name, CSRGraph)."""
+    cache = GraphCache()
+    result = []
+    for _, _, key in sorted(cache.entries()):
+        C = cache.load(key, compiled=True)
+        if C is not None:
+            result.append((f"cache-{key[:10]}", C))
+    return result
+
+def benchmark_inputs(sizes, kinds=('grid', 'geometric'), use_cache: bool=True, seed: int=0):
+    inputs = [('beispiel', example_graph())]
+    for kind in kinds:
+        for n in sizes:
+            G = grid_graph(n, seed) if kind == 'grid' else geometric_graph(n, seed)
+            inputs.append((f"{kind}-{n}", G))
+    if use_cache:
+        inputs += cached_graphs()
+    return inputs
+
+def query_pairs(C, queries: int, seed: int=0):
+    """Reproduzierbare Start-Ziel-Paare (ursprüngliche IDs)."""
+    rng = random.Random(seed)
+    ids = C.ids()
+    return [(ids[rng.randrange(len(ids))], ids[rng.randrange(len(ids))]) for _ in range(queries)]
+
+def _run(name, C, pairs, memory: bool):
+    """Führt alle Anfragen aus und gibt je Anfrage die Kennzahlen zurück."""
+    rows = []
+    for orig, dest in pairs:
+        search = SearchStats(name)
+        start = time.perf_counter()
+        try:
+            find_route(name, C, orig, dest, search)
+        except KeyError:
+            pass # Ziel nicht erreichbar, die Suche wurde trotzdem vollständig gemessen
+        stats = search.as_dict()
+        stats['seconds'] = time.perf_counter() - start
+        if memory:
+            tracemalloc.start()
+            try:
+                find_route(name, C, orig, dest)
+            except KeyError:
+                pass
+            stats['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        rows.append(stats)
+    return rows
+
+def _summary(input_name, C, name, rows):
+    summary = {'input': input_name, 'nodes': len(C), 'edges': C.edge_count, 'algorithm': name, 'queries': len(rows)}
+    for metric in METRICS:
+        values = [row[metric] for row in rows if metric in row]
+        summary[metric] = statistics.median(values) if values else None
+    return summary
+
+def run_benchmark(inputs, algorithms=ALGORITHMS, queries: int=10, memory: bool=True, seed: int=0, log=print):
+    """Misst alle Algorithmen auf allen Eingaben und gibt eine Liste von Zusammenfassungen (Median je Kennzahl) zurück."""
+    results = []
+    for input_name, C in inputs:
+        pairs = query_pairs(C, queries, seed)
+        for name in algorithms:
+            if len(C) > SIZE_LIMITS.get(name, float('inf')):
+                continue
+            if name in ('a-star', 'a-star-alt', 'bidirectional-a-star') and not np.isfinite(C.x).all():
+                continue # Heuristik benötigt Koordinaten
+            if name in ('a-star-alt', 'contraction-hierarchies'):
+                start = time.perf_counter()
+                landmarks_for(C) if name == 'a-star-alt' else hierarchy_for(C)
+                results.append({'input': input_name, 'nodes': len(C), 'edges': C.edge_count, 'algorithm': f"{name}:preprocess",
+                                'queries': 1, 'seconds': time.perf_counter() - start})
+            summary = _summary(input_name, C, name, _run(name, C, pairs, memory))
+            log(f"= {input_name:>18} {name:>24}: {summary['seconds']*1000:10.2f} ms, {summary['settled']} abgeschlossen")
+            results.append(summary)
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_json(path: str, results, args: dict=None):
+    meta = {'commit': _git_commit(), 'created': time.time(), 'python': platform.python_version(),
+            'machine': platform.machine(), 'args': args}
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1)
+
+def write_csv(path: str, results):
+    fields = ['input', 'nodes', 'edges', 'algorithm', 'queries'] + list(METRICS)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+def compare(previous, current, threshold: float=0.2, metrics=('seconds', 'settled', 'relaxations', 'peak_kb')):
+    """Vergleicht zwei Ergebnislisten und gibt die Verschlechterungen um mehr als threshold (relativ) zurück."""
+    before = {(r['input'], r['algorithm']): r for r in previous}
+    regressions = []
+    for row in current:
+        old = before.get((row['input'], row['algorithm']))
+        if old is None:
+            continue
+        for metric in metrics:
+            a, b = old.get(metric), row.get(metric)
+            if a is None or b is None:
+                continue
+            # sehr kleine Zeiten schwanken stark, daher eine absolute Untergrenze von 1 ms
+            floor = 1e-3 if metric == 'seconds' else 0
+            if b > max(a, floor) * (1 + threshold):
+                regressions.append({'input': row['input'], 'algorithm': row['algorithm'], 'metric': metric,
+                                    'before': a, 'after': b, 'ratio': b / a if a else float('inf')})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduzierbare Benchmarks der Routing-Algorithmen (ohne Netzwerkzugriff).")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--kinds', nargs='+', default=['grid', 'geometric'], choices=['grid', 'geometric'])
+    parser.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS), choices=ALGORITHMS)
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="keinen Spitzenspeicher messen (halbiert die Laufzeit)")
+    parser.add_argument('--no-cache', action='store_true', help="keine Graphen aus dem persistenten Cache verwenden")
+    parser.add_argument('--json', help="Ergebnisse als JSON schreiben")
+    parser.add_argument('--csv', help="Ergebnisse als CSV schreiben")
+    parser.add_argument('--compare', help="früheres JSON-Ergebnis, gegen das geprüft wird")
+    parser.add_argument('--threshold', type=float, default=0.2, help="erlaubte relative Verschlechterung (Standard 0.2)")
+    args = parser.parse_args(argv)
+
+    inputs = benchmark_inputs(args.sizes, args.kinds, not args.no_cache, args.seed)
+    results = run_benchmark(inputs, args.algorithms, args.queries, not args.no_memory, args.seed)
+    if args.json:
+        write_json(args.json, results, vars(args))
+    if args.csv:
+        write_csv(args.csv, results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)['results']
+        regressions = compare(previous, results, args.threshold)
+        for r in regressions:
+            print(f"! Verschlechterung {r['input']} {r['algorithm']} {r['metric']}: {r['before']:.4g} -> {r['after']:.4g} (x{r['ratio']:.2f})")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
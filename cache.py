@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+from csr import CSRGraph, as_csr, attach_csr, load_csr, save_csr
+
+"""Diese Datei stellt einen persistenten Graphen-Cache auf der Festplatte bereit.
+
+Jeder Eintrag liegt in einem eigenen Verzeichnis (benannt nach dem Schlüssel) und enthält:
+    - die kompilierte CSR-Form (einzelne .npy-Dateien, per memmap ladbar)
+    - den networkx-Graphen als Pickle (nur für Plot und Snapping nötig; fehlt bei Graphen, die direkt als CSRGraph
+      entstehen, z.B. aus osmloader.py; diese lassen sich nur mit compiled=True laden)
+    - meta.json mit Version, Erstellungszeit und den Parametern, aus denen der Schlüssel entstanden ist
+
+Die Schlüssel werden aus einer kanonischen Beschreibung (Art, Ort/BBox/Adresse, network_type, distance) gebildet.
+Überschreitet der Cache max_bytes, werden die am längsten nicht benutzten Einträge gelöscht (LRU). Einträge mit anderer
+Version oder älter als max_age Sekunden gelten als veraltet und werden verworfen, ebenso Einträge, deren Inhalt sich nicht
+mehr lesen lässt (beschädigtes Pickle oder .npy). Geschrieben wird je Aufruf in ein eigenes Staging-Verzeichnis, das
+erst vollständig gefüllt per os.replace an seinen Platz kommt; gleichzeitige Schreiber kommen sich so nicht in die Quere.
+"""
+
+CACHE_VERSION = 1
+STAGING_AGE = 3600 # Staging-Verzeichnisse abgestürzter Schreiber werden nach dieser Zeit (Sekunden) gelöscht
+CACHE_DIR = os.environ.get('SS2020_GRAPH_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'ss_2020', 'graphs'))
+
+def canonical_key(kind: str, **params):
+    """Bildet aus Art und Parametern einen stabilen Schlüssel. Fließkommazahlen werden auf 6 Nachkommastellen gerundet,
+    Strings von Leerraum befreit und in Kleinbuchstaben umgewandelt.
+    """
+    canonical = {'kind': kind}
+    for name, value in params.items():
+        if isinstance(value, float):
+            value = round(value, 6)
+        elif isinstance(value, str):
+            value = ' '.join(value.split()).lower()
+        elif isinstance(value, (tuple, list)):
+            value = [round(v, 6) if isinstance(v, float) else v for v in value]
+        canonical[name] = value
+    description = json.dumps(canonical, sort_keys=True)
+    return hashlib.sha1(description.encode('utf-8')).hexdigest(), canonical
+
+class GraphCache:
+    """Persistenter Cache für Graphen mit LRU-Verdrängung und Prüfung auf veraltete Einträge."""
+
+    def __init__(self, directory: str=CACHE_DIR, max_bytes: int=2 * 1024**3, max_age: float=30 * 24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _meta(self, key):
+        try:
+            with open(os.path.join(self._path(key), 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_stale(self, meta):
+        return meta is None or meta.get('version') != CACHE_VERSION or time.time() - meta.get('created', 0) > self.max_age
+
+    def __contains__(self, key):
+        return not self.is_stale(self._meta(key))
+
+    def load(self, key, compiled: bool=False):
+        """Lädt einen Eintrag. Mit compiled=True nur den CSRGraph (eingeblendet), sonst den networkx-Graphen,
+        an den der CSRGraph bereits angehängt ist. Gibt None zurück, falls kein gültiger Eintrag existiert.
+        """
+        path = self._path(key)
+        meta = self._meta(key)
+        if self.is_stale(meta):
+            self.remove(key)
+            return None
+
+        pickled = os.path.join(path, 'graph.pickle')
+        if not compiled and not os.path.exists(pickled):
+            return None # nur als CSRGraph abgelegt (z.B. aus osmloader.py), der Eintrag selbst ist gültig
+
+        try:
+            C = load_csr(os.path.join(path, 'csr'))
+            if compiled:
+                result = C
+            else:
+                with open(pickled, 'rb') as f:
+                    result = pickle.load(f)
+                attach_csr(result, C)
+        except (ValueError, EOFError, pickle.UnpicklingError):
+            # beschädigter Inhalt: Eintrag verwerfen, damit er neu erstellt wird
+            self.remove(key)
+            return None
+        except OSError:
+            return None # z.B. gerade von einem anderen Prozess ersetzt; der Eintrag bleibt erhalten
+
+        # Zugriffszeit für die LRU-Verdrängung festhalten
+        os.utime(path)
+        return result
+
+    def store(self, key, G, params: dict=None):
+        """Legt G (samt kompilierter CSR-Form) unter key ab und verdrängt danach ggf. alte Einträge.
+        Ist G bereits ein CSRGraph, wird nur dieser abgelegt.
+        """
+        C = as_csr(G)
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=key + '.', suffix='.tmp', dir=self.directory)
+
+        save_csr(C, os.path.join(tmp, 'csr'))
+        if isinstance(G, CSRGraph):
+            size = [len(C), C.edge_count]
+        else:
+            # die CSR-Form liegt bereits daneben und muss nicht mitgepickelt werden
+            compiled = G.graph.pop('csr', None)
+            try:
+                with open(os.path.join(tmp, 'graph.pickle'), 'wb') as f:
+                    pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+            finally:
+                if compiled is not None:
+                    G.graph['csr'] = compiled
+            size = [G.number_of_nodes(), G.number_of_edges()]
+
+        meta = {'version': CACHE_VERSION, 'created': time.time(), 'params': params, 'size': size}
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        # erst vollständig schreiben, dann umbenennen -> andere Prozesse sehen nie halbe Einträge
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.replace(tmp, path)
+        except OSError: # ein anderer Prozess hat denselben Eintrag gerade abgelegt
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def remove(self, key):
+        shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def entries(self):
+        """Gibt alle Einträge als Liste (letzter Zugriff, Größe in Bytes, Schlüssel) zurück."""
+        result = []
+        if not os.path.isdir(self.directory):
+            return result
+        for key in os.listdir(self.directory):
+            path = self._path(key)
+            if key.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            size = 0
+            for root, _, files in os.walk(path):
+                size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+            result.append((os.path.getmtime(path), size, key))
+        return result
+
+    def evict(self):
+        """Löscht veraltete Einträge und danach die am längsten ungenutzten, bis der Cache höchstens max_bytes groß ist."""
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                staging = os.path.join(self.directory, name)
+                if name.endswith('.tmp') and time.time() - os.path.getmtime(staging) > STAGING_AGE:
+                    shutil.rmtree(staging, ignore_errors=True)
+
+        entries = []
+        for accessed, size, key in self.entries():
+            if self.is_stale(self._meta(key)):
+                self.remove(key)
+            else:
+                entries.append((accessed, size, key))
+
+        total = sum(size for _, size, _ in entries)
+        for accessed, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
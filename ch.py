@@ -0,0 +1,318 @@
+import numpy as np
+
+from csr import as_csr
+from instrumentation import SearchStats, tracer_of
+from utility import PriorityQueue
+
+"""Diese Datei enthält Contraction Hierarchies (CH) für viele Anfragen auf demselben Graphen.
+
+Vorberechnung (contract): Die Knoten werden nacheinander "kontrahiert", wobei eine Abkürzung (shortcut) u -> w eingefügt wird,
+wenn der kürzeste Weg von u nach w über den kontrahierten Knoten v führt. Die Reihenfolge bestimmt eine Priorität aus
+Kantendifferenz und Anzahl bereits kontrahierter Nachbarn.
+
+Anfrage (ch_query): Bidirektionaler Dijkstra, der vorwärts und rückwärts nur zu Knoten mit höherem Rang läuft. Dadurch wird
+nur ein winziger Teil des Graphen besucht. Die gefundenen Abkürzungen werden anschließend wieder in die ursprüngliche
+Knotenfolge (OSM-IDs) entpackt, sodass die Route direkt an ox.plot_graph_route übergeben werden kann.
+
+Eine Hierarchie lässt sich mit save_hierarchy/load_hierarchy speichern und beim Start wieder laden.
+"""
+
+HIERARCHY_ARRAYS = ('node_ids', 'rank', 'up_offsets', 'up_targets', 'up_weights', 'up_middle',
+                    'down_offsets', 'down_targets', 'down_weights', 'down_middle')
+
+class ContractionHierarchy:
+    """Ergebnis der Vorberechnung.
+
+    * rank: Kontraktionsreihenfolge jedes Knotens (höher = später kontrahiert)
+    * up_*:   Kanten u -> v mit rank[u] < rank[v] (Vorwärtssuche), in CSR-Form je Knoten u
+    * down_*: Kanten u -> v mit rank[u] > rank[v], umgedreht bei v gespeichert (Rückwärtssuche)
+    * *_middle: kontrahierter Knoten einer Abkürzung bzw. -1 für ursprüngliche Kanten
+    """
+
+    def __init__(self, node_ids, rank, up_offsets, up_targets, up_weights, up_middle,
+                 down_offsets, down_targets, down_weights, down_middle):
+        self.node_ids = node_ids
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_middle = up_middle
+        self.down_offsets = down_offsets
+        self.down_targets = down_targets
+        self.down_weights = down_weights
+        self.down_middle = down_middle
+        self._index = None
+        self._lists = None
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.node_ids.tolist())}
+        return self._index
+
+    def adjacency(self):
+        """Beide Suchgraphen als Python-Listen (schnellerer Elementzugriff in der Anfrage)."""
+        if self._lists is None:
+            self._lists = ((self.up_offsets.tolist(), self.up_targets.tolist(), self.up_weights.tolist(), self.up_middle.tolist()),
+                           (self.down_offsets.tolist(), self.down_targets.tolist(), self.down_weights.tolist(), self.down_middle.tolist()),
+                           self.rank.tolist())
+        return self._lists
+
+    def edge(self, u, v):
+        """Gibt (Länge, kontrahierter Knoten) der Kante u -> v zurück; der Mittelknoten ist -1 bei ursprünglichen Kanten."""
+        up, down, rank = self.adjacency()
+        if rank[u] < rank[v]:
+            off, tgt, wgt, mid = up
+            a, b = u, v
+        else:
+            off, tgt, wgt, mid = down
+            a, b = v, u
+        for e in range(off[a], off[a + 1]):
+            if tgt[e] == b:
+                return wgt[e], mid[e]
+        raise KeyError((u, v))
+
+    def unpack(self, path):
+        """Entpackt eine Knotenfolge mit Abkürzungen in die vollständige Folge ursprünglicher Knoten (Indizes)."""
+        if not path:
+            return []
+        result = [path[0]]
+        stack = []
+        for u, v in zip(path, path[1:]):
+            stack.append((u, v))
+            while stack:
+                a, b = stack.pop()
+                _, m = self.edge(a, b)
+                if m == -1:
+                    result.append(b)
+                else:
+                    # zuerst a -> m, dann m -> b
+                    stack.append((m, b))
+                    stack.append((a, m))
+        return result
+
+def _witness_search(out_edges, source, skip, targets, limit, max_settled):
+    """Begrenzte Dijkstra-Suche von source, die den Knoten skip meidet. Gibt die gefundenen Abstände zurück."""
+    dist = {source: 0}
+    pq = PriorityQueue()
+    pq.push(source, 0)
+    remaining = set(targets)
+    settled = 0
+    while len(pq) > 0 and remaining and settled < max_settled:
+        u = pq.pop()
+        du = dist[u]
+        if du > limit:
+            break
+        settled += 1
+        remaining.discard(u)
+        for v, (w, _) in out_edges[u].items():
+            if v == skip:
+                continue
+            dv = du + w
+            if v not in dist or dv < dist[v]:
+                dist[v] = dv
+                pq.push(v, dv)
+    return dist
+
+def _shortcuts(out_edges, in_edges, v, max_settled):
+    """Ermittelt die Abkürzungen (u, w, Länge), die beim Kontrahieren von v nötig wären."""
+    result = []
+    outgoing = out_edges[v]
+    if not outgoing:
+        return result
+    max_out = max(w for w, _ in outgoing.values())
+    for u, (w_in, _) in in_edges[v].items():
+        if u == v:
+            continue
+        targets = [w for w in outgoing if w != u and w != v]
+        if not targets:
+            continue
+        dist = _witness_search(out_edges, u, v, targets, w_in + max_out, max_settled)
+        for w in targets:
+            length = w_in + outgoing[w][0]
+            if dist.get(w, float('inf')) > length:
+                result.append((u, w, length))
+    return result
+
+def _priority(out_edges, in_edges, deleted, v, max_settled):
+    shortcuts = _shortcuts(out_edges, in_edges, v, max_settled)
+    return len(shortcuts) - len(out_edges[v]) - len(in_edges[v]) + deleted[v]
+
+def contract(G, max_settled: int=50, progress=None):
+    """Vorberechnung der Contraction Hierarchy für G (networkx-Graph oder CSRGraph).
+    max_settled begrenzt die Zeugensuchen: kleinere Werte beschleunigen die Vorberechnung, erzeugen aber mehr Abkürzungen.
+    progress ist ein optionaler Callback progress(kontrahiert, n).
+    """
+    C = as_csr(G)
+    n = len(C)
+    off, tgt, wgt = C.adjacency()
+
+    # Arbeitsgraph: out_edges[u][v] = (Länge, Mittelknoten), in_edges[v][u] analog
+    out_edges = [dict() for _ in range(n)]
+    in_edges = [dict() for _ in range(n)]
+    for u in range(n):
+        for e in range(off[u], off[u + 1]):
+            v = tgt[e]
+            if v != u:
+                out_edges[u][v] = (wgt[e], -1)
+                in_edges[v][u] = (wgt[e], -1)
+    # alle jemals existierenden Kanten (ursprüngliche und Abkürzungen) für den Aufbau der Suchgraphen
+    all_edges = {(u, v): value for u in range(n) for v, value in out_edges[u].items()}
+
+    deleted = [0] * n
+    pq = PriorityQueue()
+    for v in range(n):
+        pq.push(v, _priority(out_edges, in_edges, deleted, v, max_settled))
+
+    rank = np.zeros(n, dtype=np.int32)
+    level = 0
+    while len(pq) > 0:
+        v = pq.pop()
+        # lazy update: Priorität neu berechnen und ggf. zurücklegen
+        priority = _priority(out_edges, in_edges, deleted, v, max_settled)
+        if len(pq) > 0 and priority > pq.priority(pq.peek()):
+            pq.push(v, priority)
+            continue
+
+        for u, w, length in _shortcuts(out_edges, in_edges, v, max_settled):
+            if w not in out_edges[u] or out_edges[u][w][0] > length:
+                out_edges[u][w] = (length, v)
+                in_edges[w][u] = (length, v)
+                all_edges[(u, w)] = (length, v)
+
+        # v aus dem Arbeitsgraphen entfernen
+        for u in in_edges[v]:
+            del out_edges[u][v]
+            deleted[u] += 1
+        for w in out_edges[v]:
+            del in_edges[w][v]
+            deleted[w] += 1
+        out_edges[v] = dict()
+        in_edges[v] = dict()
+
+        rank[v] = level
+        level += 1
+        if progress is not None:
+            progress(level, n)
+
+    return _build_hierarchy(C.node_ids, rank, all_edges)
+
+def _build_hierarchy(node_ids, rank, all_edges):
+    n = len(node_ids)
+    up, down = [], []
+    for (u, v), (w, m) in all_edges.items():
+        if rank[u] < rank[v]:
+            up.append((u, v, w, m))
+        else:
+            down.append((v, u, w, m))
+
+    def to_csr(edges):
+        edges.sort()
+        sources = np.array([e[0] for e in edges], dtype=np.int64)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+        targets = np.array([e[1] for e in edges], dtype=np.int32)
+        weights = np.array([e[2] for e in edges], dtype=np.float64)
+        middle = np.array([e[3] for e in edges], dtype=np.int32)
+        return offsets, targets, weights, middle
+
+    return ContractionHierarchy(np.asarray(node_ids), rank, *to_csr(up), *to_csr(down))
+
+def ch_query(H, start, dest, stats: SearchStats=None):
+    """Bidirektionale Anfrage auf der Hierarchie H von start nach dest (ursprüngliche Knoten-IDs).
+    Rückgabe wie bei den anderen Algorithmen: dist, pred und die Anzahl der Kantenbetrachtungen. Anders als dort enthalten
+    dist und pred nur die Knoten der entpackten Route (mit ihren exakten Abständen vom Start): die Abstände, die die
+    Aufwärtssuchen unterwegs markieren, sind in der Hierarchie nur obere Schranken und werden daher nicht zurückgegeben.
+    Ist dest unerreichbar, enthalten beide nur start.
+    stats wird wie bei den Algorithmen in algorithms.py gefüllt (siehe instrumentation.py); der Tracer sieht die Knoten der Hierarchie.
+    """
+    up, down, _ = H.adjacency()
+    s = H.index[start]
+    t = H.index[dest]
+    graphs = (up, down)
+    dists = ({s: 0}, {t: 0})
+    preds = ({s: -1}, {t: -1})
+    queues = (PriorityQueue(), PriorityQueue())
+    queues[0].push(s, 0)
+    queues[1].push(t, 0)
+
+    best = 0 if s == t else float('inf')
+    meet = s if s == t else -1
+    count = 0
+    active = [True, True]
+    side = 1
+    trace = tracer_of(stats)
+    while active[0] or active[1]:
+        # abwechselnd expandieren; eine Richtung endet, sobald ihr kleinster Schlüssel den besten Weg erreicht
+        side = 1 - side
+        pq = queues[side]
+        if not active[side]:
+            continue
+        if len(pq) == 0 or pq.priority(pq.peek()) >= best:
+            active[side] = False
+            continue
+        off, tgt, wgt, _ = graphs[side]
+        dist, pred, other = dists[side], preds[side], dists[1 - side]
+        u = pq.pop()
+        du = dist[u]
+        if trace is not None:
+            trace('settle', H.node_ids[u].item(), du)
+        if u in other and du + other[u] < best:
+            best = du + other[u]
+            meet = u
+        for e in range(off[u], off[u + 1]):
+            count += 1
+            v = tgt[e]
+            dv = du + wgt[e]
+            if v not in dist or dv < dist[v]:
+                dist[v] = dv
+                pred[v] = u
+                if trace is not None:
+                    trace('label', H.node_ids[v].item(), dv)
+                pq.push(v, dv)
+
+    if stats is not None:
+        stats.record(dists[0].keys() | dists[1].keys(), count, *queues)
+
+    if meet == -1:
+        return {H.node_ids[s].item(): 0}, {H.node_ids[s].item(): None}, count
+
+    # Pfad mit Abkürzungen zusammensetzen und entpacken
+    forward = [meet]
+    while preds[0][forward[-1]] != -1:
+        forward.append(preds[0][forward[-1]])
+    backward = []
+    u = meet
+    while preds[1][u] != -1:
+        u = preds[1][u]
+        backward.append(u)
+    path = H.unpack(forward[::-1] + backward)
+
+    ids = H.node_ids.tolist()
+    dist = {ids[path[0]]: 0}
+    pred = {ids[path[0]]: None}
+    length = 0
+    for a, b in zip(path, path[1:]):
+        length += H.edge(a, b)[0]
+        dist[ids[b]] = length
+        pred[ids[b]] = ids[a]
+    return dist, pred, count
+
+def save_hierarchy(H, path: str):
+    """Speichert die Hierarchie als unkomprimierte .npz-Datei."""
+    np.savez(path, **{name: getattr(H, name) for name in HIERARCHY_ARRAYS})
+
+def load_hierarchy(path: str):
+    """Lädt eine mit save_hierarchy gespeicherte Hierarchie."""
+    with np.load(path, allow_pickle=True) as data:
+        return ContractionHierarchy(**{name: data[name] for name in HIERARCHY_ARRAYS})
+
+def hierarchy_for(G, **kwargs):
+    """Gibt die Hierarchie zu G zurück; sie wird beim ersten Aufruf berechnet und am CSRGraph zwischengespeichert."""
+    C = as_csr(G)
+    if 'ch' not in C.artefacts:
+        C.artefacts['ch'] = contract(C, **kwargs)
+    return C.artefacts['ch']
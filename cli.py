@@ -0,0 +1,196 @@
+import argparse
+import builtins
+import sys
+import time
+from contextlib import nullcontext
+
+"""Diese Datei ist der Einstiegspunkt für die Kommandozeile.
+
+    python cli.py route a-star iserlohn hagen                 Route zwischen zwei Standorten (Namen aus constantCoords
+                                                              oder 'Breite,Länge'), Graph aus dem Cache bzw. osmnx
+    python cli.py route dijkstra 51.37,7.69 51.36,7.55 --graph csr:/pfad/zum/graph
+    python cli.py matrix iserlohn hagen soest --algorithm johnson
+    python cli.py evaluate [--parallel] [--tiles] [--examples]
+    python cli.py bench --sizes 1000 10000                    Argumente wie bei benchmark.py
+
+Alle weiteren Module werden erst im jeweiligen Befehl importiert; osmnx und matplotlib nur, wenn wirklich heruntergeladen
+bzw. gezeichnet wird. Eine Route auf einem bereits zwischengespeicherten Graphen (CSR, eingeblendet) kommt so mit numpy aus.
+Mit --profile-startup werden die Importzeiten der Pakete (inklusive ihrer Abhängigkeiten) ausgegeben.
+"""
+
+class ImportProfiler:
+    """Misst während des with-Blocks die Zeit der erstmaligen Importe je Paket (inklusive der darin ausgelösten Importe)."""
+
+    def __init__(self):
+        self.times = {}
+        self.total = 0.0
+        self._depth = 0
+        self._import = None
+
+    def __enter__(self):
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level != 0 or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            seconds = time.perf_counter() - start
+            if self._depth == 0:
+                self.total += seconds
+            package = name.partition('.')[0]
+            self.times[package] = max(self.times.get(package, 0.0), seconds)
+
+    def report(self, seconds: float, top: int=10):
+        slowest = sorted(self.times.items(), key=lambda item: -item[1])[:top]
+        print(f"= Importe (ms): {self.total*1000:.0f} \
+    \n= Langsamste Pakete (ms): " + ", ".join(f"{name} {t*1000:.0f}" for name, t in slowest) + f" \
+    \n= Befehl insgesamt (ms): {seconds*1000:.0f}")
+
+def parse_location(value: str):
+    """Standort als (Breite, Länge, Kürzel): Name aus constantCoords (z.B. iserlohn) oder 'Breite,Länge'."""
+    import constantCoords as cc
+    coords = getattr(cc, value, None)
+    if isinstance(coords, tuple):
+        return coords
+    try:
+        lat, lon = (float(v) for v in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Unbekannter Standort: {value} (Name aus constantCoords oder 'Breite,Länge')")
+    return lat, lon, value
+
+def _region(locations):
+    """Südwest- und Nordost-Ecke um alle Standorte (für generate_graph_from_coords)."""
+    return (min(c[0] for c in locations), min(c[1] for c in locations)), (max(c[0] for c in locations), max(c[1] for c in locations))
+
+def route(args):
+    from evaluation import plan_route_from_graph
+    from graph import generate_graph_from_coords, load_graph
+
+    draw = args.show or args.output is not None
+    if args.graph is not None:
+        G = load_graph(args.graph)
+    else:
+        # ohne Zeichnen genügt die CSR-Form, die der Cache direkt einblendet
+        G = generate_graph_from_coords(*_region([args.orig, args.dest]), network_type=args.network_type, compiled=not draw)
+    route = plan_route_from_graph(args.algorithm, G, args.orig, args.dest, show=args.show, filepath=args.output,
+                                  reduced=args.reduced)
+    print(route)
+    return 0 if route.nodes else 1
+
+def matrix(args):
+    import numpy as np
+
+    from distances import distance_matrix
+    from graph import generate_graph_from_coords, load_graph
+    from spatial import spatial_index_for
+
+    if args.graph is not None:
+        G = load_graph(args.graph)
+    else:
+        G = generate_graph_from_coords(*_region(args.points), network_type=args.network_type, compiled=True)
+    nodes = spatial_index_for(G).nearest_nodes(args.points)
+    if args.algorithm == 'johnson':
+        # nur die Zeilen der Standorte; die vollständigen n x n Matrizen wären für Regionalgraphen viel zu groß
+        from algorithms import johnson_distances
+        table = johnson_distances(G, nodes, nodes)
+    else:
+        table = distance_matrix(G, nodes, nodes, args.algorithm)
+
+    labels = [p[2] for p in args.points]
+    width = max(10, *(len(label) + 1 for label in labels))
+    print(' ' * width + ''.join(f"{label:>{width}}" for label in labels))
+    for label, row in zip(labels, table):
+        print(f"{label:<{width}}" + ''.join(f"{'∞' if not np.isfinite(d) else f'{d:.0f}':>{width}}" for d in row))
+    if args.csv:
+        import csv
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.writer(f) # Kürzel wie '51.37,7.69' enthalten Kommas und werden so in Anführungszeichen gesetzt
+            writer.writerow(['', *labels])
+            for label, row in zip(labels, table):
+                writer.writerow([label, *(str(d) for d in row)])
+    return 0
+
+def evaluate(args):
+    import evaluation
+
+    if args.examples:
+        evaluation.run_examples()
+    elif args.parallel:
+        results = evaluation.execute_evaluation_parallel(workers=args.workers, render_dir=args.render_dir)
+        return 1 if any(r['error'] is not None for r in results) else 0
+    else:
+        evaluation.execute_evaluation(tiles=args.tiles)
+    return 0
+
+def bench(args):
+    import benchmark
+    return benchmark.main(args.args)
+
+def _parser():
+    from routing import ALGORITHMS
+
+    parser = argparse.ArgumentParser(description="Routenplanung auf OSM-Graphen (siehe evaluation.py).")
+    parser.add_argument('--profile-startup', action='store_true', help="Importzeiten und Gesamtdauer ausgeben")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('route', help="Route zwischen zwei Standorten berechnen")
+    p.add_argument('algorithm', choices=ALGORITHMS)
+    p.add_argument('orig', type=parse_location)
+    p.add_argument('dest', type=parse_location)
+    p.add_argument('--graph', help="Graph statt BBox um Start und Ziel, z.B. csr:<Verzeichnis> oder 'city:Iserlohn, DE'")
+    p.add_argument('--network-type', default='all_private')
+    p.add_argument('--reduced', action='store_true', help="auf dem verkleinerten Graphen suchen (siehe reduction.py)")
+    p.add_argument('--show', action='store_true', help="Route plotten")
+    p.add_argument('--output', help="Bild der Route speichern (.png/.svg)")
+    p.set_defaults(run=route)
+
+    p = commands.add_parser('matrix', help="Distanzmatrix zwischen Standorten")
+    p.add_argument('points', nargs='+', type=parse_location)
+    p.add_argument('--graph')
+    p.add_argument('--network-type', default='all_private')
+    p.add_argument('--algorithm', choices=['dijkstra', 'bellman-ford', 'johnson'], default='dijkstra')
+    p.add_argument('--csv', help="Matrix als CSV schreiben")
+    p.set_defaults(run=matrix)
+
+    p = commands.add_parser('evaluate', help="Auswertung (execute_evaluation) ausführen")
+    p.add_argument('--tiles', action='store_true', help="Graphen aus dem Kachelspeicher zusammensetzen")
+    p.add_argument('--parallel', action='store_true', help="alle Jobs auf einem Regionalgraphen im Prozesspool")
+    p.add_argument('--workers', type=int)
+    p.add_argument('--render-dir', help="mit --parallel: Routen je Algorithmus als Bild dorthin schreiben")
+    p.add_argument('--examples', action='store_true', help="die Beispielaufrufe aus evaluation.py ausführen")
+    p.set_defaults(run=evaluate)
+
+    # die übrigen Argumente gehen unverändert an benchmark.main (siehe main)
+    p = commands.add_parser('bench', help="Benchmarks (Argumente wie bei benchmark.py)", add_help=False)
+    p.set_defaults(run=bench)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # vor dem Aufbau des Parsers prüfen, damit auch dessen Importe (routing, numpy) gemessen werden
+    profile = '--profile-startup' in argv
+    start = time.perf_counter()
+    with ImportProfiler() if profile else nullcontext() as profiler:
+        parser = _parser()
+        args, rest = parser.parse_known_args(argv)
+        if args.command == 'bench':
+            args.args = rest
+        elif rest:
+            parser.error(f"unrecognized arguments: {' '.join(rest)}")
+        code = args.run(args)
+    if profile:
+        profiler.report(time.perf_counter() - start)
+    return code
+
+if __name__ == '__main__':
+    sys.exit(main())
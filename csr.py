@@ -0,0 +1,217 @@
+import itertools
+import os
+
+import numpy as np
+
+"""Diese Datei stellt eine kompakte, Array-basierte Darstellung (CSR, compressed sparse row) eines Graphen bereit.
+Die Knoten werden dabei auf fortlaufende Ganzzahlen 0..n-1 abgebildet, die Kanten liegen als offsets/targets/weights vor.
+
+Die Suchalgorithmen in algorithms.py arbeiten intern auf dieser Struktur, da so pro Relaxation nur noch Listenzugriffe
+statt mehrerer Dictionary-Lookups (G[u][v][0]['length']) nötig sind. Die Ergebnisse werden am Ende wieder auf die
+ursprünglichen (OSM-)Knoten-IDs zurückgeführt.
+"""
+
+# fortlaufende Kennung je CSRGraph, z.B. als Schlüssel für Caches (id() kann nach dem Löschen wiederverwendet werden)
+_tokens = itertools.count()
+
+class CSRGraph:
+    """Kompakter, gerichteter Graph in CSR-Form.
+
+    * node_ids: Index -> ursprüngliche Knoten-ID
+    * offsets:  die Kanten von Knoten i liegen in targets/weights[offsets[i]:offsets[i+1]]
+    * targets:  Zielknoten (Index) jeder Kante
+    * weights:  Gewicht jeder Kante (bei parallelen Kanten das kleinste)
+    * x, y:     Koordinaten (Länge, Breite) jedes Knotens, NaN falls unbekannt
+    """
+
+    def __init__(self, node_ids, offsets, targets, weights, x, y, weight: str='length'):
+        self.node_ids = node_ids
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.x = x
+        self.y = y
+        self.weight = weight
+        self.token = next(_tokens)
+        # vorberechnete Strukturen (z.B. Rückwärtsgraph), die an diesen Graphen gebunden sind
+        self.artefacts = {}
+        self._index = None
+        self._lists = None
+        self._ids = None
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    @property
+    def index(self):
+        """Dictionary ursprüngliche Knoten-ID -> Index. Wird erst bei Bedarf erzeugt."""
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.ids())}
+        return self._index
+
+    def ids(self):
+        """node_ids als Python-Liste, damit beim Zurückübersetzen keine numpy-Skalare entstehen."""
+        if self._ids is None:
+            self._ids = self.node_ids.tolist()
+        return self._ids
+
+    def to_index(self, node):
+        return self.index[node]
+
+    def to_id(self, i):
+        return self.ids()[i]
+
+    def adjacency(self):
+        """Gibt offsets, targets und weights als Python-Listen zurück.
+        Elementzugriffe auf Listen sind in den (interpretierten) Suchschleifen deutlich schneller als auf numpy-Arrays.
+        """
+        if self._lists is None:
+            self._lists = (self.offsets.tolist(), self.targets.tolist(), self.weights.tolist())
+        return self._lists
+
+    def neighbors(self, i):
+        off, tgt, wgt = self.adjacency()
+        for e in range(off[i], off[i + 1]):
+            yield tgt[e], wgt[e]
+
+    def edge_index(self, i, j):
+        """Position der Kante i -> j (Indizes) in targets/weights, -1 falls es sie nicht gibt."""
+        off, tgt, _ = self.adjacency()
+        for e in range(off[i], off[i + 1]):
+            if tgt[e] == j:
+                return e
+        return -1
+
+    def set_weights(self, edges, weights):
+        """Setzt die Gewichte der Kanten an den Positionen edges. Eingeblendete (schreibgeschützte) Arrays werden dabei
+        kopiert; der zwischengespeicherte Rückwärtsgraph wird verworfen. Weitere Artefakte siehe dynamic.py.
+        """
+        if not self.weights.flags.writeable:
+            self.weights = np.array(self.weights)
+        self.weights[edges] = weights
+        if self._lists is not None:
+            wgt = self._lists[2]
+            for e, w in zip(edges, weights):
+                wgt[e] = float(w)
+        self.artefacts.pop('reverse', None)
+
+    def edges(self):
+        """Gibt alle Kanten als Arrays (sources, targets, weights) zurück."""
+        sources = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.offsets))
+        return sources, self.targets, self.weights
+
+    def reverse(self):
+        """Der Graph mit umgedrehten Kanten (wird zwischengespeichert)."""
+        if 'reverse' not in self.artefacts:
+            sources, targets, weights = self.edges()
+            self.artefacts['reverse'] = from_arrays(self.node_ids, targets, sources, weights, self.x, self.y, self.weight)
+        return self.artefacts['reverse']
+
+def from_arrays(node_ids, sources, targets, weights, x, y, weight: str='length'):
+    """Baut aus Kantenlisten (Indizes) einen CSRGraph. Parallele Kanten werden auf die mit dem kleinsten Gewicht reduziert.
+    """
+    n = len(node_ids)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    # sortieren nach (source, target, weight) -> die erste Kante einer Gruppe ist die kürzeste
+    order = np.lexsort((weights, targets, sources))
+    sources, targets, weights = sources[order], targets[order], weights[order]
+    if len(sources) > 0:
+        keep = np.ones(len(sources), dtype=bool)
+        keep[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        sources, targets, weights = sources[keep], targets[keep], weights[keep]
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+
+    return CSRGraph(np.asarray(node_ids), offsets, targets.astype(np.int32), weights,
+                    np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), weight)
+
+def compile_graph(G, weight: str='length'):
+    """Übersetzt einen (Multi-)DiGraph aus networkx/osmnx in einen CSRGraph.
+    Kanten ohne das angegebene Gewicht werden ignoriert.
+    """
+    nodes = list(G.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    sources, targets, weights = [], [], []
+    for u, v, w in G.edges(data=weight):
+        if w is None:
+            continue
+        sources.append(index[u])
+        targets.append(index[v])
+        weights.append(w)
+
+    nan = float('nan')
+    x = [G.nodes[node].get('x', nan) for node in nodes]
+    y = [G.nodes[node].get('y', nan) for node in nodes]
+
+    # OSM-IDs sind Ganzzahlen, frei benannte Knoten (z.B. Strings) bleiben Objekte
+    if all(isinstance(node, int) for node in nodes):
+        node_ids = np.array(nodes, dtype=np.int64)
+    else:
+        node_ids = np.empty(len(nodes), dtype=object)
+        node_ids[:] = nodes
+
+    return from_arrays(node_ids, sources, targets, weights, x, y, weight)
+
+def as_csr(G, weight: str='length'):
+    """Gibt die CSR-Form von G zurück. Ist G bereits ein CSRGraph, wird er unverändert zurückgegeben.
+    Bei networkx-Graphen wird die kompilierte Form in G.graph zwischengespeichert und neu erstellt, wenn sich die Knoten-/Kantenzahl
+    oder der Änderungszähler G.graph['csr_version'] geändert hat. Wer Kantengewichte direkt im networkx-Graphen ändert,
+    muss danach mark_changed(G) aufrufen (dynamic.update_weights erledigt das selbst).
+    """
+    if isinstance(G, CSRGraph):
+        return G
+
+    compiled = G.graph.setdefault('csr', {})
+    key = (G.number_of_nodes(), G.number_of_edges(), G.graph.get('csr_version', 0))
+    entry = compiled.get(weight)
+    if entry is None or entry[0] != key:
+        entry = (key, compile_graph(G, weight))
+        compiled[weight] = entry
+    return entry[1]
+
+def attach_csr(G, C):
+    """Hinterlegt C als aktuelle CSR-Form des networkx-Graphen G (für das Gewicht C.weight)."""
+    key = (G.number_of_nodes(), G.number_of_edges(), G.graph.get('csr_version', 0))
+    G.graph.setdefault('csr', {})[C.weight] = (key, C)
+
+def mark_changed(G, keep=None):
+    """Erhöht den Änderungszähler von G, sodass as_csr alle zwischengespeicherten CSR-Formen (samt ihrer Artefakte) neu erstellt.
+    keep ist eine CSR-Form, die bereits passend geändert wurde und erhalten bleiben soll.
+    """
+    G.graph['csr_version'] = G.graph.get('csr_version', 0) + 1
+    if keep is not None:
+        attach_csr(G, keep)
+
+CSR_ARRAYS = ('node_ids', 'offsets', 'targets', 'weights', 'x', 'y')
+
+def save_csr(C, directory: str):
+    """Speichert einen CSRGraph als einzelne .npy-Dateien in directory, sodass er später per memmap geladen werden kann."""
+    os.makedirs(directory, exist_ok=True)
+    for name in CSR_ARRAYS:
+        np.save(os.path.join(directory, name + '.npy'), getattr(C, name), allow_pickle=True)
+    with open(os.path.join(directory, 'weight.txt'), 'w') as f:
+        f.write(C.weight)
+
+def load_csr(directory: str, mmap: bool=True):
+    """Lädt einen mit save_csr gespeicherten CSRGraph. Mit mmap=True werden die Arrays nur eingeblendet statt gelesen
+    (Knoten-IDs als Objekte, z.B. Strings, werden immer vollständig geladen).
+    """
+    arrays = {}
+    for name in CSR_ARRAYS:
+        path = os.path.join(directory, name + '.npy')
+        try:
+            arrays[name] = np.load(path, mmap_mode='r' if mmap else None)
+        except ValueError: # object arrays lassen sich nicht einblenden
+            arrays[name] = np.load(path, allow_pickle=True)
+    with open(os.path.join(directory, 'weight.txt')) as f:
+        weight = f.read()
+    return CSRGraph(weight=weight, **arrays)
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from algorithms import bellman_ford, shortest_path_tree
+from csr import as_csr
+from results import SearchResult
+
+"""Diese Datei stellt eine Distanzmatrix-API (one-to-many / many-to-many) sowie einen Cache für Kürzeste-Wege-Bäume bereit.
+
+Statt für jedes Start-Ziel-Paar erneut zu suchen, wird je Start einmal der vollständige Baum (dist, pred) berechnet und
+alle Ziele daraus beantwortet. Die Bäume werden in einem LRU-Cache (Schlüssel: Graph-Kennung, Algorithmus, Start) mit
+begrenztem Speicher abgelegt, sodass ein wiederholter Start nur noch die Pfadrekonstruktion kostet.
+"""
+
+class ShortestPathTree(SearchResult):
+    """Kürzeste-Wege-Baum von einem Startknoten als kompakte, dichte Arrays (siehe results.SearchResult)."""
+
+    def __init__(self, C, source: int, dist, pred):
+        super().__init__(C, dist, pred)
+        self.source = source
+        # betrachtete Kanten beim Aufbau (alle ausgehenden Kanten der erreichten Knoten)
+        self.count = int(np.diff(C.offsets)[self.reached()].sum())
+
+class TreeCache:
+    """LRU-Cache für ShortestPathTrees mit Obergrenze für den belegten Speicher (max_bytes)."""
+
+    def __init__(self, max_bytes: int=256 * 1024**2):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._trees = OrderedDict()
+
+    def __len__(self):
+        return len(self._trees)
+
+    def get(self, key):
+        tree = self._trees.get(key)
+        if tree is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._trees.move_to_end(key)
+        return tree
+
+    def put(self, key, tree):
+        if key in self._trees:
+            self.bytes -= self._trees.pop(key).nbytes
+        self._trees[key] = tree
+        self.bytes += tree.nbytes
+        # am längsten nicht benutzte Bäume verdrängen (der neue bleibt in jedem Fall erhalten)
+        while self.bytes > self.max_bytes and len(self._trees) > 1:
+            _, old = self._trees.popitem(last=False)
+            self.bytes -= old.nbytes
+
+    def items(self):
+        return list(self._trees.items())
+
+    def discard(self, key):
+        tree = self._trees.pop(key, None)
+        if tree is not None:
+            self.bytes -= tree.nbytes
+
+    def clear(self):
+        self._trees.clear()
+        self.bytes = 0
+
+# prozessweiter Cache für distance_matrix (die Bäume repariert dynamic.update_weights bei Gewichtsänderungen)
+tree_cache = TreeCache()
+
+def shortest_path_tree_for(G, source, algorithm: str='dijkstra', cache: TreeCache=tree_cache):
+    """Gibt den Kürzeste-Wege-Baum von source (ursprüngliche ID) zurück, aus dem Cache oder neu berechnet.
+    algorithm ist 'dijkstra' oder 'bellman-ford' (für negative Kantengewichte).
+    """
+    C = as_csr(G)
+    key = (C.token, algorithm, source)
+    tree = None if cache is None else cache.get(key)
+    if tree is not None:
+        return tree
+
+    s = C.to_index(source)
+    if algorithm == 'dijkstra':
+        dist, pred = shortest_path_tree(C, s)
+    elif algorithm == 'bellman-ford':
+        result = bellman_ford(C, source)[0].result
+        dist, pred = result.dist, result.pred
+    else:
+        raise ValueError(f"Für Distanzmatrizen nicht unterstützter Algorithmus: {algorithm}")
+
+    tree = ShortestPathTree(C, s, dist, pred)
+    if cache is not None:
+        cache.put(key, tree)
+    return tree
+
+def distance_matrix(G, origins, destinations, algorithm: str='dijkstra', cache: TreeCache=tree_cache):
+    """Distanzmatrix len(origins) x len(destinations) (numpy, inf = unerreichbar) mit einer Suche je Start.
+    origins und destinations sind ursprüngliche Knoten-IDs.
+    """
+    C = as_csr(G)
+    columns = np.array([C.to_index(node) for node in destinations], dtype=np.int64)
+    matrix = np.empty((len(origins), len(destinations)), dtype=np.float64)
+    for row, source in enumerate(origins):
+        matrix[row] = shortest_path_tree_for(C, source, algorithm, cache).dist[columns]
+    return matrix
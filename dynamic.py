@@ -0,0 +1,161 @@
+import heapq
+
+import numpy as np
+
+from csr import CSRGraph, as_csr, mark_changed
+from distances import ShortestPathTree, TreeCache, tree_cache
+
+"""Diese Datei erlaubt es, Kantengewichte nachträglich zu ändern (Sperrungen, Stau), ohne alles neu zu berechnen.
+
+update_weights ändert einen ganzen Stapel von Kanten auf einmal, block_edges sperrt Kanten (Gewicht ∞). Geändert werden
+der networkx-Graph (falls übergeben) und seine CSR-Form. Danach werden:
+    * die zwischengespeicherten Dijkstra-Bäume (siehe distances.py) inkrementell repariert: bei Verlängerungen nur der
+      Teilbaum unter der Kante (zurücksetzen und von seinem Rand aus neu füllen, nach Ramalingam–Reps), bei Verkürzungen
+      nur die Knoten, deren Abstand tatsächlich sinkt
+    * Bellman-Ford-Bäume nur verworfen, wenn ihre Wege eine geänderte Kante benutzen oder eine Verkürzung sie verbessert
+    * die Contraction Hierarchy verworfen (sie hängt von allen Gewichten ab)
+    * die Landmarken nur bei Verkürzungen verworfen; bei Verlängerungen bleiben ihre Schranken gültige untere Schranken
+    * der verkleinerte Graph (siehe reduction.py) samt der auf ihm zwischengespeicherten Bäume verworfen, da seine
+      Kettengewichte Summen der alten Kantengewichte sind
+Koordinaten, Spatial-Index und der Rückwärtsgraph (wird neu erzeugt) sind nicht betroffen.
+"""
+
+def update_weights(G, changes: dict, cache: TreeCache=tree_cache):
+    """Setzt die Gewichte der Kanten changes = {(u, v): Gewicht, ...} (ursprüngliche Knoten-IDs); None oder inf sperrt die Kante.
+    Bei networkx-Graphen erhalten alle parallelen Kanten u -> v das neue Gewicht.
+    Gibt ein Dictionary mit der Anzahl reparierter und verworfener Bäume sowie den verworfenen Artefakten zurück.
+    """
+    C = as_csr(G)
+    edges, weights = [], []
+    for (u, v), w in changes.items():
+        w = float('inf') if w is None else float(w)
+        e = C.edge_index(C.to_index(u), C.to_index(v))
+        if e == -1:
+            raise KeyError(f"Kante {u} -> {v} existiert nicht")
+        edges.append(e)
+        weights.append(w)
+        if not isinstance(G, CSRGraph):
+            for data in G[u][v].values():
+                data[C.weight] = w
+
+    edges = np.array(edges, dtype=np.int64)
+    old = np.array(C.weights[edges], dtype=np.float64)
+    new = np.array(weights, dtype=np.float64)
+    C.set_weights(edges, new)
+    if not isinstance(G, CSRGraph):
+        mark_changed(G, keep=C) # C ist bereits angepasst, CSR-Formen zu anderen Gewichten werden neu erstellt
+
+    sources = np.searchsorted(C.offsets, edges, side='right') - 1
+    changed = list(zip(sources.tolist(), C.targets[edges].tolist(), old.tolist(), new.tolist()))
+    increased = [(u, v) for u, v, a, b in changed if b > a]
+    decreased = [(u, v) for u, v, a, b in changed if b < a]
+
+    report = {'repaired': 0, 'discarded': 0, 'artefacts': []}
+    if cache is not None:
+        for key, tree in cache.items():
+            if key[0] != C.token:
+                continue
+            if key[1] == 'dijkstra':
+                repair_tree(tree, increased, decreased)
+                report['repaired'] += 1
+            elif _uses(tree, increased, decreased):
+                cache.discard(key)
+                report['discarded'] += 1
+
+    if (increased or decreased) and C.artefacts.pop('ch', None) is not None:
+        report['artefacts'].append('ch')
+    reduced = C.artefacts.pop('reduced', None) if increased or decreased else None
+    if reduced is not None:
+        report['artefacts'].append('reduced')
+        if cache is not None:
+            for key, _ in cache.items():
+                if key[0] == reduced.graph.token:
+                    cache.discard(key)
+                    report['discarded'] += 1
+    if decreased and C.artefacts.pop('landmarks', None) is not None:
+        report['artefacts'].append('landmarks')
+    return report
+
+def block_edges(G, edges, cache: TreeCache=tree_cache):
+    """Sperrt die Kanten edges = [(u, v), ...] (Gewicht ∞)."""
+    return update_weights(G, {edge: None for edge in edges}, cache)
+
+def _uses(tree, increased, decreased):
+    """Ob ein Baum von den Änderungen betroffen ist: eine verlängerte Kante ist Baumkante oder eine verkürzte verbessert ihn."""
+    _, _, wgt = tree.graph.adjacency()
+    dist, pred = tree.dist, tree.pred
+    if any(pred[v] == u for u, v in increased):
+        return True
+    return any(dist[u] + wgt[tree.graph.edge_index(u, v)] < dist[v] for u, v in decreased)
+
+def _subtree(pred, roots):
+    """Alle Knoten in den Teilbäumen unter roots (Vorgänger-Array, -1 = keiner)."""
+    # Kinder je Knoten über eine Sortierung nach Vorgänger (numpy), abgefragt wird dann nur der betroffene Teil
+    children = np.argsort(pred, kind='stable')
+    parents = pred[children]
+    affected = set(roots)
+    stack = list(roots)
+    while stack:
+        u = stack.pop()
+        lo, hi = np.searchsorted(parents, [u, u + 1])
+        for c in children[lo:hi].tolist():
+            if c not in affected:
+                affected.add(c)
+                stack.append(c)
+    return affected
+
+def repair_tree(tree: ShortestPathTree, increased, decreased):
+    """Repariert tree (dist, pred) nach geänderten Kantengewichten; increased/decreased sind Kanten (u, v) als Indizes,
+    deren Gewicht im Graphen bereits geändert wurde. Es werden nur die betroffenen Knoten angefasst.
+    Gibt die Anzahl der neu abgeschlossenen Knoten zurück.
+    """
+    C = tree.graph
+    off, tgt, wgt = C.adjacency()
+    roff, rtgt, rwgt = C.reverse().adjacency()
+    dist = tree.dist.tolist()
+    pred = tree.pred.tolist()
+    heap = []
+
+    # Verlängerungen: Teilbäume unter verlängerten Baumkanten zurücksetzen und vom unveränderten Rand aus neu anbinden
+    roots = [v for u, v in increased if pred[v] == u]
+    if roots:
+        affected = _subtree(tree.pred, roots)
+        for v in affected:
+            dist[v] = float('inf')
+            pred[v] = -1
+        for v in affected:
+            for e in range(roff[v], roff[v + 1]):
+                u = rtgt[e]
+                if u not in affected and dist[u] + rwgt[e] < dist[v]:
+                    dist[v] = dist[u] + rwgt[e]
+                    pred[v] = u
+            if dist[v] != float('inf'):
+                heapq.heappush(heap, (dist[v], v))
+
+    # Verkürzungen: nur Endknoten, die dadurch näher rücken
+    for u, v in decreased:
+        e = C.edge_index(u, v)
+        if dist[u] + wgt[e] < dist[v]:
+            dist[v] = dist[u] + wgt[e]
+            pred[v] = u
+            heapq.heappush(heap, (dist[v], v))
+
+    # Dijkstra ab den betroffenen Knoten; veraltete Heap-Einträge werden übersprungen
+    settled = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        settled += 1
+        for e in range(off[u], off[u + 1]):
+            v = tgt[e]
+            if d + wgt[e] < dist[v]:
+                dist[v] = d + wgt[e]
+                pred[v] = u
+                heapq.heappush(heap, (dist[v], v))
+
+    tree.dist[:] = dist
+    tree.pred[:] = pred
+    tree._reached = None
+    tree.count = int(np.diff(C.offsets)[tree.reached()].sum())
+    return settled
@@ -1,97 +1,196 @@
-import osmnx as ox
-import networkx as nx
-import matplotlib.pyplot as plt
+import os
 
 import constantCoords as cc
-from algorithms import a_star, bellman_ford, dijkstra, floyd_warshall
-from graph import generate_graph_from_city, generate_graph_from_coords, get_area_and_basic_stats
+from algorithms import bellman_ford, dijkstra, floyd_warshall
+from csr import CSRGraph
+from graph import generate_graph_from_city, generate_graph_from_coords, generate_graph_from_tiles, get_area_and_basic_stats
+from instrumentation import SearchStats
+from parallel import run_jobs
+from reduction import reduced_for
+from render import RenderPool, render_route
+from routing import Route, find_route
+from spatial import spatial_index_for
 
 """Diese Datei ist das Kernstück. Hier befindet sich der Wrapper, welcher dafür zuständig ist, aus Algorithmus-Bezeichnung
 und Koordinaten eine Route zu basteln.
 
 Für Informationen, welche Algorithmen gehen und wie die Funktionen aufgerufen werden siehe Beispiele (ggf. auskommentiert) und die Klassenkommentare.
 
-Ich kann nur davor warnen, Floyd-Warshall auf andere Graphen als auf den in test_beispiel() verwendeten loszulassen!
+Floyd-Warshall läuft inzwischen vektorisiert (siehe matrix.py), bleibt aber Θ(V³) und ist nur für Stadtgraphen mit wenigen tausend Knoten gedacht.
+
+Der Import ist frei von Nebenwirkungen: osmnx, networkx und matplotlib werden erst bei Bedarf geladen, die Beispiele
+laufen nur über python evaluation.py (run_examples). Für die Kommandozeile siehe cli.py.
 """
 
-def plan_route_from_coords(name:str, orig_coords: tuple, dest_coords: tuple, show: bool=None):
+def plan_route_from_coords(name:str, orig_coords: tuple, dest_coords: tuple, show: bool=None, filepath: str=None):
     """Helper, um Koordinaten als Basis für die plan_route_from_graph(...)-Funktion zu verwenden.
     """
     G = generate_graph_from_coords(orig_coords, dest_coords)
-    plan_route_from_graph(name, G, orig_coords, dest_coords, show)
+    return plan_route_from_graph(name, G, orig_coords, dest_coords, show, filepath=filepath)
+
+def plan_route_from_tiles(name:str, orig_coords: tuple, dest_coords: tuple, network_type: str='drive'):
+    """Helper, der den Graphen aus dem Kachelspeicher (siehe tiles.py) für plan_route_from_graph(...) zusammensetzt.
+    Der Graph ist ein CSRGraph, daher wird nichts geplottet.
+    """
+    G = generate_graph_from_tiles(orig_coords, dest_coords, network_type)
+    return plan_route_from_graph(name, G, orig_coords, dest_coords)
 
-def plan_route_from_city(name:str, city: str, orig_coords: tuple, dest_coords: tuple, show: bool=None):
+def plan_route_from_city(name:str, city: str, orig_coords: tuple, dest_coords: tuple, show: bool=None, filepath: str=None):
     """Helper, um einen Stadtnamen als Basis für die plan_route_from_graph(...)-Funktion zu verwenden.
     """
     G = generate_graph_from_city(city)
-    plan_route_from_graph(name, G, orig_coords, dest_coords, show)
+    return plan_route_from_graph(name, G, orig_coords, dest_coords, show, filepath=filepath)
 
-def plan_route_from_graph(name: str, G, orig_coords, dest_coords, show: bool=None):
+def plan_route_from_graph(name: str, G, orig_coords, dest_coords, show: bool=None, tracer=None, filepath: str=None,
+                          renderer: RenderPool=None, reduced: bool=False):
     """Diese Funktion wendet einen Algorithmus (name) auf einen Graphen G an, um den besten Weg
     von den Startkoordinaten (orig_coords) zu den Zielkoordinaten (dest_coords) zu ermitteln.
-    Steht show auf True, wird der Graph geplottet, ansonsten (auch bei weglassen), werden nur die Daten ausgegeben.
+    Zurückgegeben wird ein Route-Objekt (Knoten, Länge, dist/pred, Kennzahlen als SearchStats), tracer wird an die Suche durchgereicht.
+
+    Gerendert wird nur auf Wunsch: steht show auf True, wird der Graph geplottet, mit filepath (.png/.svg) wird das Bild gespeichert.
+    Mit renderer (siehe render.RenderPool) wird das Bild nach filepath stattdessen im Hintergrund geschrieben.
+    Mit reduced=True wird auf dem verkleinerten Graphen gesucht (größte starke Zusammenhangskomponente, Grad-2-Ketten
+    zusammengefasst, siehe reduction.py); die Route wird anschließend wieder auf alle OSM-Knoten erweitert. Liegen Start
+    oder Ziel im Inneren einer Kette, wird von den in Fahrtrichtung erreichbaren Kettenenden aus gesucht.
 
     Zulässige name-Werte (Aufsteigend: ungefähre Laufzeit):
+    * contraction-hierarchies (Vorberechnung beim ersten Aufruf je Graph, danach sehr schnell)
+    * bidirectional-a-star
+    * bidirectional-dijkstra
+    * a-star-alt (A-Stern mit Landmarken, Vorberechnung beim ersten Aufruf je Graph)
     * a-star
+    * dijkstra-p2p (Dijkstra mit Abbruch am Ziel)
     * dijkstra
     * bellman-ford
+    * johnson (alle Paare, je Start ein Dijkstra im Prozesspool)
     * floyd-warshall
     """
+    stats = SearchStats(name, tracer)
     # fetch nodes and prepare fields
-    orig_node = ox.get_nearest_node(G, orig_coords)
-    dest_node = ox.get_nearest_node(G, dest_coords)
-    
-    dist = {}
-    pred = {}
-    route = []
-
-    if show is None:
-        show = False
+    with stats.phase('snap'):
+        orig_node, dest_node = spatial_index_for(G).nearest_nodes([orig_coords, dest_coords])
+        if reduced:
+            R = reduced_for(G)
+            orig_node, dest_node = (_snap_reduced(R, node, coords) for node, coords in ((orig_node, orig_coords), (dest_node, dest_coords)))
 
     print(f"===== START {name}, ({orig_coords[2]} → {dest_coords[2]})")
-    if (name == "floyd-warshall"):
-        # call algorithm
-        dist, next, count = floyd_warshall(G)
-        # prepare route
-        u = orig_node
-        v = dest_node
-        while u != v:
-            route += [u]
-            u = next[u][v]
-
+    if reduced:
+        dist, pred, count, nodes = _find_route_reduced(name, R, orig_node, dest_node, stats)
     else:
-        # call algorithm
-        if (name == "dijkstra"):
-            dist, pred, count = dijkstra(G, orig_node)
-        elif (name == "a-star"):
-            dist, pred, count = a_star(G, orig_node, dest_node)
-        elif (name == "bellman-ford"):
-            dist, pred, count = bellman_ford(G, orig_node)
-        # prepare route
-        v = dest_node
-        while v is not None:
-            route = [v] + route
-            v = pred[v]
-
-    printInfos(G, dist, pred, count, route, dist[dest_node])
+        dist, pred, count, nodes = find_route(name, G, orig_node, dest_node, stats)
+    route = Route(name, orig_node, dest_node, nodes, dist, pred, count, stats, orig_coords[2], dest_coords[2])
+
+    if renderer is not None and filepath is not None:
+        renderer.submit(route, filepath)
+    elif show or filepath is not None:
+        with stats.phase('render'):
+            render_route(G, route.nodes, route.visited, filepath, bool(show))
+
+    printInfos(G, dist, pred, count, nodes, route.length, stats)
     print(f"===== ENDE {name}")
+    return route
+
+def _snap_reduced(R, node, coords):
+    """Bildet einen eingerasteten Knoten auf den verkleinerten Graphen ab. Liegt er außerhalb der größten starken
+    Zusammenhangskomponente, wird das gemeldet und stattdessen der nächste Knoten innerhalb verwendet.
+    """
+    if R.in_component(node):
+        return node
+    print(f"**** node {node} is outside the largest strongly connected component, using the nearest node inside ****")
+    return spatial_index_for(R.graph).nearest_node(coords)
+
+def _find_route_reduced(name: str, R, orig_node, dest_node, stats: SearchStats=None):
+    """find_route auf dem verkleinerten Graphen R für Knoten des vollständigen Graphen. Liegen Start bzw. Ziel im Inneren
+    einer Kette, wird von jedem in Fahrtrichtung erreichbaren Kettenende zu jedem Kettenende vor dem Ziel gesucht
+    (höchstens vier Suchen); die Teilstrecken auf den Ketten werden als Versatz addiert und der Route wieder angefügt.
+    Gibt dist (Abstände ab orig_node), pred, count und die Route in Knoten des vollständigen Graphen zurück.
+    """
+    if orig_node == dest_node:
+        return {orig_node: 0.0}, {orig_node: None}, 0, [orig_node]
+    exits = R.exits(orig_node, stop=dest_node)
+    entries = R.entries(dest_node)
+    best = None # (Länge, Ausgang, Eingang, dist, pred, Route im verkleinerten Graphen)
+    count = 0
+    if dest_node in exits and dest_node not in R.graph.index:
+        # Start und Ziel auf derselben Kette, das Ziel liegt in Fahrtrichtung vor dem nächsten Kettenende
+        best = (exits[dest_node][0], dest_node, None, {}, {}, [])
+    for b, (to_b, _) in exits.items():
+        if b not in R.graph.index:
+            continue
+        for a, (from_a, _) in entries.items():
+            try:
+                dist, pred, n, route = find_route(name, R.graph, b, a, stats)
+                length = to_b + dist[a] + from_a
+            except KeyError: # a von b aus nicht erreichbar
+                continue
+            count += n
+            if best is None or length < best[0]:
+                best = (length, b, a, dist, pred, route)
+    if best is None:
+        raise KeyError(dest_node)
+
+    length, b, a, search_dist, pred, route = best
+    to_b, prefix = exits[b]
+    _, suffix = entries[a] if a is not None else (0.0, [])
+    dist = {v: to_b + d for v, d in search_dist.items()}
+    dist.update(prefix)
+    dist.update((v, length - d) for v, d in suffix)
+    dist[orig_node] = 0.0
+    dist[dest_node] = length
 
-    nc = ['r' if x in dist.keys() else 'black' for x in G.nodes]
-    fig, ax = ox.plot_graph_route(G, route, node_size=24, node_color=nc, node_alpha=0.6, route_color='b', route_alpha=0.7, show=show)
+    nodes = [orig_node] + [v for v, _ in prefix] + R.expand(route) + [v for v, _ in suffix] + [dest_node]
+    # Ketten-Enden, die zugleich Start bzw. Ziel sind, stehen sonst doppelt in der Route
+    nodes = [v for i, v in enumerate(nodes) if i == 0 or v != nodes[i - 1]]
+    pred = dict(pred)
+    for u, v in zip(nodes, nodes[1:]):
+        pred[v] = u
+    return dist, pred, count, nodes
 
-def printInfos(G, dist, pred, count, route, length):
+def printInfos(G, dist, pred, count, route, length, stats: SearchStats=None):
     """Dient der strukturierten Informationsausgabe aus den Parametern.
     """
-    print(f"= Kanten: {len(G.edges)} \
+    print(f"= Kanten: {G.edge_count if isinstance(G, CSRGraph) else len(G.edges)} \
     \n= Knoten: {len(G)} \
     \n= Besuchte Knoten: {len(dist)} \
     \n= Operationen: {count} \
     \n= Länge der Route (V): {len(route)} \
     \n= Länge der Route (m): {length}")
+    if stats is not None:
+        print(f"= Abgeschlossene Knoten: {stats.settled} \
+    \n= Betrachtete Kanten: {stats.relaxations} \
+    \n= Heap (push/pop/decrease-key): {stats.pushes}/{stats.pops}/{stats.decrease_keys} \
+    \n= Max. Warteschlange: {stats.max_frontier}")
+        print("= Laufzeit (ms): " + ", ".join(f"{name} {seconds*1000:.1f}" for name, seconds in stats.phases.items()))
     # \n= rel. Operationen je besuchter Knoten: {count/len(dist)} \
     # \n= rel. Operationen je Gesamtzahl Knoten: {count/len(G)}")
 
-def execute_evaluation():
+# Strecken 1-15 der Auswertung (siehe execute_evaluation)
+EVALUATION_ROUTES = [
+    (cc.iserlohn, cc.iserlohnVerwaltung), (cc.iserlohn, cc.hagen), (cc.iserlohn, cc.soest),                 # 1-3
+    (cc.iserlohn, cc.luedenscheid), (cc.iserlohn, cc.meschede),                                            # 4-5
+    (cc.iserlohnVerwaltung, cc.hagen), (cc.iserlohnVerwaltung, cc.soest),                                  # 6-7
+    (cc.iserlohnVerwaltung, cc.luedenscheid), (cc.iserlohnVerwaltung, cc.meschede),                        # 8-9
+    (cc.hagen, cc.soest), (cc.hagen, cc.luedenscheid), (cc.hagen, cc.meschede),                            # 10-12
+    (cc.soest, cc.luedenscheid), (cc.soest, cc.meschede),                                                  # 13-14
+    (cc.luedenscheid, cc.meschede),                                                                        # 15
+]
+
+def evaluation_jobs():
+    """Gibt die Aufrufe der Auswertung als Liste von Jobs (Algorithmus, Startkoordinaten, Zielkoordinaten) zurück:
+    Strecken 1-15 mit Dijkstra und A-Stern, Strecke 1 mit Bellman-Ford, jeweils A → B und B → A.
+    """
+    jobs = []
+    for name in ('dijkstra', 'a-star'):
+        for a, b in EVALUATION_ROUTES:
+            jobs += [(name, a, b), (name, b, a)]
+    a, b = EVALUATION_ROUTES[0]
+    jobs += [('bellman-ford', a, b), ('bellman-ford', b, a)]
+
+    # floyd-warshall (takes very long)
+    # jobs += [('floyd-warshall', a, b), ('floyd-warshall', b, a)]
+    return jobs
+
+def execute_evaluation(tiles: bool=False):
     """Diese Funktion erhebt die von mir verwendeten Daten unter Verwendung der anderen Methoden in dieser Datei.
     Es werden die Strecken 1-15 durch die Algorithmen Dijkstra und A-Stern abgelaufen und die Strecke 1 durch den Algorithmus Bellman-Ford.
 
@@ -101,89 +200,47 @@ def execute_evaluation():
         3. IS → SO         8. ISV → LUE       12. HA → ME
         4. IS → LUE        9. ISV → ME
         5. IS → ME
+
+    Mit tiles=True werden die Graphen aus dem Kachelspeicher zusammengesetzt (gleicher network_type wie bei den BBoxen),
+    sodass sich überlappende Strecken die geladenen Kacheln teilen.
     """
-    # dijkstra
-    # 1-5
-    plan_route_from_coords('dijkstra', cc.iserlohn, cc.iserlohnVerwaltung)
-    plan_route_from_coords('dijkstra', cc.iserlohnVerwaltung, cc.iserlohn)
-    plan_route_from_coords('dijkstra', cc.iserlohn, cc.hagen)
-    plan_route_from_coords('dijkstra', cc.hagen, cc.iserlohn)
-    plan_route_from_coords('dijkstra', cc.iserlohn, cc.soest)
-    plan_route_from_coords('dijkstra', cc.soest, cc.iserlohn)
-    plan_route_from_coords('dijkstra', cc.iserlohn, cc.luedenscheid)
-    plan_route_from_coords('dijkstra', cc.luedenscheid, cc.iserlohn)
-    plan_route_from_coords('dijkstra', cc.iserlohn, cc.meschede)
-    plan_route_from_coords('dijkstra', cc.meschede, cc.iserlohn)
-    # 6-9
-    plan_route_from_coords('dijkstra', cc.iserlohnVerwaltung, cc.hagen)
-    plan_route_from_coords('dijkstra', cc.hagen, cc.iserlohnVerwaltung)
-    plan_route_from_coords('dijkstra', cc.iserlohnVerwaltung, cc.soest)
-    plan_route_from_coords('dijkstra', cc.soest, cc.iserlohnVerwaltung)
-    plan_route_from_coords('dijkstra', cc.iserlohnVerwaltung, cc.luedenscheid)
-    plan_route_from_coords('dijkstra', cc.luedenscheid, cc.iserlohnVerwaltung)
-    plan_route_from_coords('dijkstra', cc.iserlohnVerwaltung, cc.meschede)
-    plan_route_from_coords('dijkstra', cc.meschede, cc.iserlohnVerwaltung)
-    # 10-12
-    plan_route_from_coords('dijkstra', cc.hagen, cc.soest)
-    plan_route_from_coords('dijkstra', cc.soest, cc.hagen)
-    plan_route_from_coords('dijkstra', cc.hagen, cc.luedenscheid)
-    plan_route_from_coords('dijkstra', cc.luedenscheid, cc.hagen)
-    plan_route_from_coords('dijkstra', cc.hagen, cc.meschede)
-    plan_route_from_coords('dijkstra', cc.meschede, cc.hagen)
-    # 13-14
-    plan_route_from_coords('dijkstra', cc.soest, cc.luedenscheid)
-    plan_route_from_coords('dijkstra', cc.luedenscheid, cc.soest)
-    plan_route_from_coords('dijkstra', cc.soest, cc.meschede)
-    plan_route_from_coords('dijkstra', cc.meschede, cc.soest)
-    # 15
-    plan_route_from_coords('dijkstra', cc.luedenscheid, cc.meschede)
-    plan_route_from_coords('dijkstra', cc.meschede, cc.luedenscheid)
-
-    # a-star
-    # 1-5
-    plan_route_from_coords('a-star', cc.iserlohn, cc.iserlohnVerwaltung)
-    plan_route_from_coords('a-star', cc.iserlohnVerwaltung, cc.iserlohn)
-    plan_route_from_coords('a-star', cc.iserlohn, cc.hagen)
-    plan_route_from_coords('a-star', cc.hagen, cc.iserlohn)
-    plan_route_from_coords('a-star', cc.iserlohn, cc.soest)
-    plan_route_from_coords('a-star', cc.soest, cc.iserlohn)
-    plan_route_from_coords('a-star', cc.iserlohn, cc.luedenscheid)
-    plan_route_from_coords('a-star', cc.luedenscheid, cc.iserlohn)
-    plan_route_from_coords('a-star', cc.iserlohn, cc.meschede)
-    plan_route_from_coords('a-star', cc.meschede, cc.iserlohn)
-    # 6-9
-    plan_route_from_coords('a-star', cc.iserlohnVerwaltung, cc.hagen)
-    plan_route_from_coords('a-star', cc.hagen, cc.iserlohnVerwaltung)
-    plan_route_from_coords('a-star', cc.iserlohnVerwaltung, cc.soest)
-    plan_route_from_coords('a-star', cc.soest, cc.iserlohnVerwaltung)
-    plan_route_from_coords('a-star', cc.iserlohnVerwaltung, cc.luedenscheid)
-    plan_route_from_coords('a-star', cc.luedenscheid, cc.iserlohnVerwaltung)
-    plan_route_from_coords('a-star', cc.iserlohnVerwaltung, cc.meschede)
-    plan_route_from_coords('a-star', cc.meschede, cc.iserlohnVerwaltung)
-    # 10-12
-    plan_route_from_coords('a-star', cc.hagen, cc.soest)
-    plan_route_from_coords('a-star', cc.soest, cc.hagen)
-    plan_route_from_coords('a-star', cc.hagen, cc.luedenscheid)
-    plan_route_from_coords('a-star', cc.luedenscheid, cc.hagen)
-    plan_route_from_coords('a-star', cc.hagen, cc.meschede)
-    plan_route_from_coords('a-star', cc.meschede, cc.hagen)
-    # 13-14
-    plan_route_from_coords('a-star', cc.soest, cc.luedenscheid)
-    plan_route_from_coords('a-star', cc.luedenscheid, cc.soest)
-    plan_route_from_coords('a-star', cc.soest, cc.meschede)
-    plan_route_from_coords('a-star', cc.meschede, cc.soest)
-    # 15
-    plan_route_from_coords('a-star', cc.luedenscheid, cc.meschede)
-    plan_route_from_coords('a-star', cc.meschede, cc.luedenscheid)
-    
-    # bellman-ford
-    # 1
-    plan_route_from_coords('bellman-ford', cc.iserlohn, cc.iserlohnVerwaltung)
-    plan_route_from_coords('bellman-ford', cc.iserlohnVerwaltung, cc.iserlohn)
+    for name, orig_coords, dest_coords in evaluation_jobs():
+        if tiles:
+            plan_route_from_tiles(name, orig_coords, dest_coords, 'all_private')
+        else:
+            plan_route_from_coords(name, orig_coords, dest_coords)
 
-    # floyd-warshall (takes very long)
-    # plan_route_from_coords('floyd-warshall', cc.iserlohn, cc.iserlohnVerwaltung)
-    # plan_route_from_coords('floyd-warshall', cc.iserlohnVerwaltung, cc.iserlohn)
+def execute_evaluation_parallel(G=None, workers: int=None, render_dir: str=None):
+    """Parallele Variante von execute_evaluation: alle Jobs laufen auf einem gemeinsamen Regionalgraphen in einem
+    Prozesspool (siehe parallel.py), ohne Plot. Ohne G wird ein Graph erstellt, der alle Standorte enthält.
+    Mit render_dir werden die Routen je Algorithmus gemeinsam in ein Bild <render_dir>/<Algorithmus>.png gezeichnet (im Hintergrund).
+    Gibt die Ergebnisse in der Reihenfolge von evaluation_jobs() zurück.
+    """
+    jobs = evaluation_jobs()
+    if G is None:
+        coords = [c for route in EVALUATION_ROUTES for c in route]
+        south_west = (min(c[0] for c in coords), min(c[1] for c in coords))
+        north_east = (max(c[0] for c in coords), max(c[1] for c in coords))
+        G = generate_graph_from_coords(south_west, north_east)
+
+    results = run_jobs(G, jobs, workers)
+    renderer = RenderPool(G, workers) if render_dir is not None else None
+    if renderer is not None:
+        os.makedirs(render_dir, exist_ok=True)
+        for name in dict.fromkeys(job[0] for job in jobs):
+            routes = [r['route'] for r in results if r['algorithm'] == name and r.get('route')]
+            renderer.submit_batch(routes, os.path.join(render_dir, f"{name}.png"))
+
+    for result in results:
+        if result['error'] is not None:
+            print(f"===== FEHLER {result['algorithm']}, ({result.get('orig')} → {result.get('dest')})\n{result['error']}")
+        else:
+            print(f"= {result['algorithm']}, ({result['orig']} → {result['dest']}): {result['length']} m, "
+                  f"{result['visited']} besuchte Knoten, {result['seconds']:.2f} s")
+    if renderer is not None:
+        renderer.close()
+        print(f"**** routes rendered to {render_dir} ****")
+    return results
 
 def test_beispiel(show: bool):
     """Stellt ein Beispiel anhand eines konstruierten Graphes dar, den die Algorithmen Dijkstra, Floyd-Warshall 
@@ -191,6 +248,7 @@ def test_beispiel(show: bool):
     
     A-Stern wurde ausgelassen, da die Haversine Distance nicht mit simplen Knoten funktioniert.
     """
+    import networkx as nx
     graph = nx.MultiDiGraph()
     graph.add_nodes_from([1,2,3,4,5])
     graph.add_edge(1,4,length=10)
@@ -201,6 +259,7 @@ def test_beispiel(show: bool):
     graph.add_edge(4,3,length=1)
    
     if(show):
+        import matplotlib.pyplot as plt
         nx.draw(graph)
         plt.show()
 
@@ -238,38 +297,50 @@ def test_beispiel(show: bool):
 
     # excluded a-star due to it being unable to use its haversine-distance on flat nodes
 
-def prepare_matrix_for_printing(mat):
+def prepare_matrix_for_printing(mat, width: int=6):
     """Diese Funktion hat einen einzigen Zweck: für die test_beispiel-Funktion Matrizen zum printen vorbereiten.
-    Dementsprechend unoptimiert und unschön ist sie.
+    Dementsprechend unoptimiert und unschön ist sie. Jede Spalte ist width Zeichen breit (rechtsbündig),
+    Abstände werden mit 'g' formatiert, sodass ganze Zahlen ohne Nachkommastellen erscheinen.
     """
+    def cell(val):
+        if isinstance(val, float) or val == 99999:
+            val = '∞' if val in (float('inf'), 99999) else f"{val:g}"
+        return f"{val:>{width}}"
+
     result = '=  '
     for row in mat.keys():
-        result += ('{:4}'.format(row))
+        result += cell(row)
     result += '\n'
     for row in mat:
         result += f"= {row}"
         for val in mat[row].values():
-            # if val == 'x':
-            result += ('{:4}'.format(val).replace("99999", "   ∞").replace("x   ", "   x"))
+            result += cell(val)
         result += '\n'
 
     return result
 
-# test
-test_beispiel(show=True)
+def run_examples():
+    """Die bisherigen Beispielaufrufe (laden Graphen über osmnx herunter und öffnen Plot-Fenster)."""
+    import osmnx as ox
+
+    # test
+    test_beispiel(show=True)
+
+    # plan route from city
+    plan_route_from_city('a-star', 'Iserlohn, DE', cc.iserlohn, cc.iserlohnVerwaltung, True)
 
-# plan route from city
-plan_route_from_city('a-star', 'Iserlohn, DE', cc.iserlohn, cc.iserlohnVerwaltung, True)
+    # plan route from coords / dijkstra
+    plan_route_from_coords(name='dijkstra', orig_coords=cc.iserlohn, dest_coords=cc.hagen, show=True)
 
-# plan route from coords / dijkstra
-plan_route_from_coords(name='dijkstra', orig_coords=cc.iserlohn, dest_coords=cc.hagen, show=True)
+    # plan route from coords / a-star
+    plan_route_from_coords('a-star', cc.iserlohn, cc.hagen, True)
 
-# plan route from coords / a-star
-plan_route_from_coords('a-star', cc.iserlohn, cc.hagen, True)
+    # plan route from graph
+    G = ox.graph_from_place("Iserlohn, DE", network_type='bike')
+    plan_route_from_graph('dijkstra', G, cc.iserlohn, cc.iserlohnVerwaltung, True)
 
-# plan route from graph
-G = ox.graph_from_place("Iserlohn, DE", network_type='bike')
-plan_route_from_graph('dijkstra', G, cc.iserlohn, cc.iserlohnVerwaltung, True)
+    # execute evaluation -- WARNING: this may take quite some time  
+    # execute_evaluation()
 
-# execute evaluation -- WARNING: this may take quite some time  
-# execute_evaluation()
\ No newline at end of file
+if __name__ == '__main__':
+    run_examples()
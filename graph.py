@@ -1,77 +1,144 @@
-import osmnx as ox
+import os
+
+from cache import GraphCache, canonical_key
+from csr import as_csr, load_csr
+from tiles import TileStore
 
 """
 Diese Datei stellt alle Graphen-relevanten Funktionen bereit. 
 So lassen sich mit diesen Funktionen Graphen aus:
     - Städten
-    - Koordinaten und
-    - Adressen 
+    - Koordinaten,
+    - Adressen und
+    - lokalen OSM-Auszügen (siehe osmloader.py)
 erstellen.
+
+Einmal erstellte Graphen landen zusätzlich in einem persistenten Cache auf der Festplatte (siehe cache.py), sodass
+neue Prozesse sie nicht erneut herunterladen müssen.
 """
 
 # ox.config(use_cache=True, log_console=True)
 
+def _osmnx():
+    """osmnx wird erst beim Herunterladen bzw. Auswerten importiert, damit Graphen aus dem Cache ohne den langsamen Import auskommen."""
+    import osmnx as ox
+    return ox
+
+# prozesslokaler Cache (kanonischer Schlüssel -> Graph) vor dem persistenten Cache auf der Festplatte
 graphs = {}
+disk_cache = GraphCache()
+# Kachelspeicher je network_type (siehe tiles.py)
+tile_stores = {}
 
-def generate_graph_from_city(city: str):
-    """Prüft, ob bereits ein Graph zu der angegebenen Stadt existiert und holt diesen oder erstellt diesen je nachdem.
+def _cached_graph(kind: str, params: dict, build, compiled: bool=False):
+    """Holt einen Graphen aus dem prozesslokalen bzw. persistenten Cache oder erstellt ihn mit build() und legt ihn in beiden ab.
+    Mit compiled=True wird nur die CSR-Form zurückgegeben (siehe csr.py), die direkt von der Festplatte eingeblendet wird.
     """
-    if graphs.get(city, "-1") != "-1":
+    key, canonical = canonical_key(kind, **params)
+    memory_key = (key, compiled)
+    if graphs.get(memory_key) is not None:
         print("**** graph fetched ****")
-        return graphs[city]
+        return graphs[memory_key]
+
+    G = disk_cache.load(key, compiled=compiled)
+    if G is not None:
+        print("**** graph loaded from cache ****")
     else:
-        G = ox.graph_from_place(city, network_type='drive')
-        graphs[city] = G
+        G = build()
+        disk_cache.store(key, G, canonical)
         print("**** graph created ****")
-        return G
+        if compiled:
+            G = as_csr(G)
+    graphs[memory_key] = G
+    return G
+
+def generate_graph_from_city(city: str, network_type: str='drive', compiled: bool=False):
+    """Prüft, ob bereits ein Graph zu der angegebenen Stadt existiert und holt diesen oder erstellt diesen je nachdem.
+    """
+    params = {'place': city, 'network_type': network_type}
+    return _cached_graph('place', params, lambda: _osmnx().graph_from_place(city, network_type=network_type), compiled)
+
+def coords_to_bbox(orig_coords: tuple, dest_coords: tuple):
+    """Bestimmt die BBox (north, south, east, west), die beide Koordinaten sowie ein wenig Abstand zum Rand enthält."""
+    # using this, the bbox gets slighty bigger resulting in a more usable graph
+    if orig_coords[0] > dest_coords[0]:
+        north = orig_coords[0] * 1.00015
+        south = dest_coords[0] * 0.99985
+    else:        
+        north = dest_coords[0] * 1.00015
+        south = orig_coords[0] * 0.99985
+
+    if orig_coords[1] > dest_coords[1]:
+        west = dest_coords[1] * 0.9993
+        east = orig_coords[1] * 1.0007
+    else:
+        west = orig_coords[1] * 0.9993
+        east = dest_coords[1] * 1.0007
+
+    return north, south, east, west
 
-def generate_graph_from_coords(orig_coords: tuple, dest_coords: tuple):
+def generate_graph_from_coords(orig_coords: tuple, dest_coords: tuple, network_type: str='all_private', compiled: bool=False):
     """Prüft, ob bereits ein Graph zu den angegebenen Koordinaten existiert und holt diesen oder erstellt diesen je nachdem. 
     Der Graph enthält mind. die Koordinaten sowie ein wenig Abstand zum Rand von den Koordinaten aus.
+    Der Schlüssel ist die BBox selbst, sodass verschiedene BBoxen nicht mehr kollidieren können.
     """
-    key = str(hash(orig_coords[0] + dest_coords[0] + orig_coords[1] + dest_coords[1]))
-    if graphs.get(key, "-1") != "-1":
-        print("**** graph fetched ****")
-        return graphs[key]
-    else:
-        # using this, the bbox gets slighty bigger resulting in a more usable graph
-        if orig_coords[0] > dest_coords[0]:
-            north = orig_coords[0] * 1.00015
-            south = dest_coords[0] * 0.99985
-        else:        
-            north = dest_coords[0] * 1.00015
-            south = orig_coords[0] * 0.99985
-
-        if orig_coords[1] > dest_coords[1]:
-            west = dest_coords[1] * 0.9993
-            east = orig_coords[1] * 1.0007
-        else:
-            west = orig_coords[1] * 0.9993
-            east = dest_coords[1] * 1.0007
-
-        G = ox.graph_from_bbox(north, south, east, west)
-        graphs[key] = G
-        print("**** graph created ****")
-        return G
+    north, south, east, west = coords_to_bbox(orig_coords, dest_coords)
+    params = {'bbox': (north, south, east, west), 'network_type': network_type}
+    return _cached_graph('bbox', params, lambda: _osmnx().graph_from_bbox(north, south, east, west, network_type=network_type), compiled)
 
-def generate_graph_from_address(address: str, distance: int):
+def generate_graph_from_tiles(orig_coords: tuple, dest_coords: tuple, network_type: str='drive', margin: float=0.05):
+    """Setzt den Graphen für eine Anfrage aus den Kacheln entlang des Korridors zusammen (siehe tiles.py), statt je
+    Start-Ziel-Paar eine eigene BBox zu laden. Gibt einen CSRGraph zurück; einmal geladene Kacheln werden wiederverwendet.
+    """
+    if network_type not in tile_stores:
+        tile_stores[network_type] = TileStore(network_type=network_type)
+    return tile_stores[network_type].graph_for(orig_coords, dest_coords, margin)
+
+def generate_graph_from_address(address: str, distance: int, network_type: str='all_private', compiled: bool=False):
     """Prüft, ob bereits ein Graph zu der angegebenen Adresse existiert und holt diesen oder erstellt diesen je nachdem.
     Die distance bestimmt die Größe des Ergebnisgraphen.
     """
-    key = address + str(distance) + '-add'
-    if graphs.get(key, "-1") != "-1":
-        print("**** graph fetched ****")
-        return graphs[key]
-    else:
-        G = ox.graph_from_address(address=address, distance=distance)
-        graphs[key] = G
-        print("**** graph created ****")
-        return G
+    params = {'address': address, 'distance': distance, 'network_type': network_type}
+    return _cached_graph('address', params, lambda: _osmnx().graph_from_address(address=address, distance=distance, network_type=network_type), compiled)
+
+def generate_graph_from_file(path: str, network_type: str='drive', bbox: tuple=None):
+    """Erstellt den Graphen aus einem lokalen OSM-Auszug (.osm/.osm.pbf, siehe osmloader.py) ohne Netzwerkzugriff und ohne
+    networkx. Gibt immer die CSR-Form zurück; Änderungszeit und Größe der Datei gehen in den Schlüssel ein, sodass ein
+    neuer Auszug nicht den alten Graphen liefert.
+    """
+    from osmloader import graph_from_osm_file
+    path = os.path.abspath(path)
+    info = os.stat(path)
+    params = {'path': path, 'mtime': info.st_mtime_ns, 'size': info.st_size, 'network_type': network_type, 'bbox': bbox}
+    return _cached_graph('file', params, lambda: graph_from_osm_file(path, network_type, bbox), compiled=True)
+
+def load_graph(spec: str):
+    """Lädt einen Graphen zu spec:
+    * csr:<Verzeichnis>   mit csr.save_csr gespeicherter Graph (eingeblendet)
+    * city:<Stadt>        Stadtgraph (persistenter Cache bzw. osmnx)
+    * osm:<Datei>[@network_type]  lokaler OSM-Auszug (osmloader.py), Standard drive
+    * grid:<n>, geometric:<n>  synthetische Graphen aus benchmark.py (ohne Netzwerkzugriff)
+    """
+    kind, _, value = spec.partition(':')
+    if kind == 'csr':
+        return load_csr(value)
+    if kind == 'city':
+        return generate_graph_from_city(value, compiled=True)
+    if kind == 'osm':
+        path, _, network_type = value.rpartition('@')
+        if not path or os.sep in network_type:
+            path, network_type = value, 'drive'
+        return generate_graph_from_file(path, network_type)
+    if kind in ('grid', 'geometric'):
+        from benchmark import geometric_graph, grid_graph
+        return grid_graph(int(value)) if kind == 'grid' else geometric_graph(int(value))
+    raise ValueError(f"Unbekannte Graphenangabe: {spec}")
 
 def get_area_and_basic_stats(graph):
     """
     Gibt Fläche in km2 an und holt sich Daten zum Graphen.
     """
+    ox = _osmnx()
     G_proj = ox.project_graph(graph)
     nodes_proj = ox.graph_to_gdfs(G_proj, edges=False)
     graph_area_m = nodes_proj.unary_union.convex_hull.area
@@ -81,4 +148,4 @@ def get_area_and_basic_stats(graph):
 def plot_graph(graph, height):
     """Plottet einen Graphen. Ungenutzt.
     """
-    fig, ax = ox.plot_graph(graph, fig_height=height)
\ No newline at end of file
+    fig, ax = _osmnx().plot_graph(graph, fig_height=height)
\ No newline at end of file
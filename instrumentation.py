@@ -0,0 +1,95 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+"""Diese Datei stellt die Messwerte einer Routenanfrage als Objekt (SearchStats) bereit.
+
+Die Algorithmen geben weiterhin ihr bisheriges count zurück, dessen Bedeutung sich je Algorithmus unterscheidet
+(Dijkstra zählt z.B. je verbessernder Kante doppelt). Wird zusätzlich ein SearchStats übergeben, füllt jede Suche dieselben
+Kennzahlen:
+    * labelled:      Knoten, die einen Abstand erhalten haben
+    * settled:       abgeschlossene Knoten (pops aus der Warteschlange)
+    * relaxations:   betrachtete Kanten
+    * pushes, pops, decrease_keys: Operationen auf den Prioritätswarteschlangen
+    * max_frontier:  größte Länge der Warteschlange(n) während der Suche
+    * phases:        Laufzeit je Phase in Sekunden (snap, search, path, render)
+
+Optional kann ein Tracer tracer(event, node, value) angegeben werden, der für jeden Knoten aufgerufen wird:
+'label' (node hat den Abstand/Schlüssel value erhalten) und 'settle' (node wurde mit Abstand value abgeschlossen).
+node ist die ursprüngliche Knoten-ID. Ohne SearchStats bzw. Tracer kostet das in den Schleifen nur einen Vergleich mit None.
+
+Beispiel:
+    stats = SearchStats('a-star', tracer=lambda event, node, value: print(event, node, value))
+    find_route('a-star', G, orig_node, dest_node, stats)
+    print(stats)
+"""
+
+COUNTERS = ('labelled', 'settled', 'relaxations', 'pushes', 'pops', 'decrease_keys', 'max_frontier')
+PHASES = ('snap', 'search', 'path', 'render')
+
+class SearchStats:
+    """Kennzahlen einer Anfrage; lässt sich loggen (str, as_dict) und über mehrere Anfragen aufsummieren (total)."""
+
+    def __init__(self, algorithm: str=None, tracer=None):
+        self.algorithm = algorithm
+        self.tracer = tracer
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.phases = {}
+
+    def record(self, labelled, relaxations: int, *queues):
+        """Übernimmt die Kennzahlen einer Suche: markierte Knoten, betrachtete Kanten und die Zähler der Warteschlangen.
+        Ohne Warteschlangen (Bellman-Ford, Floyd-Warshall) gelten alle markierten Knoten als abgeschlossen.
+        """
+        self.labelled = len(labelled)
+        self.relaxations = int(relaxations)
+        self.pushes = sum(q.pushes for q in queues)
+        self.pops = sum(q.pops for q in queues)
+        self.decrease_keys = sum(q.updates for q in queues)
+        self.max_frontier = sum(q.max_size for q in queues)
+        self.settled = self.pops if queues else self.labelled
+
+    @contextmanager
+    def phase(self, name: str):
+        """Misst die Laufzeit des with-Blocks und addiert sie zur Phase name."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def seconds(self):
+        """Gesamtlaufzeit über alle gemessenen Phasen."""
+        return sum(self.phases.values())
+
+    def as_dict(self):
+        result = {'algorithm': self.algorithm}
+        result.update((name, getattr(self, name)) for name in COUNTERS)
+        result.update((f"{name}_seconds", seconds) for name, seconds in self.phases.items())
+        result['seconds'] = self.seconds
+        return result
+
+    @classmethod
+    def total(cls, stats, algorithm: str=None):
+        """Summiert mehrere SearchStats (max_frontier: Maximum) zu einem neuen Objekt."""
+        result = cls(algorithm)
+        for s in stats:
+            for name in COUNTERS:
+                value = getattr(s, name)
+                setattr(result, name, max(getattr(result, name), value) if name == 'max_frontier' else getattr(result, name) + value)
+            for name, seconds in s.phases.items():
+                result.phases[name] = result.phases.get(name, 0.0) + seconds
+        return result
+
+    def __repr__(self):
+        phases = ", ".join(f"{name}={seconds*1000:.2f}ms" for name, seconds in self.phases.items())
+        counters = ", ".join(f"{name}={getattr(self, name)}" for name in COUNTERS)
+        return f"SearchStats({self.algorithm}: {counters}; {phases})"
+
+def phase(stats, name: str):
+    """Wie stats.phase(name), aber ohne Wirkung, wenn stats None ist."""
+    return nullcontext() if stats is None else stats.phase(name)
+
+def tracer_of(stats):
+    """Gibt den Tracer von stats zurück (None, wenn stats oder der Tracer fehlt)."""
+    return None if stats is None else stats.tracer
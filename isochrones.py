@@ -0,0 +1,103 @@
+import numpy as np
+
+from algorithms import multi_source_dijkstra
+from csr import as_csr
+from instrumentation import SearchStats
+from spatial import spatial_index_for
+
+"""Diese Datei beantwortet Reichweiten-Anfragen ("was ist in X Metern bzw. Minuten von cc.iserlohn erreichbar?").
+
+isochrones führt eine einzige Suche von allen Starts gleichzeitig aus (multi_source_dijkstra), die beim größten Budget
+abbricht. Die erreichten Knoten werden einmal nach Abstand sortiert; die Isochrone eines Budgets ist dann ein Präfix
+dieser Liste. Laufzeit und Speicher hängen so nur vom erreichbaren Gebiet ab, nicht von der Größe des Graphen.
+
+Budgets haben die Einheit der Kantengewichte: mit weight='length' Meter, mit weight='travel_time' Sekunden (z.B. nach
+ox.add_edge_travel_times). Der Umriss (polygons=True) ist die konvexe Hülle der erreichten Knoten.
+
+Beispiel:
+    for iso in isochrones(G, [cc.iserlohn], [1000, 2500, 5000], polygons=True):
+        print(iso.budget, len(iso), cc.hagen in iso)
+"""
+
+class Isochrone:
+    """Erreichbare Knoten (ursprüngliche IDs, nach Abstand sortiert) innerhalb von budget und ggf. ihr Umriss
+    als Liste von (Breite, Länge) gegen den Uhrzeigersinn.
+    """
+
+    def __init__(self, budget: float, nodes: list, dist: np.ndarray, polygon: list=None, index=None):
+        self.budget = budget
+        self.nodes = nodes
+        self.dist = dist
+        self.polygon = polygon
+        self._index = index
+        self._members = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        """node ist eine Knoten-ID oder Koordinaten (Breite, Länge, ...), die auf den nächsten Knoten eingerastet werden."""
+        return self.distance(node) != float('inf')
+
+    def distance(self, node):
+        """Abstand zum nächstgelegenen Start, inf falls node nicht innerhalb des Budgets liegt."""
+        if isinstance(node, tuple):
+            node = self._index.nearest_node(node)
+        if self._members is None:
+            self._members = dict(zip(self.nodes, self.dist.tolist()))
+        return self._members.get(node, float('inf'))
+
+    def __repr__(self):
+        return f"Isochrone({self.budget}: {len(self.nodes)} Knoten)"
+
+def convex_hull(points):
+    """Konvexe Hülle (monotone chain) einer Folge von (x, y); gibt die Eckpunkte gegen den Uhrzeigersinn zurück."""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+def isochrones(G, sources, budgets, polygons: bool=False, weight: str='length', stats: SearchStats=None):
+    """Isochronen zu mehreren Budgets in einem Durchlauf. sources sind Knoten-IDs oder Koordinaten (Breite, Länge, ...),
+    die auf den nächsten Knoten eingerastet werden; gemessen wird jeweils zum nächstgelegenen Start.
+    Gibt je Budget (in der übergebenen Reihenfolge) ein Isochrone-Objekt zurück.
+    """
+    C = as_csr(G, weight)
+    index = spatial_index_for(C)
+    nodes = [index.nearest_node(s) if isinstance(s, tuple) else s for s in sources]
+    budgets = list(budgets)
+    dist, _, _ = multi_source_dijkstra(C, nodes, cutoff=max(budgets), stats=stats)
+
+    # erreichte Knoten einmal nach Abstand sortieren, jedes Budget ist ein Präfix
+    result = dist.result
+    order = np.argsort(result.dist, kind='stable')
+    reached = result.nodes[order]
+    distances = result.dist[order]
+    ids = C.ids()
+
+    isos = []
+    for budget in budgets:
+        k = int(np.searchsorted(distances, budget, side='right'))
+        inside = reached[:k]
+        polygon = None
+        if polygons:
+            # Hülle in (Länge, Breite) bilden, zurückgegeben wird (Breite, Länge) wie in constantCoords
+            xs, ys = C.x[inside], C.y[inside]
+            valid = np.isfinite(xs) & np.isfinite(ys)
+            hull = convex_hull(zip(xs[valid].tolist(), ys[valid].tolist()))
+            polygon = [(lat, lon) for lon, lat in hull]
+        isos.append(Isochrone(budget, [ids[v] for v in inside.tolist()], distances[:k], polygon, index))
+    return isos
@@ -0,0 +1,154 @@
+import random
+
+import numpy as np
+
+from algorithms import a_star, shortest_path_tree
+from csr import as_csr
+
+"""Diese Datei stellt Landmarken für A-Stern bereit (ALT: A*, Landmarks, Triangle inequality).
+
+Für k ausgewählte Landmarken L werden die Abstände d(L, v) (vorwärts) und d(v, L) (rückwärts) zu allen Knoten vorberechnet.
+Aus der Dreiecksungleichung folgt für jeden Knoten v und das Ziel t die untere Schranke
+    d(v, t) >= max( d(L, t) - d(L, v), d(v, L) - d(t, L) ),
+die auf Straßengraphen mit Flüssen oder Bergen (z.B. im Sauerland) deutlich schärfer ist als die Luftlinie.
+"""
+
+class Landmarks:
+    """Vorberechnete Landmarken eines Graphen.
+
+    * nodes:    Knoten-Indizes der Landmarken
+    * forward:  k x n Matrix mit d(L, v)
+    * backward: k x n Matrix mit d(v, L)
+    """
+
+    def __init__(self, nodes, forward, backward):
+        self.nodes = nodes
+        self.forward = forward
+        self.backward = backward
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def bound_to(self, t: int):
+        """Untere Schranke d(v, t) für alle Knoten v (Index t) als Liste; nicht auswertbare Landmarken zählen als 0."""
+        with np.errstate(invalid='ignore'):
+            ahead = self.forward[:, t][:, None] - self.forward
+            behind = self.backward - self.backward[:, t][:, None]
+        bounds = np.fmax(ahead, behind)
+        bounds[~np.isfinite(bounds)] = 0
+        return np.maximum(bounds.max(axis=0), 0).tolist()
+
+    def bound_from(self, s: int):
+        """Untere Schranke d(s, v) für alle Knoten v (Index s) als Liste."""
+        with np.errstate(invalid='ignore'):
+            ahead = self.forward - self.forward[:, s][:, None]
+            behind = self.backward[:, s][:, None] - self.backward
+        bounds = np.fmax(ahead, behind)
+        bounds[~np.isfinite(bounds)] = 0
+        return np.maximum(bounds.max(axis=0), 0).tolist()
+
+def _farthest(C, k, rng):
+    """Wählt wiederholt den Knoten, der von den bisherigen Landmarken am weitesten entfernt ist (Start: zufälliger Knoten)."""
+    start = rng.randrange(len(C))
+    dist, _ = shortest_path_tree(C, start)
+    nearest = np.array(dist)
+    chosen = []
+    while len(chosen) < k:
+        candidates = np.where(np.isfinite(nearest), nearest, -1)
+        candidates[chosen] = -1
+        v = int(np.argmax(candidates))
+        if candidates[v] < 0:
+            break
+        chosen.append(v)
+        dist, _ = shortest_path_tree(C, v)
+        nearest = np.minimum(nearest, dist) if len(chosen) > 1 else np.array(dist)
+    return chosen
+
+def _avoid(C, k, rng, chosen):
+    """Avoid-Strategie nach Goldberg/Werneck: in einem Kürzeste-Wege-Baum von einer zufälligen Wurzel r bekommt jeder Knoten
+    das Gewicht d(r, v) - Schranke(r, v). Ausgehend von r wird jeweils in den schwersten Teilbaum ohne Landmarke abgestiegen,
+    das erreichte Blatt wird die nächste Landmarke. So landen neue Landmarken dort, wo die bisherigen schlecht abschätzen.
+    Ist der Baum einer Wurzel bereits abgedeckt, wird eine neue Wurzel gezogen (höchstens 4k Versuche).
+    """
+    chosen = list(chosen)
+    attempts = 0
+    while len(chosen) < k and attempts < 4 * k:
+        attempts += 1
+        current = _compute(C, chosen)
+        root = rng.randrange(len(C))
+        dist, pred = shortest_path_tree(C, root)
+        lower = current.bound_from(root)
+
+        # Knoten von den Blättern zur Wurzel (absteigender Abstand) abarbeiten und Teilbaumgewichte aufsummieren
+        reached = sorted((v for v in range(len(C)) if dist[v] != float('inf')), key=lambda v: -dist[v])
+        size = [0.0] * len(C)
+        covered = [False] * len(C)
+        for v in chosen:
+            covered[v] = True
+        children = {}
+        for v in reached:
+            size[v] += dist[v] - lower[v]
+            p = pred[v]
+            if p != -1:
+                children.setdefault(p, []).append(v)
+                size[p] += size[v]
+                covered[p] = covered[p] or covered[v]
+
+        v = root
+        while v in children:
+            candidates = [c for c in children[v] if not covered[c]]
+            if not candidates:
+                break
+            v = max(candidates, key=lambda c: size[c])
+        if covered[v]:
+            continue # der gesamte Baum dieser Wurzel ist bereits abgedeckt
+        chosen.append(v)
+    return chosen
+
+def _compute(C, nodes):
+    forward = np.array([shortest_path_tree(C, v)[0] for v in nodes], dtype=np.float64)
+    backward = np.array([shortest_path_tree(C, v, reverse=True)[0] for v in nodes], dtype=np.float64)
+    return Landmarks(np.array(nodes, dtype=np.int32), forward, backward)
+
+def select_landmarks(G, k: int=8, strategy: str='farthest', seed: int=None):
+    """Wählt k Landmarken ('farthest' oder 'avoid') und berechnet ihre Abstandsfelder.
+    Das Ergebnis wird an der CSR-Form von G gespeichert (siehe landmarks_for).
+    """
+    C = as_csr(G)
+    rng = random.Random(seed)
+    if strategy == 'farthest':
+        nodes = _farthest(C, k, rng)
+    elif strategy == 'avoid':
+        # mit einer "farthest"-Landmarke beginnen, damit die Schranken nicht bei 0 starten
+        nodes = _avoid(C, k, rng, _farthest(C, 1, rng))
+    else:
+        raise ValueError(f"Unbekannte Strategie: {strategy}")
+
+    L = _compute(C, nodes)
+    C.artefacts['landmarks'] = L
+    return L
+
+def landmarks_for(G, **kwargs):
+    """Gibt die am Graphen gespeicherten Landmarken zurück bzw. wählt sie beim ersten Aufruf."""
+    C = as_csr(G)
+    if 'landmarks' not in C.artefacts:
+        select_landmarks(C, **kwargs)
+    return C.artefacts['landmarks']
+
+def compare_heuristics(G, pairs, landmarks=None):
+    """Vergleicht A-Stern mit Haversine und mit ALT auf den gegebenen (start, dest)-Paaren (Knoten-IDs).
+    Gibt je Paar ein Dictionary mit besuchten Knoten und Operationen beider Varianten zurück.
+    """
+    if landmarks is None:
+        landmarks = landmarks_for(G)
+    stats = []
+    for start, dest in pairs:
+        dist, _, count = a_star(G, start, dest)
+        dist_alt, _, count_alt = a_star(G, start, dest, landmarks=landmarks)
+        stats.append({
+            'start': start, 'dest': dest,
+            'length': dist.get(dest), 'length_alt': dist_alt.get(dest),
+            'visited': len(dist), 'visited_alt': len(dist_alt),
+            'count': count, 'count_alt': count_alt,
+        })
+    return stats
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlencode
+
+from service import read_message
+
+"""Diese Datei enthält einen lokalen Lasttest für den Routing-Dienst (service.py).
+
+concurrency Clients schicken über je eine Keep-Alive-Verbindung insgesamt requests Anfragen. Start und Ziel werden
+zufällig in der Ausdehnung des Graphen gewählt (GET /graphs); die Starts stammen aus einem Vorrat von origins Punkten,
+sodass sich gleichzeitige Anfragen Starts teilen und der Dienst sie bündeln kann.
+
+Ausgegeben werden Durchsatz (Anfragen/s), p50/p90/p99-Latenz der erfolgreichen Anfragen, die Anzahl der abgelehnten (429),
+abgelaufenen (504) und fehlerhaften Anfragen sowie der Anteil gebündelt beantworteter Anfragen.
+
+Beispiel:
+    python loadtest.py --port 8080 --requests 2000 --concurrency 32 --origins 20
+"""
+
+async def _connect(host: str, port: int, path: str=None):
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+async def request(reader, writer, target: str):
+    """Schickt GET target über eine bestehende Verbindung und gibt (Status, JSON-Antwort) zurück."""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    message = await read_message(reader)
+    if message is None:
+        raise ConnectionError("Verbindung vom Dienst geschlossen")
+    line, _, body = message
+    return int(line.split(' ', 2)[1]), json.loads(body)
+
+def percentile(values, p: float):
+    """p-Perzentil (0-100) nach dem Nearest-Rank-Verfahren, None bei leerer Liste."""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(int(-(-p * len(values) // 100)), 1)
+    return values[rank - 1]
+
+def make_queries(bbox, requests: int, origins: int, seed: int=0):
+    """Reproduzierbare Anfragen ((Breite, Länge), (Breite, Länge)) in bbox = (north, south, east, west)."""
+    rng = random.Random(seed)
+    north, south, east, west = bbox
+    point = lambda: (round(rng.uniform(south, north), 6), round(rng.uniform(west, east), 6))
+    starts = [point() for _ in range(origins)]
+    return [(rng.choice(starts), point()) for _ in range(requests)]
+
+async def run_loadtest(host: str='127.0.0.1', port: int=8080, path: str=None, graph: str=None, requests: int=1000,
+                       concurrency: int=16, origins: int=50, algorithm: str=None, seed: int=0):
+    """Führt den Lasttest aus und gibt die Kennzahlen als Dictionary zurück."""
+    reader, writer = await _connect(host, port, path)
+    _, info = await request(reader, writer, '/graphs')
+    writer.close()
+    graphs = {g['name']: g for g in info['graphs']}
+    graph = graph or next(iter(graphs))
+    queries = make_queries(graphs[graph]['bbox'], requests, origins, seed)
+
+    latencies = []
+    statuses = {}
+    batched = 0
+    next_query = iter(queries)
+
+    async def client():
+        nonlocal batched
+        reader, writer = await _connect(host, port, path)
+        try:
+            for orig, dest in next_query:
+                params = {'graph': graph, 'orig': f"{orig[0]},{orig[1]}", 'dest': f"{dest[0]},{dest[1]}", 'nodes': 0}
+                if algorithm:
+                    params['algorithm'] = algorithm
+                start = time.perf_counter()
+                status, payload = await request(reader, writer, '/route?' + urlencode(params))
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(time.perf_counter() - start)
+                    batched += payload['batch'] > 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    ms = lambda value: None if value is None else value * 1000
+    return {
+        'graph': graph, 'requests': requests, 'concurrency': concurrency, 'origins': origins, 'seconds': seconds,
+        'throughput': requests / seconds, 'ok': statuses.get(200, 0), 'rejected': statuses.get(429, 0),
+        'timeouts': statuses.get(504, 0), 'errors': sum(n for s, n in statuses.items() if s not in (200, 429, 504)),
+        'batched': batched / max(len(latencies), 1),
+        'p50_ms': ms(percentile(latencies, 50)), 'p90_ms': ms(percentile(latencies, 90)), 'p99_ms': ms(percentile(latencies, 99)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lasttest für den Routing-Dienst (service.py).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="Unix-Socket statt TCP")
+    parser.add_argument('--graph', help="Name des Graphen (Standard: der erste)")
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--origins', type=int, default=50, help="Anzahl verschiedener Starts")
+    parser.add_argument('--algorithm')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Ergebnis als JSON schreiben")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_loadtest(args.host, args.port, args.unix, args.graph, args.requests, args.concurrency,
+                                      args.origins, args.algorithm, args.seed))
+    fmt = lambda value: '-' if value is None else f"{value:.1f}"
+    print(f"= Anfragen: {result['requests']} ({result['concurrency']} gleichzeitig, {result['origins']} Starts) \
+    \n= Durchsatz: {result['throughput']:.1f} Anfragen/s ({result['seconds']:.2f} s) \
+    \n= Latenz (ms): p50 {fmt(result['p50_ms'])}, p90 {fmt(result['p90_ms'])}, p99 {fmt(result['p99_ms'])} \
+    \n= Erfolgreich/abgelehnt/Zeitlimit/Fehler: {result['ok']}/{result['rejected']}/{result['timeouts']}/{result['errors']} \
+    \n= Gebündelt beantwortet: {result['batched']:.0%}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import heapq
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from csr import CSRGraph, load_csr, save_csr
+
+"""Diese Datei enthält die Matrix-Engines für Floyd-Warshall und Johnson sowie eine schlanke Sicht (MatrixView) auf die Ergebnis-Matrizen.
+
+Die Matrizen liegen als numpy-Arrays vor (Abstände float32/float64, Nachfolger int32 mit -1 für "kein Weg") und können
+optional per np.memmap auf der Festplatte liegen. So passen auch Graphen mit einigen tausend Knoten in den Speicher.
+
+Johnson (johnson_matrix) rechnet je Start einen Dijkstra auf den umgewichteten, nicht-negativen Kanten, also
+O(V·(E + V log V)) statt Θ(V³); bei Straßengraphen (E ≈ 2.5 V) ist das um Größenordnungen schneller. Die Starts werden
+blockweise auf einen Prozesspool verteilt, jeder Worker schreibt seine Zeilen direkt in die eingeblendeten Matrizen.
+"""
+
+def floyd_warshall_matrix(C, dtype=np.float64, memmap_dir: str=None, progress=None, block: int=1024):
+    """Floyd-Warshall auf einem CSRGraph. Für jedes k werden die Zeilen blockweise (block Zeilen auf einmal) mit numpy aktualisiert,
+    Blöcke ohne Weg nach k werden übersprungen.
+
+    * dtype: float32 halbiert den Speicherbedarf, float64 ist genauer
+    * memmap_dir: falls gesetzt, werden die Matrizen dort als dist.dat/succ.dat per np.memmap abgelegt
+    * progress: optionaler Callback progress(k, n), der nach jedem k aufgerufen wird
+
+    Rückgabe: dist (n x n), succ (n x n, int32) und die Anzahl der verglichenen Zellen.
+    """
+    n = len(C)
+    if memmap_dir is None:
+        dist = np.full((n, n), np.inf, dtype=dtype)
+        succ = np.full((n, n), -1, dtype=np.int32)
+    else:
+        dist = np.memmap(f"{memmap_dir}/dist.dat", dtype=dtype, mode='w+', shape=(n, n))
+        succ = np.memmap(f"{memmap_dir}/succ.dat", dtype=np.int32, mode='w+', shape=(n, n))
+        dist[:] = np.inf
+        succ[:] = -1
+
+    # Kanten eintragen (parallele Kanten sind in C bereits auf die kürzeste reduziert); gesperrte Kanten (Gewicht ∞)
+    # bekommen keinen Nachfolger, sonst führte succ über sie hinweg
+    sources, targets, weights = C.edges()
+    finite = np.isfinite(weights)
+    dist[sources, targets] = weights
+    succ[sources[finite], targets[finite]] = targets[finite]
+    diagonal = np.arange(n)
+    dist[diagonal, diagonal] = 0
+    succ[diagonal, diagonal] = diagonal
+
+    count = 0
+    for k in range(n):
+        row_k = np.array(dist[k])
+        for start in range(0, n, block):
+            # Zeilenblock als View, damit in-place aktualisiert wird (auch bei memmap)
+            D = dist[start:start + block]
+            via = D[:, k]
+            if not np.isfinite(via).any():
+                continue
+            candidate = via[:, None] + row_k[None, :]
+            better = candidate < D
+            count += D.size
+            if better.any():
+                S = succ[start:start + block]
+                np.copyto(D, candidate, where=better)
+                np.copyto(S, S[:, k:k + 1], where=better)
+        if progress is not None:
+            progress(k + 1, n)
+
+    return dist, succ, count
+
+def _johnson_rows(C, potential, dist, succ, sources):
+    """Dijkstra auf dem umgewichteten Graphen C je Start in sources; schreibt die Zeilen dist[s] (Abstände mit den
+    ursprünglichen Gewichten) und succ[s] (erster Knoten auf dem Weg). Gibt die Anzahl betrachteter Kanten zurück.
+    """
+    off, tgt, wgt = C.adjacency()
+    n = len(C)
+    h = None if potential is None else np.asarray(potential, dtype=np.float64)
+    inf = float('inf')
+    count = 0
+    for s in sources:
+        d = [inf] * n
+        pred = [-1] * n
+        d[s] = 0.0
+        order = []
+        heap = [(0.0, s)]
+        while heap:
+            du, u = heapq.heappop(heap)
+            if du > d[u]:
+                continue
+            order.append(u)
+            for e in range(off[u], off[u + 1]):
+                v = tgt[e]
+                if du + wgt[e] < d[v]:
+                    d[v] = du + wgt[e]
+                    pred[v] = u
+                    heapq.heappush(heap, (d[v], v))
+            count += off[u + 1] - off[u]
+
+        # erster Knoten je Ziel in Abschlussreihenfolge: der Vorgänger ist immer schon bestimmt
+        first = [-1] * n
+        first[s] = s
+        for v in order[1:]:
+            p = pred[v]
+            first[v] = v if p == s else first[p]
+
+        row = np.array(d)
+        if h is not None:
+            row += h - h[s] # d(s, v) = d'(s, v) - h(s) + h(v)
+        dist[s] = row
+        succ[s] = first
+    return count
+
+_johnson_worker = None
+
+def _init_johnson_worker(graph_dir: str, matrix_dir: str, n: int, dtype, potential):
+    """Initialisiert einen Worker-Prozess: Graph und Matrizen einblenden (siehe parallel.py)."""
+    global _johnson_worker
+    dist = np.memmap(os.path.join(matrix_dir, 'dist.dat'), dtype=dtype, mode='r+', shape=(n, n))
+    succ = np.memmap(os.path.join(matrix_dir, 'succ.dat'), dtype=np.int32, mode='r+', shape=(n, n))
+    _johnson_worker = (load_csr(graph_dir, mmap=True), potential, dist, succ)
+
+def _johnson_block(sources):
+    C, potential, dist, succ = _johnson_worker
+    count = _johnson_rows(C, potential, dist, succ, sources)
+    dist.flush()
+    succ.flush()
+    return len(sources), count
+
+def _reweighted(C, potential):
+    """C mit den Kantengewichten w(u, v) + h(u) - h(v) (unverändert, falls potential None ist)."""
+    weights = np.asarray(C.weights, dtype=np.float64)
+    if potential is not None:
+        sources, targets, _ = C.edges()
+        # umgewichtete Kanten sind >= 0; Rundungsfehler um 0 werden abgeschnitten
+        weights = np.maximum(weights + potential[sources] - potential[targets], 0.0)
+    return CSRGraph(C.node_ids, C.offsets, C.targets, weights, C.x, C.y, C.weight)
+
+def johnson_rows(C, potential, sources):
+    """Nur die Zeilen der Starts sources (Indizes) nach Johnson, ohne n x n Matrizen: je Start ein Dijkstra auf dem
+    umgewichteten Graphen. Rückgabe: {Start: Abstände (numpy, Länge n)} und die Anzahl der betrachteten Kanten.
+    """
+    dist, succ = {}, {}
+    count = _johnson_rows(_reweighted(C, potential), potential, dist, succ, sources)
+    return dist, count
+
+def johnson_matrix(C, potential=None, dtype=np.float64, memmap_dir: str=None, workers: int=None, progress=None,
+                   block: int=64):
+    """Alle Paare nach Johnson auf einem CSRGraph. potential ist das Potential h (Abstände von einem virtuellen Start,
+    siehe algorithms.johnson) oder None, wenn keine negativen Kanten vorkommen.
+
+    * dtype, memmap_dir, progress(k, n): wie bei floyd_warshall_matrix, progress wird nach jedem Block von Starts aufgerufen
+    * workers: Anzahl der Prozesse (None = os.cpu_count()); mit 1 wird im aktuellen Prozess gerechnet
+    * block: Starts je Auftrag an einen Worker
+
+    Rückgabe: dist (n x n), succ (n x n, int32) und die Anzahl der betrachteten Kanten.
+    """
+    n = len(C)
+    R = _reweighted(C, potential)
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or n <= block:
+        if memmap_dir is None:
+            dist = np.empty((n, n), dtype=dtype)
+            succ = np.empty((n, n), dtype=np.int32)
+        else:
+            dist = np.memmap(f"{memmap_dir}/dist.dat", dtype=dtype, mode='w+', shape=(n, n))
+            succ = np.memmap(f"{memmap_dir}/succ.dat", dtype=np.int32, mode='w+', shape=(n, n))
+        count = 0
+        for start in range(0, n, block):
+            count += _johnson_rows(R, potential, dist, succ, range(start, min(start + block, n)))
+            if progress is not None:
+                progress(min(start + block, n), n)
+        return dist, succ, count
+
+    directory = tempfile.mkdtemp(prefix='ss2020-johnson-')
+    try:
+        graph_dir = os.path.join(directory, 'graph')
+        matrix_dir = memmap_dir or directory
+        save_csr(R, graph_dir)
+        dist = np.memmap(f"{matrix_dir}/dist.dat", dtype=dtype, mode='w+', shape=(n, n))
+        succ = np.memmap(f"{matrix_dir}/succ.dat", dtype=np.int32, mode='w+', shape=(n, n))
+        dist.flush()
+        succ.flush()
+
+        count = 0
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_johnson_worker,
+                                 initargs=(graph_dir, matrix_dir, n, dtype, potential)) as executor:
+            futures = [executor.submit(_johnson_block, range(start, min(start + block, n))) for start in range(0, n, block)]
+            for future in as_completed(futures):
+                rows, edges = future.result()
+                done += rows
+                count += edges
+                if progress is not None:
+                    progress(done, n)
+        if memmap_dir is None:
+            # ohne memmap_dir liegen die Ergebnisse wie bei Floyd-Warshall im Speicher
+            dist, succ = np.array(dist), np.array(succ)
+        return dist, succ, count
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def matrix_path(succ, i: int, j: int):
+    """Rekonstruiert den Pfad von i nach j (Indizes) direkt aus der Nachfolger-Matrix. Leere Liste, falls kein Weg existiert."""
+    if succ[i, j] < 0:
+        return []
+    path = [i]
+    while i != j:
+        i = int(succ[i, j])
+        path.append(i)
+    return path
+
+class MatrixView:
+    """Sicht auf eine n x n Matrix, die sich wie das frühere dict-of-dicts verhält: view[u][v] mit den ursprünglichen Knoten-IDs.
+    Die Werte werden erst beim Zugriff übersetzt; missing ersetzt leere Einträge (∞ bzw. -1).
+    Ist nodes gesetzt, wird der Eintrag als Knoten-Index interpretiert und auf die Knoten-ID abgebildet (Nachfolger-Matrix);
+    distances ist dann die zugehörige Abstandsmatrix, mit der path unerreichbare Paare erkennt.
+    """
+
+    def __init__(self, array, C, missing, nodes: bool=False, distances=None):
+        self.array = array
+        self.graph = C
+        self.missing = missing
+        self.nodes = nodes
+        self.distances = distances
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __iter__(self):
+        return iter(self.graph.ids())
+
+    def keys(self):
+        return self.graph.ids()
+
+    def __getitem__(self, u):
+        return _RowView(self, self.graph.to_index(u))
+
+    def translate(self, value):
+        if self.nodes:
+            return self.missing if value < 0 else self.graph.to_id(int(value))
+        return self.missing if not np.isfinite(value) else value.item()
+
+    def path(self, u, v):
+        """Pfad von u nach v als Liste von Knoten-IDs (nur für Nachfolger-Matrizen), None falls v unerreichbar ist."""
+        i, j = self.graph.to_index(u), self.graph.to_index(v)
+        if self.array[i, j] < 0 or (self.distances is not None and not np.isfinite(self.distances[i, j])):
+            return None
+        ids = self.graph.ids()
+        return [ids[k] for k in matrix_path(self.array, i, j)]
+
+class _RowView:
+    """Eine Zeile einer MatrixView."""
+
+    def __init__(self, view, i):
+        self._view = view
+        self._i = i
+
+    def __getitem__(self, v):
+        return self._view.translate(self._view.array[self._i, self._view.graph.to_index(v)])
+
+    def __iter__(self):
+        return iter(self._view.keys())
+
+    def __len__(self):
+        return len(self._view)
+
+    def keys(self):
+        return self._view.keys()
+
+    def values(self):
+        return [self._view.translate(value) for value in self._view.array[self._i]]
+
+    def items(self):
+        return zip(self.keys(), self.values())
@@ -0,0 +1,281 @@
+import argparse
+import bz2
+import gzip
+import re
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+
+import numpy as np
+
+from csr import CSRGraph, from_arrays, save_csr
+from reduction import largest_component, subgraph
+from utility import haversine_vec
+
+"""Diese Datei lädt Straßengraphen direkt aus einem lokalen OSM-Auszug (.osm, .osm.bz2, .osm.gz oder .osm.pbf), ohne
+Overpass und ohne Umweg über einen networkx-Graphen.
+
+Die Datei wird zweimal gestreamt:
+    1. Wege: nur Wege, die den Filter des network_type erfüllen (dieselben Regeln wie osmnx), werden als flache
+       Knotenlisten (array('q')) samt Fahrtrichtung gemerkt, alle anderen sofort verworfen.
+    2. Knoten: nur die Koordinaten der in Schritt 1 referenzierten Knoten werden übernommen.
+Der Speicherbedarf hängt damit von der Größe des Straßennetzes ab, nicht von der Größe des Auszugs (Gebäude, Flächen und
+Relationen werden nie vollständig gehalten).
+
+Anschließend wird wie bei osmnx vereinfacht: Knoten sind nur Wegenden und Knoten, die mehrfach vorkommen (Kreuzungen,
+Schleifen); die Kantenlänge ist die Summe der Teilstücke (haversine aus utility.py, in Metern). Wie bei graph_from_bbox wird
+erst danach auf die BBox zugeschnitten und nur die größte schwache Zusammenhangskomponente behalten (retain_all=False).
+Das Ergebnis ist direkt ein CSRGraph, der mit directory per save_csr abgelegt wird (später mit load_csr einblendbar).
+
+Die Längen sind minimal kürzer als bei osmnx (EARTH_RADIUS 6371 km statt 6371.009 km), die Luftlinie bleibt so eine
+untere Schranke. .osm.pbf setzt pyosmium voraus (pip install osmium).
+
+Beispiel:
+    python osmloader.py arnsberg-regbez.osm.pbf graphs/drive --network-type drive --bbox 51.45 51.30 7.80 7.45
+"""
+
+# Filter nach osmnx: ein Weg braucht das Tag highway und darf bei keinem der Tags einen Wert haben, auf den der
+# reguläre Ausdruck passt (wie ["tag"!~"..."] in der Overpass-Abfrage)
+_NOT_DRIVE = 'abandoned|bridleway|bus_guideway|construction|corridor|cycleway|elevator|escalator|footway|path|pedestrian|planned|platform|proposed|raceway|steps|track'
+_PRIVATE = ('access', 'private')
+NETWORK_FILTERS = {
+    'drive': [('area', 'yes'), ('highway', _NOT_DRIVE + '|service'), ('motor_vehicle', 'no'), ('motorcar', 'no'),
+              ('service', 'alley|driveway|emergency_access|parking|parking_aisle|private'), _PRIVATE],
+    'drive_service': [('area', 'yes'), ('highway', _NOT_DRIVE), ('motor_vehicle', 'no'), ('motorcar', 'no'),
+                      ('service', 'emergency_access|parking|parking_aisle|private'), _PRIVATE],
+    'walk': [('area', 'yes'), ('highway', 'abandoned|bus_guideway|construction|cycleway|motor|planned|platform|proposed|raceway'),
+             ('foot', 'no'), ('service', 'private'), _PRIVATE],
+    'bike': [('area', 'yes'), ('highway', 'abandoned|bus_guideway|construction|corridor|elevator|escalator|footway|motor|planned|platform|proposed|raceway|steps'),
+             ('bicycle', 'no'), ('service', 'private'), _PRIVATE],
+    'all': [('area', 'yes'), ('highway', 'abandoned|construction|planned|platform|proposed|raceway'), ('service', 'private'), _PRIVATE],
+    'all_private': [('area', 'yes'), ('highway', 'abandoned|construction|planned|platform|proposed|raceway')],
+}
+
+ONEWAY_VALUES = {'yes', 'true', '1', '-1', 'reverse'}
+REVERSED_VALUES = {'-1', 'reverse'}
+# Fußwege sind immer in beide Richtungen begehbar
+BIDIRECTIONAL_NETWORKS = {'walk'}
+
+def way_filter(network_type: str):
+    """Gibt eine Funktion tags -> bool zurück, die entscheidet, ob ein Weg zum Netz network_type gehört."""
+    if network_type not in NETWORK_FILTERS:
+        raise ValueError(f"Unbekannter network_type: {network_type} (erlaubt: {', '.join(NETWORK_FILTERS)})")
+    rules = [(tag, re.compile(pattern)) for tag, pattern in NETWORK_FILTERS[network_type]]
+
+    def keep(tags):
+        if 'highway' not in tags:
+            return False
+        for tag, pattern in rules:
+            value = tags.get(tag)
+            if value is not None and pattern.search(value):
+                return False
+        return True
+    return keep
+
+def way_direction(tags, network_type: str):
+    """0: beide Richtungen, 1: nur in Richtung der Knotenliste, -1: nur entgegen (oneway=-1)."""
+    if network_type in BIDIRECTIONAL_NETWORKS:
+        return 0
+    oneway = tags.get('oneway')
+    if oneway in ONEWAY_VALUES:
+        return -1 if oneway in REVERSED_VALUES else 1
+    if tags.get('junction') == 'roundabout':
+        return 1
+    return 0
+
+class _Ways:
+    """Die gefilterten Wege als flache Knotenliste (refs), Startpositionen (offsets) und Fahrtrichtung je Weg."""
+
+    def __init__(self, network_type: str):
+        self.network_type = network_type
+        self.keep = way_filter(network_type)
+        self.refs = array('q')
+        self.offsets = array('q', [0])
+        self.direction = array('b')
+
+    def add(self, tags, refs):
+        if len(refs) < 2 or not self.keep(tags):
+            return
+        self.refs.extend(refs)
+        self.offsets.append(len(self.refs))
+        self.direction.append(way_direction(tags, self.network_type))
+
+    def __len__(self):
+        return len(self.direction)
+
+class _Nodes:
+    """Koordinaten der benötigten Knoten (sortierte, eindeutige IDs). Gestreamte Knoten werden blockweise gesammelt und
+    vektorisiert abgeglichen, statt jede ID einzeln nachzuschlagen.
+    """
+
+    def __init__(self, ids, block: int=1 << 16):
+        self.ids = ids
+        self.lat = np.full(len(ids), np.nan)
+        self.lon = np.full(len(ids), np.nan)
+        self.block = block
+        self._buffer = ([], [], [])
+
+    def add(self, node, lat, lon):
+        ids, lats, lons = self._buffer
+        ids.append(node)
+        lats.append(lat)
+        lons.append(lon)
+        if len(ids) >= self.block:
+            self.flush()
+
+    def flush(self):
+        ids, lats, lons = self._buffer
+        if ids and len(self.ids):
+            ids = np.array(ids, dtype=np.int64)
+            position = np.searchsorted(self.ids, ids)
+            position[position == len(self.ids)] = 0
+            found = self.ids[position] == ids
+            self.lat[position[found]] = np.array(lats)[found]
+            self.lon[position[found]] = np.array(lons)[found]
+        self._buffer = ([], [], [])
+
+def _open(path: str):
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def _elements(path: str, tag: str):
+    """Streamt die Elemente tag ('node' oder 'way') einer OSM-XML-Datei. Nach jedem Element der obersten Ebene wird der
+    bisher aufgebaute Baum geleert, sodass nie mehr als ein Element im Speicher liegt.
+    """
+    with _open(path) as f:
+        context = ET.iterparse(f, events=('start', 'end'))
+        _, root = next(context)
+        for event, elem in context:
+            if event == 'end' and elem.tag in ('node', 'way', 'relation'):
+                if elem.tag == tag:
+                    yield elem
+                root.clear()
+
+def _read_xml(path: str, ways: _Ways=None, nodes: _Nodes=None):
+    if ways is not None:
+        for elem in _elements(path, 'way'):
+            ways.add({t.get('k'): t.get('v') for t in elem.iterfind('tag')}, [int(nd.get('ref')) for nd in elem.iterfind('nd')])
+    else:
+        for elem in _elements(path, 'node'):
+            nodes.add(int(elem.get('id')), float(elem.get('lat')), float(elem.get('lon')))
+
+def _read_pbf(path: str, ways: _Ways=None, nodes: _Nodes=None):
+    try:
+        import osmium
+    except ImportError:
+        raise ImportError("Für .osm.pbf wird pyosmium benötigt (pip install osmium); alternativ vorher mit "
+                          "'osmium cat auszug.osm.pbf -o auszug.osm' umwandeln") from None
+
+    # je Durchlauf nur den benötigten Rückruf definieren, damit osmium die anderen Elemente gar nicht erst übergibt
+    if ways is not None:
+        class Handler(osmium.SimpleHandler):
+            def way(self, w):
+                ways.add({t.k: t.v for t in w.tags}, [n.ref for n in w.nodes])
+    else:
+        class Handler(osmium.SimpleHandler):
+            def node(self, n):
+                nodes.add(n.id, n.location.lat, n.location.lon)
+    Handler().apply_file(path)
+
+def read_osm(path: str, network_type: str='drive'):
+    """Liest die Wege zu network_type und die Koordinaten ihrer Knoten aus path (zwei Durchläufe, siehe oben)."""
+    read = _read_pbf if path.endswith('.pbf') else _read_xml
+    ways = _Ways(network_type)
+    read(path, ways=ways)
+    nodes = _Nodes(np.unique(np.frombuffer(ways.refs, dtype=np.int64)))
+    read(path, nodes=nodes)
+    nodes.flush()
+    return ways, nodes
+
+def _simplify(ways: _Ways, nodes: _Nodes):
+    """Zerlegt die Wege an Endpunkten (Wegenden und mehrfach vorkommende Knoten) in Kanten.
+    Gibt (Knoten-Index je Ende u, v, Länge in Metern, Richtung) zurück; Indizes beziehen sich auf nodes.ids.
+    """
+    refs = np.frombuffer(ways.refs, dtype=np.int64)
+    offsets = np.frombuffer(ways.offsets, dtype=np.int64)
+    direction = np.frombuffer(ways.direction, dtype=np.int8)
+    idx = np.searchsorted(nodes.ids, refs)
+    known = np.isfinite(nodes.lat)[idx]
+
+    # Teilstück k verbindet die Positionen k und k+1 desselben Weges; Knoten ohne Koordinaten (Rand des Auszugs) trennen
+    last = np.zeros(len(refs), dtype=bool)
+    last[offsets[1:] - 1] = True
+    segment = ~last[:-1] & known[:-1] & known[1:]
+    length = np.where(segment, haversine_vec(nodes.lon[idx[:-1]], nodes.lat[idx[:-1]],
+                                             nodes.lon[idx[1:]], nodes.lat[idx[1:]]) * 1000, 0.0)
+    cumulative = np.concatenate(([0.0], np.cumsum(length)))
+
+    before = np.concatenate(([False], segment))
+    after = np.concatenate((segment, [False]))
+    used = before | after
+    count = np.bincount(idx[used], minlength=len(nodes.ids))
+    endpoint = used & ((count[idx] > 1) | ~before | ~after)
+
+    # zwischen zwei aufeinanderfolgenden Endpunkten liegt genau dann eine Kante, wenn vom ersten ein Teilstück weiterführt
+    ends = np.flatnonzero(endpoint)
+    a, b = ends[:-1], ends[1:]
+    edge = after[a]
+    a, b = a[edge], b[edge]
+    way = np.repeat(np.arange(len(ways)), np.diff(offsets))
+    return idx[a], idx[b], cumulative[b] - cumulative[a], direction[way[a]]
+
+def graph_from_osm_file(path: str, network_type: str='drive', bbox: tuple=None, retain_all: bool=False,
+                        directory: str=None) -> CSRGraph:
+    """Erstellt den Routing-Graphen (CSRGraph, Gewicht 'length' in Metern) zu network_type aus einem lokalen OSM-Auszug.
+    bbox = (north, south, east, west) schneidet wie graph_from_bbox nach dem Vereinfachen zu; mit retain_all=False bleibt
+    nur die größte schwache Zusammenhangskomponente. Mit directory wird der Graph zusätzlich per save_csr abgelegt.
+    """
+    ways, nodes = read_osm(path, network_type)
+    u, v, length, direction = _simplify(ways, nodes)
+    del ways
+
+    # nur Endpunkte werden Knoten des Graphen
+    ids, inverse = np.unique(np.concatenate((u, v)), return_inverse=True)
+    u, v = inverse[:len(u)], inverse[len(u):]
+    x, y = nodes.lon[ids], nodes.lat[ids]
+    node_ids = nodes.ids[ids]
+    del nodes
+
+    forward = direction != -1
+    backward = direction != 1
+    sources = np.concatenate((u[forward], v[backward]))
+    targets = np.concatenate((v[forward], u[backward]))
+    weights = np.concatenate((length[forward], length[backward]))
+
+    if bbox is not None:
+        north, south, east, west = bbox
+        inside = (y <= north) & (y >= south) & (x <= east) & (x >= west)
+        new_index = np.cumsum(inside) - 1
+        keep = inside[sources] & inside[targets]
+        sources, targets, weights = new_index[sources[keep]], new_index[targets[keep]], weights[keep]
+        node_ids, x, y = node_ids[inside], x[inside], y[inside]
+
+    C = from_arrays(node_ids, sources, targets, weights, x, y, 'length')
+    if not retain_all and len(C):
+        # schwache Komponenten = starke Komponenten des ungerichteten Graphen
+        undirected = from_arrays(node_ids, np.concatenate((sources, targets)), np.concatenate((targets, sources)),
+                                 np.concatenate((weights, weights)), x, y)
+        C = subgraph(C, largest_component(undirected))
+
+    print(f"**** graph created from {path} ****")
+    print(f"= Knoten: {len(C)}, Kanten: {C.edge_count} ({network_type})")
+    if directory is not None:
+        save_csr(C, directory)
+    return C
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Routing-Graph (CSR) aus einem lokalen OSM-Auszug erstellen.")
+    parser.add_argument('path', help=".osm, .osm.bz2, .osm.gz oder .osm.pbf")
+    parser.add_argument('directory', help="Zielverzeichnis (später mit --graph csr:<Verzeichnis> nutzbar)")
+    parser.add_argument('--network-type', default='drive', choices=list(NETWORK_FILTERS))
+    parser.add_argument('--bbox', type=float, nargs=4, metavar=('NORTH', 'SOUTH', 'EAST', 'WEST'))
+    parser.add_argument('--retain-all', action='store_true', help="alle Zusammenhangskomponenten behalten")
+    args = parser.parse_args(argv)
+    graph_from_osm_file(args.path, args.network_type, args.bbox, args.retain_all, args.directory)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
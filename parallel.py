@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from csr import as_csr, load_csr, save_csr
+from instrumentation import SearchStats
+from routing import find_route
+from spatial import spatial_index_for
+
+"""Diese Datei verteilt viele Routenberechnungen auf einen Prozesspool.
+
+Der kompilierte Graph wird einmal als .npy-Dateien in ein temporäres Verzeichnis geschrieben und von jedem Worker per
+memmap eingeblendet. Dadurch teilen sich alle Prozesse dieselben Seiten im Page-Cache, statt den Graphen je Job zu pickeln.
+
+Die Ergebnisse kommen als Liste von Dictionaries in der Reihenfolge der Jobs zurück. Schlägt ein Job fehl, enthält sein
+Ergebnis die Fehlermeldung, die übrigen Jobs laufen weiter.
+"""
+
+_worker_graph = None
+
+def _init_worker(directory: str):
+    """Initialisiert einen Worker-Prozess: Graph einblenden (nicht kopieren)."""
+    global _worker_graph
+    _worker_graph = load_csr(directory, mmap=True)
+
+def run_job(C, index: int, job: tuple):
+    """Führt einen Job (Algorithmus, Startkoordinaten, Zielkoordinaten) auf dem CSRGraph C aus.
+    Fehler werden nicht weitergereicht, sondern im Ergebnis vermerkt.
+    """
+    name, orig_coords, dest_coords = job
+    result = {
+        'job': index, 'algorithm': name,
+        'orig': orig_coords[2] if len(orig_coords) > 2 else None,
+        'dest': dest_coords[2] if len(dest_coords) > 2 else None,
+        'orig_node': None, 'dest_node': None, 'length': None, 'route': None,
+        'visited': None, 'count': None, 'seconds': None, 'stats': None, 'error': None,
+    }
+    start = time.perf_counter()
+    stats = SearchStats(name)
+    try:
+        with stats.phase('snap'):
+            orig_node, dest_node = spatial_index_for(C).nearest_nodes([orig_coords, dest_coords])
+        result['orig_node'], result['dest_node'] = orig_node, dest_node
+        dist, pred, count, route = find_route(name, C, orig_node, dest_node, stats)
+        result['length'] = dist[dest_node]
+        result['route'] = route
+        result['visited'] = len(dist)
+        result['count'] = count
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['seconds'] = time.perf_counter() - start
+    result['stats'] = stats.as_dict()
+    return result
+
+def _run_job(index: int, job: tuple):
+    return run_job(_worker_graph, index, job)
+
+def run_jobs(G, jobs, workers: int=None):
+    """Verteilt jobs = [(Algorithmus, Startkoordinaten, Zielkoordinaten), ...] auf einen ProcessPoolExecutor.
+    G kann ein networkx-Graph oder ein CSRGraph sein. workers=None verwendet os.cpu_count() Prozesse.
+    """
+    C = as_csr(G)
+    directory = tempfile.mkdtemp(prefix='ss2020-graph-')
+    try:
+        save_csr(C, directory)
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker, initargs=(directory,)) as executor:
+            futures = [executor.submit(_run_job, index, job) for index, job in enumerate(jobs)]
+            results = []
+            for index, (future, job) in enumerate(zip(futures, jobs)):
+                try:
+                    results.append(future.result())
+                except Exception:
+                    # z.B. abgestürzter Worker-Prozess (BrokenProcessPool)
+                    results.append({'job': index, 'algorithm': job[0], 'error': traceback.format_exc()})
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
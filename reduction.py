@@ -0,0 +1,266 @@
+import numpy as np
+
+from csr import as_csr, from_arrays
+
+"""Diese Datei verkleinert den Suchgraphen in einer Vorverarbeitung (Kern des Graphen).
+
+1. Nur die größte starke Zusammenhangskomponente bleibt erhalten (iterativer Tarjan auf der CSR-Form). Sackgassen-Fragmente,
+   die nicht in beide Richtungen erreichbar sind, fallen weg; wird ein Knoten außerhalb eingerastet, wird das gemeldet.
+2. Ketten von Knoten mit Grad 2 (Kurven ohne Abzweigung, in eine oder beide Richtungen befahrbar) werden zu einer Kante
+   zusammengefasst, deren Gewicht die Summe der Teilstücke ist.
+3. Zu jeder zusammengefassten Kante werden die inneren Knoten gemerkt, sodass Routen wieder auf die vollständige
+   OSM-Geometrie erweitert werden können (ReducedGraph.expand).
+
+Liegt Start oder Ziel im Inneren einer Kette, wird nicht auf ein Kettenende verschoben: ReducedGraph.exits bzw. entries
+liefern die in Fahrtrichtung erreichbaren Kettenenden samt Teilstrecke, gesucht wird dann von jedem Ende aus
+(siehe evaluation._find_route_reduced).
+
+Knoten-IDs bleiben die ursprünglichen OSM-IDs, alle Algorithmen laufen unverändert auf ReducedGraph.graph.
+Die Luftlinien-Heuristiken bleiben zulässig, da eine Kette nie kürzer als die Luftlinie zwischen ihren Enden ist.
+"""
+
+class NodeOutsideComponent(ValueError):
+    """Ein (eingerasteter) Knoten liegt nicht in der größten starken Zusammenhangskomponente."""
+
+    def __init__(self, node):
+        super().__init__(f"Knoten {node} liegt außerhalb der größten starken Zusammenhangskomponente "
+                         "(nicht in beide Richtungen mit dem Rest des Graphen verbunden)")
+        self.node = node
+
+def strongly_connected_components(G):
+    """Starke Zusammenhangskomponenten nach Tarjan (iterativ, ohne Rekursionslimit).
+    Gibt ein Array mit der Komponentennummer je Knoten-Index zurück.
+    """
+    C = as_csr(G)
+    off, tgt, _ = C.adjacency()
+    n = len(C)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = [-1] * n
+    stack = []
+    counter = 0
+    components = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        # Aufrufstapel aus (Knoten, nächste zu betrachtende Kante)
+        work = [(root, off[root])]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            v, e = work[-1]
+            if e < off[v + 1]:
+                work[-1] = (v, e + 1)
+                w = tgt[e]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, off[w]))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = components
+                    if w == v:
+                        break
+                components += 1
+    return np.array(component, dtype=np.int32)
+
+def largest_component(G):
+    """Maske (bool je Knoten-Index) der größten starken Zusammenhangskomponente."""
+    labels = strongly_connected_components(G)
+    if len(labels) == 0:
+        return np.zeros(0, dtype=bool)
+    return labels == np.argmax(np.bincount(labels))
+
+def subgraph(G, mask):
+    """CSRGraph aus den Knoten mit mask[i] == True und allen Kanten zwischen ihnen."""
+    C = as_csr(G)
+    mask = np.asarray(mask, dtype=bool)
+    new_index = np.full(len(C), -1, dtype=np.int64)
+    new_index[mask] = np.arange(int(mask.sum()))
+    sources, targets, weights = C.edges()
+    keep = mask[sources] & mask[targets]
+    return from_arrays(C.node_ids[mask], new_index[sources[keep]], new_index[targets[keep]], weights[keep],
+                       C.x[mask], C.y[mask], C.weight)
+
+def _chain_nodes(C):
+    """Knoten (Indizes) mit Grad 2: genau ein Vorgänger und ein davon verschiedener Nachfolger (Einbahnstraße)
+    oder genau zwei Nachbarn, die in beide Richtungen verbunden sind."""
+    off, tgt, _ = C.adjacency()
+    roff, rtgt, _ = C.reverse().adjacency()
+    chain = [False] * len(C)
+    for v in range(len(C)):
+        outs = tgt[off[v]:off[v + 1]]
+        ins = rtgt[roff[v]:roff[v + 1]]
+        if len(outs) != len(ins) or len(outs) > 2 or v in outs:
+            continue
+        if len(outs) == 1:
+            chain[v] = outs[0] != ins[0]
+        elif len(outs) == 2:
+            chain[v] = set(outs) == set(ins)
+    return chain
+
+def contract_chains(G):
+    """Fasst Ketten von Grad-2-Knoten zusammen. Gibt den verkleinerten CSRGraph sowie ein Dictionary
+    (Index a, Index b) -> Liste der inneren Knoten-Indizes (in Fahrtrichtung) der Kante a -> b zurück.
+    """
+    C = as_csr(G)
+    off, tgt, wgt = C.adjacency()
+    chain = _chain_nodes(C)
+    visited = [False] * len(C)
+    edges = {} # (a, b) -> (Gewicht, innere Knoten); bei parallelen Ketten bleibt die kürzeste
+
+    def walk(a):
+        for e in range(off[a], off[a + 1]):
+            prev, cur, weight, inner = a, tgt[e], wgt[e], []
+            while chain[cur] and cur != a:
+                visited[cur] = True
+                inner.append(cur)
+                # weiter zum Nachbarn, von dem wir nicht kommen (bei Einbahnstraßen gibt es nur einen)
+                for f in range(off[cur], off[cur + 1]):
+                    if tgt[f] != prev:
+                        break
+                prev, cur, weight = cur, tgt[f], weight + wgt[f]
+            if cur == a:
+                continue # Schleife zurück zum Ausgangsknoten ist für kürzeste Wege nutzlos
+            if (a, cur) not in edges or weight < edges[(a, cur)][0]:
+                edges[(a, cur)] = (weight, inner)
+
+    junctions = [v for v in range(len(C)) if not chain[v]]
+    for a in junctions:
+        walk(a)
+    # reine Ringe aus Grad-2-Knoten haben keinen Abzweig: je Ring einen Knoten behalten
+    for v in range(len(C)):
+        if chain[v] and not visited[v]:
+            chain[v] = False
+            junctions.append(v)
+            walk(v)
+
+    keep = np.zeros(len(C), dtype=bool)
+    keep[junctions] = True
+    new_index = np.full(len(C), -1, dtype=np.int64)
+    new_index[keep] = np.arange(int(keep.sum()))
+    pairs = list(edges)
+    sources = new_index[[a for a, _ in pairs]] if pairs else np.zeros(0, dtype=np.int64)
+    targets = new_index[[b for _, b in pairs]] if pairs else np.zeros(0, dtype=np.int64)
+    weights = [edges[pair][0] for pair in pairs]
+    R = from_arrays(C.node_ids[keep], sources, targets, weights, C.x[keep], C.y[keep], C.weight)
+    return R, {pair: edges[pair][1] for pair in pairs if edges[pair][1]}
+
+class ReducedGraph:
+    """Verkleinerter Suchgraph (graph) zu full, mit der Abbildung zurück auf die vollständige Geometrie."""
+
+    def __init__(self, G, prune: bool=True, contract: bool=True):
+        full = as_csr(G)
+        self.full = full
+        self.component = largest_component(full) if prune else np.ones(len(full), dtype=bool)
+        core = subgraph(full, self.component) if prune else full
+        self.chains = {}
+        if contract:
+            ids = core.ids()
+            core, chains = contract_chains(core)
+            # Schlüssel und innere Knoten als ursprüngliche IDs
+            for (a, b), inner in chains.items():
+                self.chains[(ids[a], ids[b])] = [ids[v] for v in inner]
+        self.graph = core
+
+    def __len__(self):
+        return len(self.graph)
+
+    def summary(self):
+        """Kennzahlen der Verkleinerung."""
+        return {
+            'nodes': len(self.full), 'edges': self.full.edge_count,
+            'component_nodes': int(self.component.sum()),
+            'reduced_nodes': len(self.graph), 'reduced_edges': self.graph.edge_count,
+            'contracted_chains': len(self.chains),
+        }
+
+    def in_component(self, node):
+        return bool(self.component[self.full.to_index(node)])
+
+    def check(self, node):
+        """Löst NodeOutsideComponent aus, wenn node nicht in der größten starken Zusammenhangskomponente liegt."""
+        if not self.in_component(node):
+            raise NodeOutsideComponent(node)
+
+    def _walk(self, node, reverse: bool=False, stop=None):
+        """Folgt von node aus den Kanten (reverse: den Gegenkanten) der Komponente entlang der Kette, bis ein Knoten des
+        verkleinerten Graphen (oder stop) erreicht ist. Gibt {Ende: (Abstand, [(Knoten, Abstand), ...])} mit den
+        dazwischen liegenden Knoten in Laufrichtung zurück; je Ende bleibt die kürzere Richtung.
+        """
+        C = self.full.reverse() if reverse else self.full
+        off, tgt, wgt = C.adjacency()
+        ids = C.ids()
+        keep = self.graph.index
+        component = self.component
+        start = C.to_index(node)
+        result = {}
+        for e in range(off[start], off[start + 1]):
+            prev, cur, length, between = start, tgt[e], wgt[e], []
+            if not component[cur]:
+                continue
+            while ids[cur] not in keep and ids[cur] != stop and cur != start:
+                between.append((ids[cur], length))
+                # weiter zum Nachbarn in der Komponente, von dem wir nicht kommen
+                for f in range(off[cur], off[cur + 1]):
+                    if tgt[f] != prev and component[tgt[f]]:
+                        break
+                prev, cur, length = cur, tgt[f], length + wgt[f]
+            if cur == start:
+                continue
+            end = ids[cur]
+            if end not in result or length < result[end][0]:
+                result[end] = (length, between)
+        return result
+
+    def exits(self, node, stop=None):
+        """Knoten des verkleinerten Graphen, die von node aus (in Fahrtrichtung) als erste erreicht werden:
+        {Ende: (Abstand, [(innerer Knoten, Abstand ab node), ...])}. Für Knoten des verkleinerten Graphen {node: (0, [])}.
+        Mit stop endet der Weg auch dort (Start und Ziel auf derselben Kette).
+        """
+        self.check(node)
+        if node in self.graph.index:
+            return {node: (0.0, [])}
+        return self._walk(node, stop=stop)
+
+    def entries(self, node):
+        """Knoten des verkleinerten Graphen, von denen aus node (in Fahrtrichtung) über die Kette erreicht wird:
+        {Anfang: (Abstand bis node, [(innerer Knoten, Abstand bis node), ...])}, innere Knoten in Fahrtrichtung.
+        """
+        self.check(node)
+        if node in self.graph.index:
+            return {node: (0.0, [])}
+        return {end: (length, between[::-1]) for end, (length, between) in self._walk(node, reverse=True).items()}
+
+    def expand(self, route):
+        """Erweitert eine Route des verkleinerten Graphen um die inneren Knoten der zusammengefassten Ketten."""
+        if not route:
+            return []
+        full_route = [route[0]]
+        for a, b in zip(route, route[1:]):
+            full_route += self.chains.get((a, b), [])
+            full_route.append(b)
+        return full_route
+
+def reduced_for(G):
+    """Gibt den verkleinerten Graphen zu G zurück; er wird beim ersten Aufruf erstellt und am CSRGraph zwischengespeichert."""
+    C = as_csr(G)
+    if 'reduced' not in C.artefacts:
+        C.artefacts['reduced'] = ReducedGraph(C)
+    return C.artefacts['reduced']
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+"""Diese Datei enthält das (optionale) Rendern von Routen, getrennt von der Routenberechnung.
+
+plan_route_from_graph rendert nur noch auf Wunsch (show bzw. filepath). Für Stapelläufe können Routen stattdessen an einen
+RenderPool übergeben werden: mehrere Worker-Prozesse schreiben die Bilder (PNG/SVG, je nach Dateiendung) im Hintergrund,
+während die Berechnung weiterläuft. Der Graph wird dabei nur einmal je Worker übertragen.
+
+Mit render_routes lassen sich viele Routen auf ein gemeinsames Bild legen (ox.plot_graph_routes), statt je Route eine Figur zu erzeugen.
+osmnx und matplotlib werden erst beim ersten Bild importiert.
+
+Beispiel:
+    with RenderPool(G) as pool:
+        for job in jobs:
+            pool.submit(plan_route_from_graph(*job), f"{job[0]}.png")
+        pool.submit_batch(routes, "alle.svg")
+"""
+
+def node_colors(G, visited):
+    """Knotenfarben wie bisher: besuchte Knoten rot, die übrigen schwarz."""
+    visited = set(visited)
+    return ['r' if x in visited else 'black' for x in G.nodes]
+
+def _finish(fig, filepath: str=None, show: bool=False):
+    import matplotlib.pyplot as plt
+    if filepath is not None:
+        fig.savefig(filepath, format=os.path.splitext(filepath)[1][1:] or 'png', bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
+
+def render_route(G, nodes: list, visited=(), filepath: str=None, show: bool=False):
+    """Zeichnet eine Route (Knotenliste) mit den besuchten Knoten. filepath (.png oder .svg) speichert das Bild."""
+    import osmnx as ox
+    nc = node_colors(G, visited)
+    fig, ax = ox.plot_graph_route(G, nodes, node_size=24, node_color=nc, node_alpha=0.6, route_color='b', route_alpha=0.7,
+                                  show=False, close=False)
+    _finish(fig, filepath, show)
+    return filepath
+
+def render_routes(G, routes: list, filepath: str=None, show: bool=False):
+    """Zeichnet viele Routen (Knotenlisten) gemeinsam in eine Figur. Routen mit weniger als zwei Knoten werden übersprungen."""
+    routes = [nodes for nodes in routes if len(nodes) > 1]
+    if not routes:
+        return None
+    if len(routes) == 1:
+        return render_route(G, routes[0], filepath=filepath, show=show)
+    import osmnx as ox
+    fig, ax = ox.plot_graph_routes(G, routes, node_size=0, show=False, close=False)
+    _finish(fig, filepath, show)
+    return filepath
+
+_worker_graph = None
+
+def _init_worker(G):
+    """Initialisiert einen Render-Prozess: ohne Fenster (Agg) rendern und den Graphen einmal übernehmen."""
+    global _worker_graph
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+    _worker_graph = G
+
+def _render_route(nodes, visited, filepath):
+    return render_route(_worker_graph, nodes, visited, filepath)
+
+def _render_routes(routes, filepath):
+    return render_routes(_worker_graph, routes, filepath)
+
+class RenderPool:
+    """Prozesspool, der Routen im Hintergrund als Bilddateien rendert. submit und submit_batch geben Futures zurück,
+    deren Ergebnis der Dateipfad ist. close (bzw. das Verlassen des with-Blocks) wartet auf alle Bilder.
+    """
+
+    def __init__(self, G, workers: int=None):
+        self.graph = G
+        self.futures = []
+        self._executor = ProcessPoolExecutor(max_workers=workers or min(4, os.cpu_count()),
+                                             initializer=_init_worker, initargs=(G,))
+
+    def submit(self, route, filepath: str):
+        """Rendert eine Route (routing.Route) mit ihren besuchten Knoten nach filepath."""
+        future = self._executor.submit(_render_route, route.nodes, list(route.visited), filepath)
+        self.futures.append(future)
+        return future
+
+    def submit_batch(self, routes, filepath: str):
+        """Rendert alle routes (routing.Route oder Knotenlisten) gemeinsam in eine Datei."""
+        future = self._executor.submit(_render_routes, [getattr(route, 'nodes', route) for route in routes], filepath)
+        self.futures.append(future)
+        return future
+
+    def close(self):
+        """Wartet auf alle ausstehenden Bilder und gibt die geschriebenen Pfade zurück (Fehler werden weitergereicht)."""
+        try:
+            return [future.result() for future in self.futures]
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._executor.shutdown(cancel_futures=True)
+            return
+        self.close()
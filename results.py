@@ -0,0 +1,197 @@
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+import numpy as np
+
+"""Diese Datei enthält kompakte Ergebniscontainer für die Suchen.
+
+Statt dist und pred als Dictionaries mit OSM-IDs anzulegen, hält ein SearchResult typisierte Arrays:
+    * dist: float64, inf = unerreichbar
+    * pred: int32 (Knoten-Indizes der CSR-Form), -1 = kein Vorgänger
+Punkt-zu-Punkt-Suchen erreichen meist nur einen kleinen Teil des Graphen; dort werden nur die erreichten Knoten (sortiert)
+gespeichert ("dünn"). Vollständige Bäume (Bellman-Ford, ShortestPathTree) speichern je Knoten einen Eintrag ("dicht").
+
+Während der Suche schreiben die Algorithmen in SearchArrays: je Knoten-Index ein Feld für dist, pred und die Markierung
+"abgeschlossen", einmal je Graph angelegt und nach jeder Suche über das int32-Array der berührten Knoten zurückgesetzt.
+Es entstehen keine Dictionaries je Suche mehr, und das SearchResult wird direkt aus den berührten Feldern gebaut.
+
+dist_map() und pred_map() liefern schreibgeschützte Sichten (Mapping) mit den ursprünglichen Knoten-IDs, die erst beim
+Zugriff übersetzt werden; sie verhalten sich wie die früheren Dictionaries. build_path rekonstruiert Routen in linearer Zeit.
+"""
+
+class SearchResult:
+    """Abstände und Vorgänger einer Suche auf dem CSRGraph C. nodes ist None (dicht: dist/pred je Knoten-Index)
+    oder das Array der erreichten Knoten-Indizes, zu dem dist und pred gehören (dünn).
+    """
+
+    def __init__(self, C, dist, pred, nodes=None):
+        self.graph = C
+        self.dist = np.asarray(dist, dtype=np.float64)
+        self.pred = np.asarray(pred, dtype=np.int32)
+        self.nodes = None
+        if nodes is not None:
+            nodes = np.asarray(nodes, dtype=np.int32)
+            order = np.argsort(nodes, kind='stable')
+            self.nodes = nodes[order]
+            self.dist = self.dist[order]
+            self.pred = self.pred[order]
+        self._reached = None
+        self._pred_positions = None
+
+    @property
+    def nbytes(self):
+        return self.dist.nbytes + self.pred.nbytes + (0 if self.nodes is None else self.nodes.nbytes)
+
+    def position(self, v: int):
+        """Position des Knoten-Index v in dist/pred, -1 falls v nicht erreicht wurde."""
+        if self.nodes is None:
+            i = v
+        else:
+            i = int(np.searchsorted(self.nodes, v))
+            if i == len(self.nodes) or self.nodes[i] != v:
+                return -1
+        return i if self.dist[i] != np.inf else -1
+
+    def reached(self):
+        """Knoten-Indizes aller erreichten Knoten."""
+        if self._reached is None:
+            finite = np.isfinite(self.dist)
+            self._reached = np.nonzero(finite)[0] if self.nodes is None else self.nodes[finite]
+        return self._reached
+
+    def distance(self, node):
+        """Abstand zum Knoten node (ursprüngliche ID), inf falls unerreichbar."""
+        i = self.position(self.graph.to_index(node))
+        return float('inf') if i == -1 else float(self.dist[i])
+
+    def path_indices(self, v: int):
+        """Pfad vom Start zum Knoten-Index v als Liste von Indizes (leer, falls unerreichbar)."""
+        i = self.position(v)
+        if i == -1:
+            return []
+        route = []
+        if self.nodes is None:
+            pred = self.pred
+            while v != -1:
+                route.append(v)
+                v = int(pred[v])
+        else:
+            # Vorgänger einmal vektorisiert in Positionen übersetzen, danach ist jeder Schritt O(1)
+            if self._pred_positions is None:
+                positions = np.searchsorted(self.nodes, self.pred).astype(np.int32)
+                positions[self.pred == -1] = -1
+                self._pred_positions = positions
+            nodes, positions = self.nodes, self._pred_positions
+            while i != -1:
+                route.append(int(nodes[i]))
+                i = int(positions[i])
+        route.reverse()
+        return route
+
+    def path(self, node):
+        """Pfad vom Start zu node als Liste ursprünglicher Knoten-IDs (leer, falls unerreichbar)."""
+        ids = self.graph.ids()
+        return [ids[v] for v in self.path_indices(self.graph.to_index(node))]
+
+    def dist_map(self):
+        """Abstände als Mapping ursprüngliche ID -> Abstand (nur erreichte Knoten)."""
+        return ResultMap(self, nodes=False)
+
+    def pred_map(self):
+        """Vorgänger als Mapping ursprüngliche ID -> Vorgänger-ID (None beim Start)."""
+        return ResultMap(self, nodes=True)
+
+class SearchArrays:
+    """Wiederverwendbarer Arbeitsspeicher einer Suche auf einem Graphen mit n Knoten: dist (inf = unmarkiert), pred
+    (-1 = kein Vorgänger), closed (abgeschlossen, z.B. für A-Stern) und touched, die Indizes aller markierten Knoten.
+    dist und pred sind Listen, weil der Einzelzugriff in der Suchschleife dort am schnellsten ist (kein Umpacken wie bei array).
+    """
+
+    def __init__(self, n: int):
+        self.dist = [float('inf')] * n
+        self.pred = [-1] * n
+        self.closed = bytearray(n)
+        self.touched = array('i')
+
+    def result(self, C):
+        """Die markierten Knoten als (dünnes) SearchResult."""
+        touched, dist, pred = self.touched, self.dist, self.pred
+        nodes = np.array(touched, dtype=np.int32)
+        values = np.fromiter((dist[v] for v in touched), dtype=np.float64, count=len(touched))
+        preds = np.fromiter((pred[v] for v in touched), dtype=np.int32, count=len(touched))
+        return SearchResult(C, values, preds, nodes)
+
+    def reset(self):
+        """Setzt nur die berührten Einträge zurück."""
+        dist, pred, closed = self.dist, self.pred, self.closed
+        inf = float('inf')
+        for v in self.touched:
+            dist[v] = inf
+            pred[v] = -1
+            closed[v] = 0
+        del self.touched[:]
+
+@contextmanager
+def search_arrays(C):
+    """Leiht SearchArrays für C aus (je Graph ein Vorrat, sodass gleichzeitige Suchen in Threads eigene Arrays erhalten)
+    und gibt sie nach der Suche zurückgesetzt zurück.
+    """
+    pool = C.artefacts.setdefault('search_arrays', [])
+    try:
+        arrays = pool.pop()
+    except IndexError:
+        arrays = SearchArrays(len(C))
+    try:
+        yield arrays
+    finally:
+        arrays.reset()
+        pool.append(arrays)
+
+class ResultMap(Mapping):
+    """Schreibgeschützte Sicht auf dist bzw. pred eines SearchResult mit ursprünglichen Knoten-IDs."""
+
+    def __init__(self, result: SearchResult, nodes: bool):
+        self.result = result
+        self._nodes = nodes
+
+    def __getitem__(self, node):
+        result = self.result
+        try:
+            i = result.position(result.graph.to_index(node))
+        except KeyError:
+            raise KeyError(node)
+        if i == -1:
+            raise KeyError(node)
+        if self._nodes:
+            p = int(result.pred[i])
+            return None if p == -1 else result.graph.to_id(p)
+        return float(result.dist[i])
+
+    def __iter__(self):
+        ids = self.result.graph.ids()
+        return (ids[v] for v in self.result.reached().tolist())
+
+    def __len__(self):
+        return len(self.result.reached())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+def build_path(pred, dest):
+    """Route vom Start nach dest (Liste von Knoten) aus den Vorgängern pred in linearer Zeit.
+    pred ist ein Mapping Knoten -> Vorgänger (None beim Start); für ResultMaps wird direkt auf den Index-Arrays gearbeitet.
+    Löst wie bisher KeyError aus, wenn dest nicht erreicht wurde.
+    """
+    if isinstance(pred, ResultMap):
+        route = pred.result.path(dest)
+        if not route:
+            raise KeyError(dest)
+        return route
+    route = []
+    v = dest
+    while v is not None:
+        route.append(v)
+        v = pred[v]
+    route.reverse()
+    return route
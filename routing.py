@@ -0,0 +1,106 @@
+from algorithms import (INF, a_star, bellman_ford, bidirectional_a_star, bidirectional_dijkstra, dijkstra, floyd_warshall,
+                        johnson)
+from ch import ch_query, hierarchy_for
+from landmarks import landmarks_for
+from instrumentation import SearchStats, phase
+from results import build_path
+
+"""Diese Datei enthält die reine Routenberechnung ohne Ausgabe und Plot: aus Algorithmus-Bezeichnung, Graph und
+Start-/Zielknoten werden Abstände, Vorgänger und die Route bestimmt.
+
+Sie wird von plan_route_from_graph in evaluation.py verwendet, lässt sich aber (anders als evaluation.py) auch ohne
+Nebenwirkungen importieren, z.B. in Worker-Prozessen (siehe parallel.py). G kann ein networkx-Graph oder ein CSRGraph sein.
+"""
+
+ALGORITHMS = ('contraction-hierarchies', 'bidirectional-a-star', 'bidirectional-dijkstra', 'a-star-alt', 'a-star',
+              'dijkstra-p2p', 'dijkstra', 'bellman-ford', 'johnson', 'floyd-warshall')
+
+class Route:
+    """Ergebnis einer Routenanfrage: Knotenliste, Länge (m), dist/pred der Suche, count und die Kennzahlen (SearchStats).
+    Gerendert wird nichts; dafür siehe render.py.
+    """
+
+    def __init__(self, algorithm: str, orig_node, dest_node, nodes: list, dist, pred, count: int,
+                 stats: SearchStats=None, orig: str=None, dest: str=None):
+        self.algorithm = algorithm
+        self.orig_node = orig_node
+        self.dest_node = dest_node
+        self.nodes = nodes
+        self.dist = dist
+        self.pred = pred
+        self.count = count
+        self.stats = stats
+        # Kürzel der Standorte (3. Wert der Koordinaten in constantCoords), falls vorhanden
+        self.orig = orig
+        self.dest = dest
+
+    @property
+    def length(self):
+        """Länge der Route, inf falls das Ziel nicht erreicht wurde."""
+        return self.dist[self.dest_node] if self.dest_node in self.dist else float('inf')
+
+    @property
+    def visited(self):
+        """Knoten, die von der Suche einen Abstand erhalten haben."""
+        return self.dist.keys()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"Route({self.algorithm}: {self.orig or self.orig_node} → {self.dest or self.dest_node}, {len(self.nodes)} Knoten, {self.length} m)"
+
+def find_route(name: str, G, orig_node, dest_node, stats: SearchStats=None):
+    """Wendet den Algorithmus name an und gibt dist, pred, count sowie die Route (Liste von Knoten) zurück.
+    Zulässige name-Werte siehe ALGORITHMS bzw. plan_route_from_graph. Ein übergebenes SearchStats erhält die Kennzahlen
+    der Suche sowie die Laufzeiten der Phasen 'search' und 'path' (siehe instrumentation.py).
+    """
+    dist = {}
+    pred = {}
+    route = []
+    if stats is not None and stats.algorithm is None:
+        stats.algorithm = name
+
+    if name in ("floyd-warshall", "johnson"):
+        # call algorithm
+        with phase(stats, 'search'):
+            dist, next, count = floyd_warshall(G) if name == "floyd-warshall" else johnson(G)
+        # prepare route directly from the successor matrix
+        with phase(stats, 'path'):
+            route = next.path(orig_node, dest_node) or [] # None: unerreichbar
+            dist = {v: d for v, d in dist[orig_node].items() if d != INF}
+        if stats is not None:
+            stats.record(dist, count)
+        return dist, pred, count, route
+
+    with phase(stats, 'search'):
+        dist, pred, count = _search(name, G, orig_node, dest_node, stats)
+
+    # prepare route
+    with phase(stats, 'path'):
+        route = build_path(pred, dest_node)
+    return dist, pred, count, route
+
+def _search(name, G, orig_node, dest_node, stats):
+    """Führt nur die Suche des Algorithmus name aus und gibt dist, pred und count zurück."""
+    # call algorithm
+    if (name == "dijkstra"):
+        # vollständige Suche ohne Ziel; die Kennzahlen stammen immer aus dieser Suche (kein zwischengespeicherter Baum)
+        dist, pred, count = dijkstra(G, orig_node, stats=stats)
+    elif (name == "dijkstra-p2p"):
+        dist, pred, count = dijkstra(G, orig_node, dest_node, stats=stats)
+    elif (name == "a-star"):
+        dist, pred, count = a_star(G, orig_node, dest_node, stats=stats)
+    elif (name == "a-star-alt"):
+        dist, pred, count = a_star(G, orig_node, dest_node, landmarks=landmarks_for(G), stats=stats)
+    elif (name == "bidirectional-dijkstra"):
+        dist, pred, count = bidirectional_dijkstra(G, orig_node, dest_node, stats=stats)
+    elif (name == "bidirectional-a-star"):
+        dist, pred, count = bidirectional_a_star(G, orig_node, dest_node, stats=stats)
+    elif (name == "contraction-hierarchies"):
+        dist, pred, count = ch_query(hierarchy_for(G), orig_node, dest_node, stats=stats)
+    elif (name == "bellman-ford"):
+        dist, pred, count = bellman_ford(G, orig_node, stats=stats)
+    else:
+        raise ValueError(f"Unbekannter Algorithmus: {name}")
+    return dist, pred, count
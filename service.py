@@ -0,0 +1,498 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from algorithms import one_to_many_dijkstra
+from ch import hierarchy_for, load_hierarchy, save_hierarchy
+from csr import as_csr, load_csr, save_csr
+from graph import load_graph
+from instrumentation import SearchStats
+from landmarks import Landmarks, landmarks_for
+from routing import ALGORITHMS, find_route
+from spatial import spatial_index_for
+
+"""Diese Datei stellt einen lang laufenden Routing-Dienst bereit (HTTP/1.1 über TCP oder einen Unix-Socket, asyncio).
+
+Die Graphen werden beim Start einmal geladen und bleiben im Speicher (samt Spatial-Index und Rückwärtsgraph). Angeboten
+werden standardmäßig nur Algorithmen ohne Vorberechnung (DEFAULT_ALGORITHMS); Contraction Hierarchy und Landmarken entstehen
+nur, wenn 'contraction-hierarchies' bzw. 'a-star-alt' ausdrücklich angeboten werden. Eine einmal berechnete Hierarchie kann
+mit --hierarchy NAME=PFAD gespeichert und bei späteren Starts geladen werden (siehe ch.save_hierarchy). Eine Anfrage
+durchläuft dieselben Schritte wie plan_route_from_graph in evaluation.py (Einrasten, find_route), nur ohne Ausgabe und Plot:
+    GET  /route?graph=iserlohn&orig=51.37,7.69&dest=51.36,7.55&algorithm=a-star&nodes=0
+    POST /route  mit denselben Feldern als JSON ({"orig": [51.37, 7.69], ...})
+    GET  /graphs, GET /health
+
+* Einrasten und Suchen laufen in einem Thread- oder Prozesspool, die Ereignisschleife blockiert nie. Threads rechnen wegen
+  des GIL nicht echt parallel; Prozesse blenden den Graphen wie in parallel.py per memmap ein.
+* Gleichzeitige Anfragen mit demselben (eingerasteten) Start werden gesammelt und mit einer einzigen One-to-many-Suche
+  beantwortet (algorithms.one_to_many_dijkstra), die endet, sobald alle Ziele des Stapels abgeschlossen sind. Ein Stapel
+  wird nach batch_window Sekunden bereit und nimmt weitere Ziele auf, bis ein Worker frei wird (höchstens workers Suchen
+  laufen gleichzeitig).
+* Gegendruck: sind bereits max_pending Anfragen in Arbeit, wird sofort mit 429 abgelehnt statt die Warteschlange wachsen
+  zu lassen. Jede Anfrage hat ein Zeitlimit (timeout, Antwort 504) für Einrasten und Suche zusammen; beide laufen danach
+  weiter und zählen bis zu ihrem Ende gegen max_pending.
+
+Beispiel:
+    python service.py --graph demo=geometric:100000 --port 8080
+    python loadtest.py --port 8080 --requests 2000 --concurrency 32
+    python service.py --graph iserlohn=city:Iserlohn, DE --algorithms contraction-hierarchies a-star \
+        --hierarchy iserlohn=iserlohn-ch.npz
+"""
+
+# Alle-Paare-Verfahren berechnen je Anfrage die ganze Matrix und sind auf einem Regionalgraphen nie sinnvoll
+SERVICE_ALGORITHMS = tuple(name for name in ALGORITHMS if name not in ('johnson', 'floyd-warshall'))
+# ohne Vorberechnung beim Start; Hierarchie und Landmarken müssen ausdrücklich angefordert werden
+DEFAULT_ALGORITHMS = ('bidirectional-a-star', 'bidirectional-dijkstra', 'a-star', 'dijkstra-p2p', 'dijkstra')
+MAX_BODY = 1024**2
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+               429: 'Too Many Requests', 500: 'Internal Server Error', 504: 'Gateway Timeout'}
+
+class ServiceError(Exception):
+    """Fehler einer Anfrage mit zugehörigem HTTP-Status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def solve(C, algorithm: str, orig_node, dest_nodes: list):
+    """Beantwortet alle gesammelten Anfragen mit dem Start orig_node. Bei einem einzelnen Ziel wird der angefragte
+    Algorithmus verwendet, bei mehreren Zielen (oder 'dijkstra') eine One-to-many-Suche, die endet, sobald alle Ziele
+    abgeschlossen sind. Gibt je Ziel ein Dictionary (algorithm, length, nodes, settled, search_seconds) zurück; length ist
+    inf, falls unerreichbar.
+    """
+    start = time.perf_counter()
+    if len(dest_nodes) == 1 and algorithm != 'dijkstra':
+        stats = SearchStats(algorithm)
+        dest_node = dest_nodes[0]
+        try:
+            dist, pred, count, route = find_route(algorithm, C, orig_node, dest_node, stats)
+            length = dist[dest_node]
+        except KeyError: # Ziel nicht erreicht
+            length, route = float('inf'), []
+        answers = [{'algorithm': algorithm, 'length': length, 'nodes': route, 'settled': stats.settled}]
+    else:
+        stats = SearchStats('dijkstra')
+        result, _ = one_to_many_dijkstra(C, orig_node, dest_nodes, stats)
+        answers = [{'algorithm': 'dijkstra', 'length': result.distance(node), 'nodes': result.path(node),
+                    'settled': stats.settled} for node in dest_nodes]
+    seconds = time.perf_counter() - start
+    for answer in answers:
+        answer['search_seconds'] = seconds
+    return answers
+
+def snap(C, coords: list):
+    """Rastet Koordinaten (Breite, Länge) auf die nächsten Knoten von C ein."""
+    return spatial_index_for(C).nearest_nodes(coords)
+
+def prepare(C, algorithms, hierarchy: str=None):
+    """Erzeugt alles, was sonst bei der ersten Anfrage entstünde (Listen, Rückwärtsgraph, Spatial-Index sowie
+    Contraction Hierarchy bzw. Landmarken, falls die Algorithmen sie ausdrücklich verlangen).
+    Ist hierarchy ein Pfad, wird die Hierarchie von dort geladen bzw. nach dem Berechnen dort gespeichert.
+    """
+    C.adjacency()
+    C.reverse().adjacency()
+    spatial_index_for(C)
+    if 'contraction-hierarchies' in algorithms:
+        if hierarchy is not None and os.path.exists(hierarchy):
+            H = load_hierarchy(hierarchy)
+            if not np.array_equal(H.node_ids, C.node_ids):
+                raise ValueError(f"Die Hierarchie {hierarchy} gehört nicht zu diesem Graphen (andere Knoten).")
+            C.artefacts['ch'] = H
+        else:
+            H = hierarchy_for(C)
+            if hierarchy is not None:
+                save_hierarchy(H, hierarchy)
+    if 'a-star-alt' in algorithms:
+        landmarks_for(C)
+
+_worker_graphs = None
+
+def _init_worker(directories: dict):
+    """Initialisiert einen Worker-Prozess: alle Graphen einblenden (siehe parallel.py) und die im Hauptprozess
+    berechneten Hierarchien und Landmarken übernehmen.
+    """
+    global _worker_graphs
+    _worker_graphs = {}
+    for name, directory in directories.items():
+        C = _worker_graphs[name] = load_csr(directory, mmap=True)
+        if os.path.exists(os.path.join(directory, 'ch.npz')):
+            C.artefacts['ch'] = load_hierarchy(os.path.join(directory, 'ch.npz'))
+        if os.path.exists(os.path.join(directory, 'landmarks.npz')):
+            with np.load(os.path.join(directory, 'landmarks.npz')) as data:
+                C.artefacts['landmarks'] = Landmarks(data['nodes'], data['forward'], data['backward'])
+        spatial_index_for(C)
+
+def _snap_in_worker(graph: str, coords: list):
+    return snap(_worker_graphs[graph], coords)
+
+def _solve_in_worker(graph: str, algorithm: str, orig_node, dest_nodes: list):
+    return solve(_worker_graphs[graph], algorithm, orig_node, dest_nodes)
+
+def _coords(value):
+    """Koordinaten (Breite, Länge) aus 'lat,lon' oder [lat, lon]."""
+    try:
+        if isinstance(value, str):
+            value = value.split(',')
+        lat, lon = (float(v) for v in value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"Ungültige Koordinaten: {value!r} (erwartet 'Breite,Länge')")
+    return lat, lon
+
+def _finite(value):
+    """inf ist in JSON nicht darstellbar und wird als null ausgegeben."""
+    return None if value == float('inf') else value
+
+async def read_message(reader: asyncio.StreamReader):
+    """Liest eine HTTP-Nachricht (Anfrage oder Antwort) und gibt (Startzeile, Header, Rumpf) zurück, None bei Verbindungsende."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = header.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        raise ServiceError(413, f"Rumpf zu groß ({length} Bytes)")
+    body = await reader.readexactly(length) if length else b''
+    return line.decode('latin-1').strip(), headers, body
+
+def _response(status: int, payload: dict, keep_alive: bool=True, headers: dict=None):
+    body = json.dumps(payload).encode()
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", 'Content-Type: application/json',
+             f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+class _Batch:
+    """Gesammelte Anfragen (Ziel, Algorithmus, Future) mit demselben Start."""
+
+    def __init__(self, graph: str, orig_node):
+        self.graph = graph
+        self.orig_node = orig_node
+        self.requests = []
+
+class RoutingService:
+    """Routing-Dienst über den vorab geladenen Graphen graphs = {Name: Graph} (networkx oder CSRGraph).
+    executor ist 'thread' oder 'process'; algorithm ist der Standard-Algorithmus, wenn die Anfrage keinen angibt.
+    algorithms sind die angebotenen Algorithmen; ihre Vorberechnungen (z.B. die Hierarchie) entstehen beim Start.
+    hierarchies = {Name: Pfad} gibt an, wo die Hierarchie eines Graphen gespeichert ist bzw. gespeichert werden soll.
+    """
+
+    def __init__(self, graphs: dict, executor: str='thread', workers: int=None, algorithm: str='bidirectional-a-star',
+                 max_pending: int=256, timeout: float=10.0, batch_window: float=0.002, max_batch: int=64,
+                 algorithms: tuple=DEFAULT_ALGORITHMS, hierarchies: dict=None):
+        if not graphs:
+            raise ValueError("Es muss mindestens ein Graph geladen werden.")
+        for name in (algorithm, *algorithms):
+            if name not in SERVICE_ALGORITHMS:
+                raise ValueError(f"Unbekannter Algorithmus: {name}")
+        self.graphs = {name: as_csr(G) for name, G in graphs.items()}
+        self.algorithm = algorithm
+        self.algorithms = tuple(dict.fromkeys((algorithm, *algorithms)))
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.pending = 0
+        self.counters = {'requests': 0, 'answered': 0, 'batches': 0, 'batched': 0, 'rejected': 0, 'timeouts': 0, 'errors': 0}
+        self._batches = {}      # (Graph, Start) -> offener _Batch
+        self._queue = deque()   # bereite Stapel in Ankunftsreihenfolge
+        self._running = 0
+        self._directory = None
+
+        # alles, was sonst bei der ersten Anfrage entstünde (und deren Zeitlimit sprengen würde), jetzt erzeugen
+        hierarchies = hierarchies or {}
+        for name, C in self.graphs.items():
+            prepare(C, self.algorithms, hierarchies.get(name))
+
+        self.workers = workers = workers or os.cpu_count()
+        if executor == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        elif executor == 'process':
+            self._directory = tempfile.mkdtemp(prefix='ss2020-service-')
+            directories = {}
+            for i, (name, C) in enumerate(self.graphs.items()):
+                directory = directories[name] = os.path.join(self._directory, str(i))
+                save_csr(C, directory)
+                if 'ch' in C.artefacts:
+                    save_hierarchy(C.artefacts['ch'], os.path.join(directory, 'ch.npz'))
+                if 'landmarks' in C.artefacts:
+                    L = C.artefacts['landmarks']
+                    np.savez(os.path.join(directory, 'landmarks.npz'), nodes=L.nodes, forward=L.forward, backward=L.backward)
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(directories,))
+        else:
+            raise ValueError(f"Unbekannter executor: {executor} (erwartet 'thread' oder 'process')")
+        self.executor_kind = executor
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def health(self):
+        return {'status': 'ok', 'executor': self.executor_kind, 'pending': self.pending, 'max_pending': self.max_pending,
+                **self.counters}
+
+    def describe(self):
+        """Name, Größe und Ausdehnung (north, south, east, west) je Graph."""
+        result = []
+        for name, C in self.graphs.items():
+            index = spatial_index_for(C)
+            nodes = index.nodes
+            bbox = None
+            if len(nodes):
+                bbox = [float(C.y[nodes].max()), float(C.y[nodes].min()), float(C.x[nodes].max()), float(C.x[nodes].min())]
+            result.append({'name': name, 'nodes': len(C), 'edges': C.edge_count, 'bbox': bbox})
+        return result
+
+    async def route(self, orig_coords: tuple, dest_coords: tuple, graph: str=None, algorithm: str=None,
+                    nodes: bool=True):
+        """Berechnet eine Route zwischen zwei Koordinaten (Breite, Länge) und gibt sie als Dictionary zurück.
+        Löst ServiceError aus (400/404 ungültige Anfrage, 429 überlastet, 504 Zeitlimit).
+        """
+        self.counters['requests'] += 1
+        if graph is None and len(self.graphs) == 1:
+            graph = next(iter(self.graphs))
+        if graph not in self.graphs:
+            raise ServiceError(404, f"Unbekannter Graph: {graph}")
+        algorithm = algorithm or self.algorithm
+        if algorithm not in self.algorithms:
+            raise ServiceError(400, f"Unbekannter Algorithmus: {algorithm} (zulässig: {', '.join(self.algorithms)})")
+        if self.pending >= self.max_pending:
+            self.counters['rejected'] += 1
+            raise ServiceError(429, f"Überlastet: {self.pending} Anfragen in Arbeit")
+
+        start = time.perf_counter()
+        try:
+            orig_node, dest_node, answer, batch = await asyncio.wait_for(
+                self._snap_and_solve(graph, orig_coords, dest_coords, algorithm), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            raise ServiceError(504, f"Zeitlimit von {self.timeout} s überschritten")
+        except ServiceError:
+            raise
+        except Exception as e:
+            self.counters['errors'] += 1
+            raise ServiceError(500, f"{type(e).__name__}: {e}")
+        self.counters['answered'] += 1
+
+        result = {'graph': graph, 'algorithm': answer['algorithm'], 'orig_node': orig_node, 'dest_node': dest_node,
+                  'length': _finite(answer['length']), 'settled': answer['settled'], 'batch': batch,
+                  'search_seconds': answer['search_seconds'], 'seconds': time.perf_counter() - start}
+        if nodes:
+            result['nodes'] = answer['nodes']
+        return result
+
+    async def _snap_and_solve(self, graph: str, orig_coords: tuple, dest_coords: tuple, algorithm: str):
+        """Rastet Start und Ziel im Pool ein (weit außerhalb liegende Koordinaten können dauern) und reiht die Anfrage
+        dann in den Stapel ihres Starts ein. Gibt (Start, Ziel, Antwort, Stapelgröße) zurück.
+        """
+        coords = [orig_coords, dest_coords]
+        if self.executor_kind == 'thread':
+            job = self.executor.submit(snap, self.graphs[graph], coords)
+        else:
+            job = self.executor.submit(_snap_in_worker, graph, coords)
+        snapped = asyncio.wrap_future(job)
+        # wie eine Suche zählt das Einrasten bis zu seinem Ende gegen max_pending, auch nach dem Zeitlimit
+        self.pending += 1
+        snapped.add_done_callback(self._done)
+        orig_node, dest_node = await asyncio.shield(snapped)
+        answer, batch = await asyncio.shield(self._enqueue(graph, orig_node, dest_node, algorithm))
+        return orig_node, dest_node, answer, batch
+
+    def _enqueue(self, graph: str, orig_node, dest_node, algorithm: str):
+        """Reiht eine Anfrage in den offenen Stapel ihres Starts ein. Ein Stapel wird nach batch_window bereit und bleibt
+        offen, bis ein Worker frei ist; unter Last wachsen die Stapel also von selbst. Gibt ein Future zurück, das
+        (Antwort, Stapelgröße) erhält.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending += 1
+        future.add_done_callback(self._done)
+        key = (graph, orig_node)
+        batch = self._batches.get(key)
+        if batch is None or len(batch.requests) >= self.max_batch:
+            batch = self._batches[key] = _Batch(graph, orig_node)
+            loop.call_later(self.batch_window, self._ready, batch)
+        batch.requests.append((dest_node, algorithm, future))
+        return future
+
+    def _done(self, future):
+        self.pending -= 1
+        if not future.cancelled():
+            future.exception() # gilt als abgeholt, auch wenn die Anfrage bereits am Zeitlimit gescheitert ist
+
+    def _ready(self, batch):
+        self._queue.append(batch)
+        self._dispatch()
+
+    def _dispatch(self):
+        """Schickt bereite Stapel ab, solange weniger als workers Suchen laufen."""
+        while self._queue and self._running < self.workers:
+            batch = self._queue.popleft()
+            key = (batch.graph, batch.orig_node)
+            if self._batches.get(key) is batch:
+                del self._batches[key] # ab jetzt kommen keine Ziele mehr hinzu
+            dest_nodes = [dest_node for dest_node, _, _ in batch.requests]
+            algorithm = batch.requests[0][1]
+            self.counters['batches'] += 1
+            if len(dest_nodes) > 1:
+                self.counters['batched'] += len(dest_nodes)
+            try:
+                if self.executor_kind == 'thread':
+                    job = self.executor.submit(solve, self.graphs[batch.graph], algorithm, batch.orig_node, dest_nodes)
+                else:
+                    job = self.executor.submit(_solve_in_worker, batch.graph, algorithm, batch.orig_node, dest_nodes)
+            except Exception as e: # z.B. abgestürzter Prozesspool
+                self._resolve(batch, None, e)
+                continue
+            self._running += 1
+            asyncio.wrap_future(job).add_done_callback(partial(self._finish, batch))
+
+    def _finish(self, batch, job):
+        self._running -= 1
+        if job.cancelled():
+            self._resolve(batch, None, ServiceError(500, "Suche abgebrochen"))
+        elif job.exception() is not None:
+            self._resolve(batch, None, job.exception())
+        else:
+            self._resolve(batch, job.result(), None)
+        self._dispatch()
+
+    def _resolve(self, batch, answers, error):
+        for i, (_, _, future) in enumerate(batch.requests):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result((answers[i], len(batch.requests)))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Bedient eine Verbindung (Keep-Alive: mehrere Anfragen nacheinander)."""
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except ServiceError as e:
+                    writer.write(_response(e.status, {'error': str(e)}, keep_alive=False))
+                    break
+                if message is None:
+                    break
+                line, headers, body = message
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, payload, extra = await self._answer(line, body)
+                writer.write(_response(status, payload, keep_alive, extra))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, line: str, body: bytes):
+        """Gibt (Status, Antwort, zusätzliche Header) zu einer Anfragezeile zurück."""
+        try:
+            method, target, _ = line.split(' ', 2)
+            url = urlsplit(target)
+            if url.path == '/health':
+                return 200, self.health(), None
+            if url.path == '/graphs':
+                return 200, {'graphs': self.describe()}, None
+            if url.path != '/route':
+                raise ServiceError(404, f"Unbekannter Pfad: {url.path}")
+            if method == 'GET':
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            elif method == 'POST':
+                try:
+                    params = json.loads(body or b'{}')
+                except ValueError:
+                    raise ServiceError(400, "Rumpf ist kein gültiges JSON")
+            else:
+                raise ServiceError(405, f"Methode {method} nicht erlaubt")
+            if 'orig' not in params or 'dest' not in params:
+                raise ServiceError(400, "orig und dest müssen angegeben werden")
+            nodes = str(params.get('nodes', '1')).lower() not in ('0', 'false', 'no')
+            result = await self.route(_coords(params['orig']), _coords(params['dest']), params.get('graph'),
+                                      params.get('algorithm'), nodes)
+            return 200, result, None
+        except ServiceError as e:
+            extra = {'Retry-After': '1'} if e.status == 429 else None
+            return e.status, {'error': str(e)}, extra
+        except ValueError as e: # fehlerhafte Anfragezeile
+            return 400, {'error': str(e)}, None
+
+    async def serve(self, host: str='127.0.0.1', port: int=8080, path: str=None):
+        """Startet den Dienst auf host:port bzw. dem Unix-Socket path und läuft bis zum Abbruch."""
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path=path)
+            where = path
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"{host}:{port}"
+        print(f"**** service listening on {where} ({', '.join(self.graphs)}; {self.executor_kind} pool) ****")
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Routing-Dienst über vorab geladene Graphen (HTTP über TCP oder Unix-Socket).")
+    parser.add_argument('--graph', action='append', required=True, metavar='NAME=SPEC',
+                        help="zu ladender Graph, z.B. iserlohn=city:Iserlohn, DE oder demo=geometric:100000 (mehrfach möglich)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="Unix-Socket statt TCP")
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--algorithm', choices=SERVICE_ALGORITHMS, default='bidirectional-a-star')
+    parser.add_argument('--algorithms', nargs='+', choices=SERVICE_ALGORITHMS, default=list(DEFAULT_ALGORITHMS),
+                        help="angebotene Algorithmen (Standard: ohne Vorberechnung; Hierarchie und Landmarken werden nur "
+                             "für contraction-hierarchies bzw. a-star-alt beim Start berechnet)")
+    parser.add_argument('--hierarchy', action='append', default=[], metavar='NAME=PFAD',
+                        help="Contraction Hierarchy des Graphen NAME von PFAD laden bzw. nach dem Berechnen dort speichern")
+    parser.add_argument('--max-pending', type=int, default=256, help="Anfragen in Arbeit, ab denen mit 429 abgelehnt wird")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Zeitlimit je Anfrage in Sekunden")
+    parser.add_argument('--batch-window', type=float, default=0.002, help="Sammelzeit für Anfragen mit gleichem Start in Sekunden")
+    args = parser.parse_args(argv)
+
+    graphs = {}
+    for entry in args.graph:
+        name, _, spec = entry.partition('=')
+        graphs[name] = load_graph(spec)
+        print(f"**** graph {name} loaded ({len(graphs[name])} nodes) ****")
+
+    service = RoutingService(graphs, args.executor, args.workers, args.algorithm, args.max_pending, args.timeout,
+                             args.batch_window, algorithms=tuple(args.algorithms),
+                             hierarchies=dict(entry.partition('=')[::2] for entry in args.hierarchy))
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
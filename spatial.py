@@ -0,0 +1,215 @@
+from math import floor, sqrt
+
+import numpy as np
+
+from csr import as_csr
+from utility import EARTH_RADIUS
+
+"""Diese Datei stellt einen räumlichen Index (Gitter) für das Einrasten von Koordinaten auf Knoten bzw. Kanten bereit.
+
+ox.get_nearest_node berechnet für jede Anfrage die Entfernung zu *allen* Knoten. Hier werden die Knoten einmal je Graph in
+ein gleichmäßiges Gitter über projizierte Koordinaten (Meter, equirektangular um die Mitte des Graphen) einsortiert.
+Eine Anfrage durchsucht dann nur die Zellen ringförmig um den Punkt, bis kein näherer Knoten mehr möglich ist. Die Ringe
+beginnen beim ersten, der belegte Zellen berühren kann, und werden auf die belegte Ausdehnung beschnitten. Würde die Suche
+mehr Zellen besuchen, als ein Vergleich mit allen Knoten kostet (Punkt weit außerhalb, z.B. vertauschte Breite/Länge),
+werden stattdessen alle Knoten vektorisiert verglichen.
+
+Koordinaten werden wie in constantCoords als (Breite, Länge) übergeben.
+"""
+
+# Ein vektorisierter Vergleich mit allen Knoten kostet etwa so viel wie das Durchsuchen jeder SCAN_RATIO-ten belegten Zelle
+SCAN_RATIO = 64
+
+class SpatialIndex:
+    """Gitterindex über die Knoten (und auf Wunsch die Kanten) eines CSRGraphen."""
+
+    def __init__(self, G, cell_size: float=None):
+        C = as_csr(G)
+        self.graph = C
+        valid = np.isfinite(C.x) & np.isfinite(C.y)
+        self.nodes = np.nonzero(valid)[0]
+        lat0 = np.radians(np.mean(C.y[valid])) if valid.any() else 0.0
+        self.scale = np.cos(lat0) * EARTH_RADIUS * 1000
+        px, py = self.project(C.y, C.x)
+        self.px, self.py = px.tolist(), py.tolist()
+
+        # projizierte Koordinaten der gültigen Knoten für die vektorisierte Suche
+        self._node_x, self._node_y = px[self.nodes], py[self.nodes]
+        if len(self.nodes) > 0:
+            x, y = self._node_x, self._node_y
+            self.min_x, self.min_y = x.min(), y.min()
+            if cell_size is None:
+                # im Schnitt etwa 4 Knoten je Zelle
+                area = max((x.max() - self.min_x) * (y.max() - self.min_y), 1.0)
+                cell_size = max(sqrt(area / len(self.nodes) * 4), 1.0)
+        else:
+            self.min_x = self.min_y = 0.0
+            cell_size = cell_size or 1.0
+        self.cell_size = cell_size
+        self.cells = self._bucket(self.nodes.tolist())
+        self._cells_extent = self._extent(self.cells) if self.cells else None
+        self._edge_cells = None
+
+    def project(self, lat, lon):
+        """Projiziert (Breite, Länge) in Grad auf ebene Koordinaten in Metern."""
+        return np.radians(lon) * self.scale, np.radians(lat) * EARTH_RADIUS * 1000
+
+    def _cell(self, x, y):
+        return floor((x - self.min_x) / self.cell_size), floor((y - self.min_y) / self.cell_size)
+
+    def _bucket(self, nodes):
+        cells = {}
+        for v in nodes:
+            cells.setdefault(self._cell(self.px[v], self.py[v]), []).append(v)
+        return cells
+
+    @staticmethod
+    def _rings(cx, cy, extent):
+        """Liefert für r = r0, r0 + 1, ... die Zellen mit Chebyshev-Abstand r um (cx, cy), beschnitten auf extent.
+        r0 ist der erste Ring, der extent berührt; innere Ringe enthalten keine belegten Zellen.
+        """
+        x0, x1, y0, y1 = extent
+        r = max(x0 - cx, cx - x1, y0 - cy, cy - y1, 0)
+        while True:
+            if r == 0:
+                yield r, [(cx, cy)]
+            else:
+                xs = range(max(cx - r, x0), min(cx + r, x1) + 1)
+                ys = range(max(cy - r + 1, y0), min(cy + r - 1, y1) + 1)
+                ring = [(x, y) for y in (cy - r, cy + r) if y0 <= y <= y1 for x in xs]
+                ring += [(x, y) for x in (cx - r, cx + r) if x0 <= x <= x1 for y in ys]
+                yield r, ring
+            r += 1
+
+    @staticmethod
+    def _extent(cells):
+        """Kleinste und größte belegte Zellkoordinate je Achse."""
+        xs = [c[0] for c in cells]
+        ys = [c[1] for c in cells]
+        return min(xs), max(xs), min(ys), max(ys)
+
+    @staticmethod
+    def _max_ring(cx, cy, extent):
+        """Größter Ring um (cx, cy), der noch belegte Zellen enthalten kann."""
+        x0, x1, y0, y1 = extent
+        return max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+
+    def _nearest(self, x, y):
+        """Index und Entfernung (m) des nächsten Knotens zum projizierten Punkt (x, y)."""
+        if not self.cells:
+            raise ValueError("Der Graph enthält keine Knoten mit Koordinaten.")
+        cx, cy = self._cell(x, y)
+        limit = self._max_ring(cx, cy, self._cells_extent)
+        budget = max(len(self.cells) // SCAN_RATIO, 64)
+        best, best_dist = -1, float('inf')
+        for r, ring in self._rings(cx, cy, self._cells_extent):
+            # jeder Punkt in Ring r ist mindestens (r - 1) Zellen entfernt (best_dist ist quadriert)
+            if r > limit or (r > 0 and best_dist <= ((r - 1) * self.cell_size)**2):
+                break
+            budget -= len(ring)
+            if budget < 0:
+                return self._scan(x, y)
+            for cell in ring:
+                for v in self.cells.get(cell, ()):
+                    d = (self.px[v] - x)**2 + (self.py[v] - y)**2
+                    if d < best_dist:
+                        best, best_dist = v, d
+        return best, sqrt(best_dist)
+
+    def _scan(self, x, y):
+        """Wie _nearest, aber über alle Knoten auf einmal (für Punkte weit außerhalb des Graphen)."""
+        d = (self._node_x - x)**2 + (self._node_y - y)**2
+        i = int(np.argmin(d))
+        return int(self.nodes[i]), sqrt(d[i])
+
+    def nearest_node(self, coords: tuple, return_dist: bool=False):
+        """Nächster Knoten (ursprüngliche ID) zu coords = (Breite, Länge, ...)."""
+        x, y = self.project(coords[0], coords[1])
+        v, d = self._nearest(float(x), float(y))
+        node = self.graph.to_id(v)
+        return (node, d) if return_dist else node
+
+    def nearest_nodes(self, coords_array, return_dist: bool=False):
+        """Batch-Variante: coords_array ist eine Folge von (Breite, Länge, ...) bzw. ein n x 2 Array.
+        Die Projektion erfolgt für alle Punkte auf einmal.
+        """
+        coords = [tuple(c[:2]) for c in coords_array]
+        if not coords:
+            return []
+        lat, lon = np.array(coords, dtype=np.float64).T
+        xs, ys = self.project(lat, lon)
+        result = []
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            v, d = self._nearest(x, y)
+            result.append((self.graph.to_id(v), d) if return_dist else self.graph.to_id(v))
+        return result
+
+    def _build_edge_cells(self):
+        """Sortiert jede Kante in alle Zellen ein, die ihre Bounding-Box berührt."""
+        cells = {}
+        sources, targets, _ = self.graph.edges()
+        valid = np.isfinite(self.graph.x[sources]) & np.isfinite(self.graph.y[sources]) & \
+                np.isfinite(self.graph.x[targets]) & np.isfinite(self.graph.y[targets])
+        self._edge_nodes = (sources[valid], targets[valid])
+        for e, (u, v) in enumerate(zip(sources.tolist(), targets.tolist())):
+            if not (np.isfinite(self.px[u]) and np.isfinite(self.px[v])):
+                continue
+            x0, y0 = self._cell(min(self.px[u], self.px[v]), min(self.py[u], self.py[v]))
+            x1, y1 = self._cell(max(self.px[u], self.px[v]), max(self.py[u], self.py[v]))
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cells.setdefault((cx, cy), []).append((e, u, v))
+        self._edge_cells = cells
+        self._edge_extent = self._extent(cells) if cells else None
+
+    def nearest_edge(self, coords: tuple):
+        """Nächste Kante zu coords = (Breite, Länge, ...) als (u, v, t, Entfernung in m),
+        wobei t in [0, 1] der Anteil der Strecke von u nach v bis zum Lotfußpunkt ist (gerade Strecke zwischen den Knoten).
+        """
+        if self._edge_cells is None:
+            self._build_edge_cells()
+        if not self._edge_cells:
+            raise ValueError("Der Graph enthält keine Kanten mit Koordinaten.")
+        x, y = (float(a) for a in self.project(coords[0], coords[1]))
+        cx, cy = self._cell(x, y)
+        limit = self._max_ring(cx, cy, self._edge_extent)
+        budget = max(len(self._edge_cells) // SCAN_RATIO, 64)
+        best, best_dist, best_t = None, float('inf'), 0.0
+        for r, ring in self._rings(cx, cy, self._edge_extent):
+            if r > limit or best_dist <= (r - 1) * self.cell_size:
+                break
+            budget -= len(ring)
+            if budget < 0:
+                return self._scan_edges(x, y)
+            for cell in ring:
+                for e, u, v in self._edge_cells.get(cell, ()):
+                    ax, ay = self.px[u], self.py[u]
+                    dx, dy = self.px[v] - ax, self.py[v] - ay
+                    length = dx*dx + dy*dy
+                    t = 0.0 if length == 0 else min(max(((x - ax)*dx + (y - ay)*dy) / length, 0.0), 1.0)
+                    d = sqrt((ax + t*dx - x)**2 + (ay + t*dy - y)**2)
+                    if d < best_dist:
+                        best, best_dist, best_t = (u, v), d, t
+        ids = self.graph.ids()
+        return ids[best[0]], ids[best[1]], best_t, best_dist
+
+    def _scan_edges(self, x, y):
+        """Wie nearest_edge, aber über alle Kanten auf einmal (für Punkte weit außerhalb des Graphen)."""
+        u, v = self._edge_nodes
+        px, py = self.project(self.graph.y, self.graph.x)
+        ax, ay = px[u], py[u]
+        dx, dy = px[v] - ax, py[v] - ay
+        length = dx*dx + dy*dy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(length == 0, 0.0, np.clip(((x - ax)*dx + (y - ay)*dy) / length, 0.0, 1.0))
+        d = np.sqrt((ax + t*dx - x)**2 + (ay + t*dy - y)**2)
+        e = int(np.argmin(d))
+        ids = self.graph.ids()
+        return ids[int(u[e])], ids[int(v[e])], float(t[e]), float(d[e])
+
+def spatial_index_for(G):
+    """Gibt den räumlichen Index von G zurück; er wird beim ersten Aufruf erstellt und am CSRGraph zwischengespeichert."""
+    C = as_csr(G)
+    if 'spatial' not in C.artefacts:
+        C.artefacts['spatial'] = SpatialIndex(C)
+    return C.artefacts['spatial']
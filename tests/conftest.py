@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utility import haversine
+
+"""Gemeinsame Hilfen für die Tests: kleine Zufallsgraphen im Stil der osmnx-Graphen (MultiDiGraph mit x/y und 'length').
+Die Kantenlängen sind nie kürzer als die Luftlinie, damit die Heuristiken von A-Stern zulässig bleiben.
+"""
+
+def random_graph(n: int=60, degree: int=3, seed: int=0, oneway: float=0.3):
+    """Zufälliger Straßengraph mit n Knoten um Iserlohn: jeder Knoten wird mit seinen degree nächsten Nachbarn verbunden,
+    ein Anteil oneway der Verbindungen ist nur in eine Richtung befahrbar.
+    """
+    rng = random.Random(seed)
+    G = nx.MultiDiGraph()
+    for v in range(n):
+        G.add_node(v, y=51.37 + rng.uniform(0, 0.03), x=7.69 + rng.uniform(0, 0.045))
+    for u in range(n):
+        xu, yu = G.nodes[u]['x'], G.nodes[u]['y']
+        nearest = sorted((haversine(xu, yu, G.nodes[v]['x'], G.nodes[v]['y']), v) for v in range(n) if v != u)
+        for d, v in nearest[:degree]:
+            length = d * 1000 * rng.uniform(1.0, 1.5)
+            if G.has_edge(u, v) or G.has_edge(v, u):
+                continue
+            G.add_edge(u, v, length=length)
+            if rng.random() >= oneway:
+                G.add_edge(v, u, length=length)
+    return G
+
+def nx_distances(G, source, weight: str='length'):
+    """Referenzabstände von source aus (networkx), unerreichbare Knoten fehlen (auch solche nur über gesperrte Kanten mit ∞)."""
+    return {v: d for v, d in nx.single_source_dijkstra_path_length(G, source, weight=weight).items() if d != float('inf')}
+
+def path_length(G, path, weight: str='length'):
+    """Länge eines Pfades (Liste von Knoten) im (Multi-)DiGraph G über die jeweils kürzeste parallele Kante."""
+    return sum(min(data[weight] for data in G[u][v].values()) for u, v in zip(path, path[1:]))
+
+@pytest.fixture
+def graph():
+    return random_graph()
+
+@pytest.fixture(params=[0, 1, 2])
+def graphs(request):
+    return random_graph(n=50 + 10 * request.param, seed=request.param)
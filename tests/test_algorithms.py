@@ -0,0 +1,86 @@
+import math
+
+import networkx as nx
+import pytest
+
+from conftest import nx_distances, path_length, random_graph
+from algorithms import a_star, bidirectional_a_star, bidirectional_dijkstra, dijkstra, multi_source_dijkstra
+from csr import as_csr
+from instrumentation import SearchStats
+from results import build_path
+
+POINT_TO_POINT = [
+    lambda G, s, t: dijkstra(G, s, dest=t),
+    lambda G, s, t: a_star(G, s, t),
+    lambda G, s, t: bidirectional_dijkstra(G, s, t),
+    lambda G, s, t: bidirectional_a_star(G, s, t),
+]
+
+def test_dijkstra_matches_networkx(graphs):
+    for source in (0, 7, len(graphs) - 1):
+        dist, pred, _ = dijkstra(graphs, source)
+        expected = nx_distances(graphs, source)
+        assert set(dist) == set(expected)
+        for v, d in expected.items():
+            assert dist[v] == pytest.approx(d)
+            assert path_length(graphs, build_path(pred, v)) == pytest.approx(d)
+
+@pytest.mark.parametrize('search', POINT_TO_POINT)
+def test_point_to_point_matches_networkx(graphs, search):
+    for s, t in ((0, 1), (3, len(graphs) - 1), (10, 20), (5, 5)):
+        expected = nx_distances(graphs, s).get(t)
+        dist, pred, _ = search(graphs, s, t)
+        if expected is None:
+            assert t not in dist
+            continue
+        assert dist[t] == pytest.approx(expected)
+        route = build_path(pred, t)
+        assert route[0] == s and route[-1] == t
+        assert path_length(graphs, route) == pytest.approx(expected)
+
+def test_multi_source_and_cutoff(graph):
+    sources = [0, 17, 33]
+    expected = nx.multi_source_dijkstra_path_length(graph, sources, weight='length')
+    dist, _, _ = multi_source_dijkstra(graph, sources)
+    assert {v: pytest.approx(d) for v, d in expected.items()} == dict(dist)
+
+    cutoff = 500
+    dist, _, _ = dijkstra(graph, 0, cutoff=cutoff)
+    within = {v for v, d in nx_distances(graph, 0).items() if d <= cutoff}
+    assert set(dist) == within
+
+def test_search_arrays_are_reset_between_searches(graph):
+    """Aufeinanderfolgende Suchen auf demselben Graphen dürfen keine Markierungen der vorherigen Suche sehen."""
+    first, _, _ = dijkstra(graph, 0)
+    a_star(graph, 5, 40)
+    bidirectional_a_star(graph, 12, 3)
+    again, _, _ = dijkstra(graph, 0)
+    assert dict(again) == dict(first)
+    arrays = as_csr(graph).artefacts['search_arrays']
+    assert all(len(a.touched) == 0 and all(math.isinf(d) for d in a.dist) for a in arrays)
+
+def test_stats_count_labelled_nodes(graph):
+    stats = SearchStats()
+    dist, _, _ = dijkstra(graph, 0, stats=stats)
+    assert stats.labelled == len(dist)
+    stats = SearchStats()
+    bidirectional_dijkstra(graph, 0, 30, stats=stats)
+    assert stats.labelled > 0 and stats.settled <= stats.labelled
+
+def test_point_to_point_searches_stop_early(graph):
+    """Punkt-zu-Punkt-Suchen schließen weniger Knoten ab als der vollständige Dijkstra, liefern aber denselben Abstand."""
+    full = SearchStats()
+    dijkstra(graph, 0, stats=full)
+    expected = nx_distances(graph, 0)
+    nearest = min((d, v) for v, d in expected.items() if v != 0)[1]
+    searches = [
+        lambda stats: dijkstra(graph, 0, dest=nearest, stats=stats),
+        lambda stats: a_star(graph, 0, nearest, stats=stats),
+        lambda stats: bidirectional_dijkstra(graph, 0, nearest, stats=stats),
+        lambda stats: bidirectional_a_star(graph, 0, nearest, stats=stats),
+    ]
+    for search in searches:
+        stats = SearchStats()
+        dist, _, _ = search(stats)
+        assert stats.settled < full.settled
+        assert dist[nearest] == pytest.approx(expected[nearest])
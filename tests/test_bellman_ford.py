@@ -0,0 +1,48 @@
+import networkx as nx
+import pytest
+
+from conftest import nx_distances, random_graph
+from algorithms import BELLMAN_FORD_MODES, NegativeCycle, bellman_ford
+from results import build_path
+
+def negative_graph(seed):
+    G = random_graph(n=40, seed=seed, oneway=1.0)
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        if i % 6 == 0:
+            data['length'] = -data['length'] / 4
+    return G
+
+@pytest.mark.parametrize('mode', BELLMAN_FORD_MODES)
+def test_matches_networkx(graphs, mode):
+    dist, pred, _ = bellman_ford(graphs, 0, mode=mode)
+    expected = nx_distances(graphs, 0)
+    assert set(dist) == set(expected)
+    for v, d in expected.items():
+        assert dist[v] == pytest.approx(d)
+        assert build_path(pred, v)[0] == 0
+
+@pytest.mark.parametrize('mode', BELLMAN_FORD_MODES)
+@pytest.mark.parametrize('seed', [0, 1, 2, 3])
+def test_negative_edges_match_networkx(mode, seed):
+    G = negative_graph(seed)
+    if nx.negative_edge_cycle(G, weight='length'):
+        with pytest.raises(NegativeCycle) as info:
+            bellman_ford(G, 0, mode=mode)
+        cycle = info.value.cycle
+        assert info.value.weight < 0
+        assert all(G.has_edge(u, v) for u, v in zip(cycle, cycle[1:] + cycle[:1]))
+        return
+    dist, _, _ = bellman_ford(G, 0, mode=mode)
+    expected = nx.single_source_bellman_ford_path_length(G, 0, weight='length')
+    assert {v: pytest.approx(d) for v, d in expected.items()} == dict(dist)
+
+@pytest.mark.parametrize('mode', BELLMAN_FORD_MODES)
+def test_reports_negative_cycle(mode):
+    G = nx.MultiDiGraph()
+    G.add_edge('a', 'b', length=1)
+    G.add_edge('b', 'c', length=-3)
+    G.add_edge('c', 'a', length=1)
+    G.add_edge('c', 'd', length=2)
+    with pytest.raises(NegativeCycle) as info:
+        bellman_ford(G, 'a', mode=mode)
+    assert sorted(info.value.cycle) == ['a', 'b', 'c'] and info.value.weight == -1
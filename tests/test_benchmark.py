@@ -0,0 +1,57 @@
+import json
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from benchmark import compare, geometric_graph, grid_graph, main, query_pairs, run_benchmark
+from routing import find_route
+from utility import haversine_vec
+
+def to_networkx(C):
+    G = nx.DiGraph()
+    G.add_nodes_from(C.ids())
+    sources, targets, weights = C.edges()
+    ids = C.ids()
+    G.add_weighted_edges_from((ids[u], ids[v], w) for u, v, w in zip(sources.tolist(), targets.tolist(), weights.tolist()))
+    return G
+
+@pytest.mark.parametrize('make', [grid_graph, geometric_graph])
+def test_synthetic_graphs_are_reproducible_and_admissible(make):
+    C, D = make(400, seed=3), make(400, seed=3)
+    assert (C.targets == D.targets).all() and (C.weights == D.weights).all()
+    sources, targets, weights = C.edges()
+    straight = haversine_vec(C.x[sources], C.y[sources], C.x[targets], C.y[targets]) * 1000
+    assert (weights >= straight).all()
+    assert query_pairs(C, 5, seed=1) == query_pairs(D, 5, seed=1)
+
+@pytest.mark.parametrize('make', [grid_graph, geometric_graph])
+def test_algorithms_agree_on_synthetic_graphs(make):
+    C = make(300, seed=1)
+    G = to_networkx(C)
+    for orig, dest in query_pairs(C, 5, seed=2):
+        try:
+            expected = nx.dijkstra_path_length(G, orig, dest)
+        except nx.NetworkXNoPath:
+            continue
+        for name in ('dijkstra-p2p', 'a-star', 'bidirectional-a-star', 'contraction-hierarchies'):
+            dist, _, _, _ = find_route(name, C, orig, dest)
+            assert dist[dest] == pytest.approx(expected)
+
+def test_run_and_compare(tmp_path):
+    inputs = [('grid-100', grid_graph(100))]
+    results = run_benchmark(inputs, ('dijkstra', 'a-star-alt'), queries=3, memory=False, log=lambda *_: None)
+    assert [r['algorithm'] for r in results] == ['dijkstra', 'a-star-alt:preprocess', 'a-star-alt']
+    worse = [dict(r, settled=r['settled'] * 2) for r in results if r['algorithm'] == 'dijkstra']
+    assert [r['metric'] for r in compare(results, worse)] == ['settled']
+
+    baseline = str(tmp_path / 'baseline.json')
+    args = ['--sizes', '100', '--kinds', 'grid', '--algorithms', 'dijkstra', '--queries', '2', '--no-memory', '--no-cache']
+    assert main(args + ['--json', baseline]) == 0
+    with open(baseline) as f:
+        data = json.load(f)
+    for row in data['results']:
+        row['settled'] = row['settled'] / 4 if row['settled'] else row['settled']
+    with open(baseline, 'w') as f:
+        json.dump(data, f)
+    assert main(args + ['--compare', baseline]) == 1
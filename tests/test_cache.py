@@ -0,0 +1,61 @@
+import os
+import threading
+
+import pytest
+
+from conftest import nx_distances, random_graph
+from algorithms import dijkstra
+from cache import GraphCache, canonical_key
+from csr import as_csr
+
+@pytest.fixture
+def cache(tmp_path):
+    return GraphCache(str(tmp_path / 'graphs'))
+
+def test_canonical_key_ignores_formatting():
+    a, _ = canonical_key('place', query='Iserlohn,  DE', distance=1000.0000001)
+    b, _ = canonical_key('place', query='iserlohn, de', distance=1000.0)
+    assert a == b
+
+def test_round_trip(cache, graph):
+    key, _ = canonical_key('random', seed=0)
+    cache.store(key, graph)
+    assert key in cache
+    G = cache.load(key)
+    dist, _, _ = dijkstra(G, 0)
+    for v, d in nx_distances(graph, 0).items():
+        assert dist[v] == pytest.approx(d)
+    C = cache.load(key, compiled=True)
+    assert C.ids() == as_csr(graph).ids()
+
+def test_csr_only_entry_is_kept(cache, graph):
+    key, _ = canonical_key('csr', seed=0)
+    cache.store(key, as_csr(graph))
+    assert cache.load(key) is None # kein networkx-Graph abgelegt
+    assert key in cache
+    assert len(cache.load(key, compiled=True)) == len(graph)
+
+def test_corrupt_entry_is_removed(cache, graph):
+    key, _ = canonical_key('corrupt', seed=0)
+    cache.store(key, graph)
+    with open(os.path.join(cache.directory, key, 'graph.pickle'), 'wb') as f:
+        f.write(b'kein pickle')
+    assert cache.load(key) is None
+    assert key not in cache
+
+def test_concurrent_stores_leave_one_valid_entry(cache):
+    key, _ = canonical_key('concurrent', seed=1)
+    graphs = [random_graph(seed=1) for _ in range(4)]
+    threads = [threading.Thread(target=cache.store, args=(key, G)) for G in graphs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache.load(key)) == len(graphs[0])
+    assert not [name for name in os.listdir(cache.directory) if name.endswith('.tmp')]
+
+def test_eviction_keeps_cache_small(tmp_path, graph):
+    cache = GraphCache(str(tmp_path / 'graphs'), max_bytes=1)
+    key, _ = canonical_key('evict', seed=0)
+    cache.store(key, graph)
+    assert cache.entries() == []
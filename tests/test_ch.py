@@ -0,0 +1,30 @@
+import pytest
+
+from conftest import nx_distances, path_length
+from ch import ch_query, contract, load_hierarchy, save_hierarchy
+from results import build_path
+
+def test_queries_match_networkx(graphs):
+    H = contract(graphs)
+    for s in (0, 11, 27):
+        expected = nx_distances(graphs, s)
+        for t in (2, 19, 40, s):
+            dist, pred, _ = ch_query(H, s, t)
+            if t not in expected:
+                assert t not in dist
+                continue
+            route = build_path(pred, t)
+            assert dist[t] == pytest.approx(expected[t])
+            assert path_length(graphs, route) == pytest.approx(expected[t])
+            # dist beschreibt nur die Route, dort aber mit exakten Abständen
+            assert set(dist) == set(route)
+            for v in route:
+                assert dist[v] == pytest.approx(expected[v])
+
+def test_saved_hierarchy_answers_the_same(tmp_path, graph):
+    H = contract(graph)
+    path = str(tmp_path / 'ch.npz')
+    save_hierarchy(H, path)
+    L = load_hierarchy(path)
+    for s, t in ((0, 30), (12, 5), (44, 59)):
+        assert ch_query(L, s, t)[0].get(t) == ch_query(H, s, t)[0].get(t)
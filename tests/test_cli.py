@@ -0,0 +1,57 @@
+import contextlib
+import csv
+import io
+import os
+import subprocess
+import sys
+
+import networkx as nx
+import pytest
+
+from conftest import random_graph
+from algorithms import johnson_distances
+from cli import main, parse_location
+from csr import as_csr, save_csr
+
+def test_import_has_no_side_effects():
+    """Der Import lädt weder osmnx, networkx noch matplotlib und gibt nichts aus (keine Beispielrechnungen mehr)."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import sys, cli, evaluation, algorithms, routing; "
+            "sys.stderr.write(' '.join(m for m in ('osmnx', 'networkx', 'matplotlib') if m in sys.modules))")
+    done = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert done.stdout == '' and done.stderr == ''
+
+def test_parse_location():
+    assert parse_location('51.37,7.69') == (51.37, 7.69, '51.37,7.69')
+    with pytest.raises(Exception):
+        parse_location('nirgendwo')
+
+def test_johnson_distances_match_networkx():
+    G = random_graph(n=40, seed=2, oneway=1.0)
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        if i % 6 == 0:
+            data['length'] = -data['length'] / 5
+    if nx.negative_edge_cycle(G, weight='length'):
+        pytest.skip("Zufallsgraph enthält einen negativen Kreis")
+    origins, destinations = [0, 5, 12], [3, 7, 20, 39]
+    table = johnson_distances(G, origins, destinations)
+    assert table.shape == (3, 4)
+    for row, u in zip(table, origins):
+        expected = nx.single_source_bellman_ford_path_length(G, u, weight='length')
+        for d, v in zip(row, destinations):
+            assert d == pytest.approx(expected.get(v, float('inf')))
+
+@pytest.mark.parametrize('algorithm', ['dijkstra', 'johnson'])
+def test_matrix_command(tmp_path, graph, algorithm):
+    directory = str(tmp_path / 'graph')
+    save_csr(as_csr(graph), directory)
+    nodes = [0, 20, 41]
+    points = [f"{graph.nodes[v]['y']},{graph.nodes[v]['x']}" for v in nodes]
+    output = str(tmp_path / 'matrix.csv')
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert main(['matrix', *points, '--graph', f'csr:{directory}', '--algorithm', algorithm, '--csv', output]) == 0
+    with open(output) as f:
+        rows = list(csv.reader(f))[1:]
+    for row, u in zip(rows, nodes):
+        expected = nx.single_source_dijkstra_path_length(graph, u, weight='length')
+        assert [float(d) for d in row[1:]] == pytest.approx([expected.get(v, float('inf')) for v in nodes])
@@ -0,0 +1,50 @@
+import pytest
+
+from conftest import nx_distances, random_graph
+from algorithms import dijkstra
+from csr import as_csr, compile_graph, load_csr, mark_changed, save_csr
+from dynamic import update_weights
+
+def test_compile_keeps_shortest_parallel_edge(graph):
+    u, v = next(iter(graph.edges()))
+    graph.add_edge(u, v, length=1.0)
+    C = compile_graph(graph)
+    assert len(C) == graph.number_of_nodes()
+    assert C.edge_count == len({(a, b) for a, b in graph.edges()})
+    for a, b in graph.edges():
+        e = C.edge_index(C.to_index(a), C.to_index(b))
+        assert C.weights[e] == min(data['length'] for data in graph[a][b].values())
+
+def test_as_csr_is_cached_until_changed(graph):
+    C = as_csr(graph)
+    assert as_csr(graph) is C
+    u, v, data = next(iter(graph.edges(data=True)))
+    data['length'] = 1.0
+    mark_changed(graph)
+    D = as_csr(graph)
+    assert D is not C
+    assert D.weights[D.edge_index(D.to_index(u), D.to_index(v))] == 1.0
+
+def test_structural_change_recompiles(graph):
+    C = as_csr(graph)
+    graph.add_edge(0, 59, length=5.0)
+    assert as_csr(graph) is not C
+
+def test_update_weights_keeps_csr_in_sync(graph):
+    C = as_csr(graph)
+    as_csr(graph, weight='travel_time') # ohne Kanten mit travel_time, muss trotzdem neu erstellt werden
+    other = graph.graph['csr']['travel_time'][1]
+    changes = {(u, v): length * 3 for u, v, length in list(graph.edges(data='length'))[:15]}
+    update_weights(graph, changes)
+    assert as_csr(graph) is C
+    assert as_csr(graph, weight='travel_time') is not other
+    dist, _, _ = dijkstra(graph, 0)
+    for v, d in nx_distances(graph, 0).items():
+        assert dist[v] == pytest.approx(d)
+
+def test_save_and_load(tmp_path, graph):
+    C = as_csr(graph)
+    save_csr(C, str(tmp_path))
+    D = load_csr(str(tmp_path))
+    assert D.ids() == C.ids()
+    assert (D.offsets == C.offsets).all() and (D.targets == C.targets).all() and (D.weights == C.weights).all()
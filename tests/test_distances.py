@@ -0,0 +1,42 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from conftest import nx_distances, random_graph
+from csr import as_csr
+from distances import TreeCache, distance_matrix, shortest_path_tree_for
+
+def test_distance_matrix_matches_networkx(graphs):
+    origins, destinations = [0, 9, 33], [1, 9, 20, 49]
+    cache = TreeCache()
+    matrix = distance_matrix(graphs, origins, destinations, cache=cache)
+    for row, u in zip(matrix, origins):
+        expected = nx_distances(graphs, u)
+        assert row.tolist() == pytest.approx([expected.get(v, np.inf) for v in destinations])
+    np.testing.assert_array_equal(distance_matrix(graphs, origins, destinations, cache=cache), matrix)
+    assert cache.hits == len(origins)
+
+def test_bellman_ford_matrix_with_negative_edges():
+    G = random_graph(n=30, seed=8, oneway=1.0)
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        if i % 7 == 0:
+            data['length'] = -data['length'] / 4
+    if nx.negative_edge_cycle(G, weight='length'):
+        pytest.skip("Zufallsgraph enthält einen negativen Kreis")
+    matrix = distance_matrix(G, [0, 4], list(G), 'bellman-ford', cache=None)
+    for row, u in zip(matrix, [0, 4]):
+        expected = nx.single_source_bellman_ford_path_length(G, u, weight='length')
+        assert row.tolist() == pytest.approx([expected.get(v, np.inf) for v in G])
+
+def test_tree_paths_and_eviction(graph):
+    C = as_csr(graph)
+    tree = shortest_path_tree_for(graph, 3, cache=None)
+    for v, d in nx_distances(graph, 3).items():
+        assert tree.distance(v) == pytest.approx(d)
+        assert tree.path(v)[0] == 3 and tree.path(v)[-1] == v
+    cache = TreeCache(max_bytes=int(tree.nbytes * 2.5))
+    for source in range(5):
+        shortest_path_tree_for(C, source, cache=cache)
+    assert len(cache) == 2 and cache.bytes <= cache.max_bytes
+    assert cache.get((C.token, 'dijkstra', 4)) is not None
+    assert cache.get((C.token, 'dijkstra', 0)) is None
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from conftest import nx_distances, path_length, random_graph
+from ch import hierarchy_for
+from csr import as_csr
+from distances import TreeCache, shortest_path_tree_for
+from dynamic import block_edges, update_weights
+from landmarks import landmarks_for
+from routing import find_route
+
+SOURCES = (0, 11, 23, 37)
+
+def assert_trees_match(G, cache):
+    C = as_csr(G)
+    for source in SOURCES:
+        tree = cache.get((C.token, 'dijkstra', source))
+        assert tree is not None
+        expected = nx_distances(G, source)
+        assert len(tree.reached()) == len(expected)
+        for v, d in expected.items():
+            assert tree.distance(v) == pytest.approx(d)
+            assert path_length(G, tree.path(v)) == pytest.approx(d)
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_repaired_trees_match_networkx(seed):
+    rng = random.Random(seed)
+    G = random_graph(seed=seed)
+    cache = TreeCache()
+    for source in SOURCES:
+        shortest_path_tree_for(G, source, cache=cache)
+    edges = list({(u, v): length for u, v, length in G.edges(data='length')}.items())
+    for _ in range(5):
+        changes = {}
+        for (u, v), length in rng.sample(edges, 8):
+            changes[(u, v)] = rng.choice([length * rng.uniform(0.2, 0.9), length * rng.uniform(1.5, 4), None])
+        report = update_weights(G, changes, cache)
+        assert report['repaired'] == len(SOURCES)
+        assert_trees_match(G, cache)
+
+def test_blocked_edge_is_avoided(graph):
+    cache = TreeCache()
+    _, _, _, route = find_route('a-star', graph, 0, 45)
+    block_edges(graph, [(route[0], route[1])], cache)
+    expected = nx_distances(graph, 0).get(45)
+    _, _, _, detour = find_route('a-star', graph, 0, 45)
+    if expected is None:
+        assert detour == []
+    else:
+        assert (detour[0], detour[1]) != (route[0], route[1])
+        assert path_length(graph, detour) == pytest.approx(expected)
+
+def test_artefacts_are_discarded(graph):
+    C = as_csr(graph)
+    hierarchy_for(C)
+    landmarks_for(C)
+    (u, v, length), = list(graph.edges(data='length'))[:1]
+    report = update_weights(graph, {(u, v): length * 2}, TreeCache())
+    assert report['artefacts'] == ['ch'] # Landmarken bleiben bei Verlängerungen gültig
+    assert 'landmarks' in C.artefacts
+    report = update_weights(graph, {(u, v): length / 2}, TreeCache())
+    assert 'landmarks' in report['artefacts'] and 'landmarks' not in C.artefacts
@@ -0,0 +1,40 @@
+import contextlib
+import io
+import sys
+
+import pytest
+
+from conftest import nx_distances, path_length
+from evaluation import plan_route_from_graph
+
+class Collector:
+    """Nimmt Routen wie render.RenderPool entgegen, ohne zu zeichnen."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, route, filepath):
+        self.jobs.append((route, filepath))
+
+def plan(*args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return plan_route_from_graph(*args, **kwargs)
+
+def coords(G, v):
+    return G.nodes[v]['y'], G.nodes[v]['x'], f"n{v}"
+
+@pytest.mark.parametrize('name', ['a-star', 'bidirectional-dijkstra', 'floyd-warshall'])
+def test_headless_route_matches_networkx(graph, name):
+    route = plan(name, graph, coords(graph, 0), coords(graph, 45))
+    expected = nx_distances(graph, 0)[45]
+    assert (route.orig_node, route.dest_node, route.orig, route.dest) == (0, 45, 'n0', 'n45')
+    assert route.length == pytest.approx(expected)
+    assert path_length(graph, route.nodes) == pytest.approx(expected)
+    assert 'render' not in route.stats.phases
+    assert 'osmnx' not in sys.modules
+
+def test_deferred_rendering_is_handed_to_the_renderer(graph):
+    collector = Collector()
+    route = plan('dijkstra', graph, coords(graph, 3), coords(graph, 30), filepath='route.png', renderer=collector)
+    assert collector.jobs == [(route, 'route.png')]
+    assert 'render' not in route.stats.phases
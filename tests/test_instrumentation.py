@@ -0,0 +1,50 @@
+import pytest
+
+from conftest import nx_distances
+from instrumentation import SearchStats
+from routing import find_route
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, node, value):
+        self.events.append((event, node, value))
+
+    def settled(self):
+        return [(node, value) for event, node, value in self.events if event == 'settle']
+
+@pytest.mark.parametrize('name', ['dijkstra', 'dijkstra-p2p', 'a-star', 'bellman-ford'])
+def test_tracer_sees_exact_distances(graph, name):
+    recorder = Recorder()
+    stats = SearchStats(tracer=recorder)
+    find_route(name, graph, 0, 40, stats)
+    expected = nx_distances(graph, 0)
+    labelled = {0}
+    for event, node, value in recorder.events:
+        if event == 'label':
+            labelled.add(node)
+        else:
+            assert node in labelled
+    if name == 'bellman-ford':
+        return # ohne Warteschlange gibt es keine 'settle'-Ereignisse
+    settled = recorder.settled()
+    assert len(settled) == stats.settled == stats.pops
+    for node, value in settled:
+        assert value == pytest.approx(expected[node])
+    if name != 'a-star': # Dijkstra schließt in aufsteigender Reihenfolge ab
+        values = [value for _, value in settled]
+        assert values == sorted(values)
+
+def test_stats_phases_and_total(graph):
+    runs = []
+    for dest in (10, 20, 30):
+        stats = SearchStats('a-star')
+        find_route('a-star', graph, 0, dest, stats)
+        assert set(stats.phases) == {'search', 'path'}
+        assert stats.labelled >= stats.settled > 0 and stats.relaxations > 0
+        runs.append(stats)
+    total = SearchStats.total(runs, 'a-star')
+    assert total.settled == sum(s.settled for s in runs)
+    assert total.max_frontier == max(s.max_frontier for s in runs)
+    assert total.as_dict()['search_seconds'] == pytest.approx(sum(s.phases['search'] for s in runs))
@@ -0,0 +1,44 @@
+import networkx as nx
+import pytest
+
+from conftest import nx_distances
+from algorithms import a_star
+from instrumentation import SearchStats
+from isochrones import convex_hull, isochrones
+
+def test_isochrones_match_networkx(graphs):
+    sources = [0, 7]
+    budgets = [800, 300, 1500]
+    expected = nx.multi_source_dijkstra_path_length(graphs, sources, weight='length')
+    for iso in isochrones(graphs, sources, budgets):
+        within = {v: d for v, d in expected.items() if d <= iso.budget}
+        assert set(iso.nodes) == set(within)
+        assert list(iso.dist) == sorted(iso.dist)
+        for v, d in within.items():
+            assert iso.distance(v) == pytest.approx(d)
+        assert all(v not in iso for v in graphs if v not in within)
+
+def test_search_stops_at_the_largest_budget(graph):
+    small, full = SearchStats(), SearchStats()
+    isochrones(graph, [0], [200], stats=small)
+    isochrones(graph, [0], [float('inf')], stats=full)
+    assert small.settled < full.settled == len(nx_distances(graph, 0))
+
+def test_polygon_contains_the_reached_nodes(graph):
+    iso, = isochrones(graph, [(graph.nodes[5]['y'], graph.nodes[5]['x'])], [1000], polygons=True)
+    assert 5 in iso and iso.distance(5) == 0
+    hull = [(lon, lat) for lat, lon in iso.polygon]
+    assert convex_hull(hull) == hull
+    for v in iso.nodes:
+        x, y = graph.nodes[v]['x'], graph.nodes[v]['y']
+        for (ax, ay), (bx, by) in zip(hull, hull[1:] + hull[:1]):
+            assert (bx - ax) * (y - ay) - (by - ay) * (x - ax) >= -1e-12
+
+def test_a_star_cutoff(graph):
+    expected = nx_distances(graph, 0)
+    for dest, d in expected.items():
+        dist, _, _ = a_star(graph, 0, dest, cutoff=d + 1e-6)
+        assert dist[dest] == pytest.approx(d)
+        if d > 0:
+            dist, _, _ = a_star(graph, 0, dest, cutoff=d / 2)
+            assert dest not in dist
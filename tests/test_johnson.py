@@ -0,0 +1,44 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from conftest import path_length, random_graph
+from algorithms import johnson
+from csr import as_csr
+from matrix import johnson_matrix, matrix_path
+
+"""Johnson mit mehreren Prozessen: die Zeilen aus dem Prozesspool müssen mit networkx und dem Lauf im aktuellen Prozess übereinstimmen."""
+
+def test_parallel_rows_match_networkx(graphs, tmp_path):
+    C = as_csr(graphs)
+    ids = C.ids()
+    steps = []
+    dist, succ, count = johnson_matrix(C, workers=2, block=8, memmap_dir=str(tmp_path), progress=lambda k, n: steps.append(k))
+    assert isinstance(dist, np.memmap) and steps[-1] == len(C) and count > 0
+    expected = dict(nx.all_pairs_dijkstra_path_length(graphs, weight='length'))
+    for i, u in enumerate(ids):
+        for j, v in enumerate(ids):
+            if v in expected[u]:
+                assert dist[i, j] == pytest.approx(expected[u][v])
+                path = [ids[k] for k in matrix_path(succ, i, j)]
+                assert path[0] == u and path[-1] == v
+                assert path_length(graphs, path) == pytest.approx(expected[u][v])
+            else:
+                assert dist[i, j] == np.inf and matrix_path(succ, i, j) == []
+
+    serial, serial_succ, serial_count = johnson_matrix(C, workers=1)
+    np.testing.assert_allclose(dist, serial)
+    assert count == serial_count
+
+def test_parallel_with_negative_edges():
+    G = random_graph(n=80, seed=4, oneway=1.0) # mehr Knoten als ein Block, damit der Prozesspool läuft
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        if i % 5 == 0:
+            data['length'] = -data['length'] / 4
+    if nx.negative_edge_cycle(G, weight='length'):
+        pytest.skip("Zufallsgraph enthält einen negativen Kreis")
+    dist, succ, _ = johnson(G, workers=2)
+    for u, row in nx.all_pairs_bellman_ford_path_length(G, weight='length'):
+        for v, d in row.items():
+            assert dist[u][v] == pytest.approx(d)
+            assert path_length(G, succ.path(u, v)) == pytest.approx(d)
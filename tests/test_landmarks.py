@@ -0,0 +1,36 @@
+import networkx as nx
+import pytest
+
+from conftest import nx_distances
+from algorithms import a_star
+from csr import as_csr
+from landmarks import compare_heuristics, select_landmarks
+
+@pytest.mark.parametrize('strategy', ['farthest', 'avoid'])
+def test_bounds_are_admissible(graphs, strategy):
+    C = as_csr(graphs)
+    L = select_landmarks(graphs, k=4, strategy=strategy, seed=1)
+    assert len(L) == 4
+    for t in (0, 13, len(graphs) - 1):
+        to_t = nx.single_source_dijkstra_path_length(graphs.reverse(copy=False), t, weight='length')
+        bound = L.bound_to(C.to_index(t))
+        for v, d in to_t.items():
+            assert bound[C.to_index(v)] <= d + 1e-6
+        from_t = nx_distances(graphs, t)
+        bound = L.bound_from(C.to_index(t))
+        for v, d in from_t.items():
+            assert bound[C.to_index(v)] <= d + 1e-6
+
+def test_alt_search_matches_networkx(graphs):
+    L = select_landmarks(graphs, k=6, seed=0)
+    expected = nx_distances(graphs, 2)
+    for t in (9, 30, 44):
+        dist, _, _ = a_star(graphs, 2, t, landmarks=L)
+        if t in expected:
+            assert dist[t] == pytest.approx(expected[t])
+        else:
+            assert t not in dist
+
+def test_compare_heuristics_reports_both_variants(graph):
+    rows = compare_heuristics(graph, [(0, 40), (7, 22)])
+    assert len(rows) == 2
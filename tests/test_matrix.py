@@ -0,0 +1,70 @@
+import math
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from conftest import path_length, random_graph
+from algorithms import floyd_warshall, johnson
+from evaluation import prepare_matrix_for_printing
+
+MATRIX = [floyd_warshall, lambda G: johnson(G, workers=1)]
+
+@pytest.mark.parametrize('engine', MATRIX)
+def test_all_pairs_match_networkx(graphs, engine):
+    dist, succ, _ = engine(graphs)
+    expected = dict(nx.all_pairs_dijkstra_path_length(graphs, weight='length'))
+    for u in graphs:
+        for v in graphs:
+            if v in expected[u]:
+                assert dist[u][v] == pytest.approx(expected[u][v])
+                path = succ.path(u, v)
+                assert path[0] == u and path[-1] == v
+                assert path_length(graphs, path) == pytest.approx(expected[u][v])
+            else:
+                assert succ.path(u, v) is None
+
+def test_johnson_with_negative_edges():
+    G = random_graph(n=30, seed=3, oneway=1.0) # nur Einbahnstraßen, sonst entstünden negative Kreise
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        if i % 5 == 0:
+            data['length'] = -data['length'] / 4
+    if nx.negative_edge_cycle(G, weight='length'):
+        pytest.skip("Zufallsgraph enthält einen negativen Kreis")
+    dist, succ, _ = johnson(G, workers=1)
+    for u, row in nx.all_pairs_bellman_ford_path_length(G, weight='length'):
+        for v, d in row.items():
+            assert dist[u][v] == pytest.approx(d)
+
+@pytest.mark.parametrize('engine', MATRIX)
+def test_blocked_edges_have_no_successor(engine):
+    """Eine gesperrte Kante (Gewicht ∞) darf weder im Abstand noch in der Nachfolger-Matrix auftauchen."""
+    G = nx.MultiDiGraph()
+    for v in range(3):
+        G.add_node(v, x=7.69 + v * 0.001, y=51.37)
+    G.add_edge(0, 1, length=math.inf)
+    G.add_edge(1, 2, length=100.0)
+    dist, succ, _ = engine(G)
+    assert succ.path(0, 1) is None and succ.path(0, 2) is None
+    assert succ[0][1] == 'x'
+    assert succ.path(1, 2) == [1, 2] and dist[1][2] == 100.0
+
+def test_floyd_warshall_float32_and_memmap(tmp_path, graph):
+    reference, _, _ = floyd_warshall(graph)
+    steps = []
+    dist, succ, _ = floyd_warshall(graph, progress=lambda k, n: steps.append(k), dtype=np.float32,
+                                   memmap_dir=str(tmp_path))
+    assert steps == list(range(1, len(graph) + 1))
+    assert isinstance(dist.array, np.memmap) and dist.array.dtype == np.float32
+    np.testing.assert_allclose(dist.array, reference.array, rtol=1e-6)
+    assert (tmp_path / 'succ.dat').exists()
+
+def test_printed_matrix_has_fixed_columns():
+    G = nx.MultiDiGraph()
+    G.add_edge(1, 2, length=5)
+    G.add_edge(2, 3, length=12.5)
+    dist, _, _ = floyd_warshall(G)
+    lines = prepare_matrix_for_printing(dist).splitlines()
+    assert lines[1] == '= 1     0     5  17.5'
+    assert lines[3] == '= 3     ∞     ∞     0'
+    assert len({len(line) for line in lines}) == 1
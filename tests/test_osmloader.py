@@ -0,0 +1,99 @@
+import gzip
+import random
+from xml.sax.saxutils import quoteattr
+
+import networkx as nx
+import pytest
+
+from algorithms import dijkstra
+from csr import load_csr
+from osmloader import graph_from_osm_file
+from utility import haversine_vec
+
+"""Der Loader wird mit einem zufälligen OSM-Auszug geprüft: die Abstände zwischen den Knoten des vereinfachten CSR-Graphen
+müssen mit networkx auf dem unvereinfachten Graphen (eine Kante je Teilstück eines Weges) übereinstimmen.
+"""
+
+DRIVE = ('residential', 'primary', 'unclassified')
+
+def random_extract(path, seed: int, size: int=8):
+    """Schreibt ein Gitter aus size x size Knoten und zufällige Wege darauf (teils Fußwege, private Wege, Einbahnstraßen)
+    nach path und gibt den erwarteten Straßengraphen für network_type='drive' als networkx-DiGraph zurück.
+    """
+    rng = random.Random(seed)
+    coords = {1000 + r * size + c: (51.37 + r * 0.002 + rng.uniform(0, 0.0005), 7.69 + c * 0.003 + rng.uniform(0, 0.0005))
+              for r in range(size) for c in range(size)}
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<osm version="0.6">']
+    for node, (lat, lon) in coords.items():
+        lines.append(f'<node id="{node}" lat="{lat}" lon="{lon}"><tag k="name" v="n{node}"/></node>')
+
+    G = nx.DiGraph()
+    for way in range(40):
+        r, c = rng.randrange(size), rng.randrange(size)
+        refs = [1000 + r * size + c]
+        for _ in range(rng.randint(1, 6)):
+            steps = [(r + dr, c + dc) for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                     if 0 <= r + dr < size and 0 <= c + dc < size and 1000 + (r + dr) * size + c + dc not in refs]
+            if not steps:
+                break
+            r, c = rng.choice(steps)
+            refs.append(1000 + r * size + c)
+        tags = {'highway': rng.choice(DRIVE + ('footway', 'service'))}
+        if rng.random() < 0.1:
+            tags['access'] = 'private'
+        if rng.random() < 0.3:
+            tags['oneway'] = rng.choice(['yes', '-1'])
+        lines.append(f'<way id="{way}">' + ''.join(f'<nd ref="{n}"/>' for n in refs)
+                     + ''.join(f'<tag k={quoteattr(k)} v={quoteattr(v)}/>' for k, v in tags.items()) + '</way>')
+
+        if tags['highway'] not in DRIVE or tags.get('access') == 'private' or len(refs) < 2:
+            continue
+        for a, b in zip(refs, refs[1:]):
+            (lat1, lon1), (lat2, lon2) = coords[a], coords[b]
+            length = float(haversine_vec(lon1, lat1, lon2, lat2)) * 1000
+            pairs = {'yes': [(a, b)], '-1': [(b, a)]}.get(tags.get('oneway'), [(a, b), (b, a)])
+            for u, v in pairs:
+                if not G.has_edge(u, v) or G[u][v]['length'] > length:
+                    G.add_edge(u, v, length=length)
+    lines.append('<relation id="1"><member type="way" ref="0" role=""/><tag k="type" v="route"/></relation>')
+    lines.append('</osm>')
+
+    text = '\n'.join(lines).encode('utf-8')
+    if path.endswith('.gz'):
+        with gzip.open(path, 'wb') as f:
+            f.write(text)
+    else:
+        with open(path, 'wb') as f:
+            f.write(text)
+    return G
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('suffix', ['.osm', '.osm.gz'])
+def test_distances_match_unsimplified_graph(tmp_path, seed, suffix):
+    path = str(tmp_path / ('extract' + suffix))
+    G = random_extract(path, seed)
+    C = graph_from_osm_file(path, retain_all=True, directory=str(tmp_path / 'csr'))
+    ids = C.ids()
+    assert set(ids) <= set(G.nodes)
+    # nur Wegenden und Kreuzungen bleiben als Knoten übrig
+    assert len(ids) < G.number_of_nodes()
+    for source in ids[:10]:
+        expected = nx.single_source_dijkstra_path_length(G, source, weight='length')
+        dist, _, _ = dijkstra(C, source)
+        assert set(dist) == {v for v in expected if v in C.index}
+        for v, d in dist.items():
+            assert d == pytest.approx(expected[v])
+    assert load_csr(str(tmp_path / 'csr')).edge_count == C.edge_count
+
+def test_largest_component_and_bbox(tmp_path):
+    path = str(tmp_path / 'extract.osm')
+    G = random_extract(path, 3)
+    C = graph_from_osm_file(path)
+    full = set(graph_from_osm_file(path, retain_all=True).ids())
+    largest = max(nx.weakly_connected_components(G), key=len)
+    assert set(C.ids()) == full & largest
+
+    north, south, east, west = 51.38, 51.37, 7.70, 7.69
+    D = graph_from_osm_file(path, bbox=(north, south, east, west), retain_all=True)
+    assert all(south <= y <= north and west <= x <= east for x, y in zip(D.x, D.y))
+    assert set(D.ids()) <= full
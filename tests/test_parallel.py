@@ -0,0 +1,18 @@
+import pytest
+
+from conftest import nx_distances
+from parallel import run_jobs
+
+def test_jobs_match_networkx_in_order(graph):
+    coords = {v: (graph.nodes[v]['y'], graph.nodes[v]['x'], f"n{v}") for v in (0, 12, 35, 50)}
+    pairs = [(0, 12), (35, 50), (12, 0), (50, 35)]
+    names = ['dijkstra', 'a-star', 'bidirectional-a-star', 'bellman-ford']
+    jobs = [(name, coords[u], coords[v]) for name, (u, v) in zip(names, pairs)]
+    jobs.append(('unbekannt', coords[0], coords[12]))
+    results = run_jobs(graph, jobs, workers=2)
+    assert [r['job'] for r in results] == list(range(len(jobs)))
+    for result, (u, v) in zip(results, pairs):
+        assert result['error'] is None
+        assert (result['orig'], result['orig_node'], result['dest_node']) == (f"n{u}", u, v)
+        assert result['length'] == pytest.approx(nx_distances(graph, u)[v])
+    assert 'Unbekannter Algorithmus' in results[-1]['error']
@@ -0,0 +1,99 @@
+import contextlib
+import io
+import random
+
+import networkx as nx
+import pytest
+
+from conftest import path_length, random_graph
+from csr import as_csr
+from evaluation import plan_route_from_graph
+from reduction import contract_chains, largest_component, reduced_for, strongly_connected_components
+
+def chain_graph(seed: int=0):
+    """random_graph, dessen Kanten in 1-4 Teilstücke zerlegt sind (lange Grad-2-Ketten, teils Einbahnstraßen)."""
+    rng = random.Random(seed)
+    B = random_graph(n=40, seed=seed)
+    G = nx.MultiDiGraph()
+    G.add_nodes_from(B.nodes(data=True))
+    nxt = len(B)
+    done = {}
+    for u, v, length in B.edges(data='length'):
+        key = (min(u, v), max(u, v))
+        if key not in done:
+            k = rng.randint(1, 4)
+            inner = []
+            for i in range(1, k):
+                t = i / k
+                G.add_node(nxt, x=B.nodes[u]['x'] + t * (B.nodes[v]['x'] - B.nodes[u]['x']),
+                           y=B.nodes[u]['y'] + t * (B.nodes[v]['y'] - B.nodes[u]['y']))
+                inner.append(nxt)
+                nxt += 1
+            done[key] = (u, inner, length / k)
+        first, inner, part = done[key]
+        chain = [first] + inner + [v if first == u else u]
+        if first != u:
+            chain = chain[::-1]
+        for a, b in zip(chain, chain[1:]):
+            G.add_edge(a, b, length=part)
+    return G
+
+def plan(G, orig, dest, reduced):
+    coords = lambda v: (G.nodes[v]['y'], G.nodes[v]['x'], str(v))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return plan_route_from_graph('bidirectional-a-star', G, coords(orig), coords(dest), reduced=reduced)
+
+def test_components_match_networkx():
+    G = random_graph(seed=3, oneway=0.6)
+    C = as_csr(G)
+    labels = strongly_connected_components(C)
+    ids = C.ids()
+    for component in nx.strongly_connected_components(G):
+        assert len({labels[C.to_index(v)] for v in component}) == 1
+    assert largest_component(C).sum() == max(len(c) for c in nx.strongly_connected_components(G))
+
+def test_contraction_keeps_distances():
+    G = chain_graph()
+    R, chains = contract_chains(G)
+    assert len(R) < len(G)
+    full = dict(nx.all_pairs_dijkstra_path_length(G, weight='length'))
+    kept = R.ids()
+    for u in kept[:10]:
+        reference = {v: d for v, d in full[u].items() if v in set(kept)}
+        H = nx.DiGraph()
+        for s, t, w in zip(*R.edges()):
+            H.add_edge(kept[s], kept[t], length=w)
+        assert nx.single_source_dijkstra_path_length(H, u, weight='length') == pytest.approx(reference)
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_reduced_route_matches_full_search(seed):
+    G = chain_graph(seed)
+    R = reduced_for(G)
+    rng = random.Random(seed)
+    nodes = [v for v in G if R.in_component(v)]
+    for _ in range(40):
+        orig, dest = rng.choice(nodes), rng.choice(nodes)
+        full, reduced = plan(G, orig, dest, False), plan(G, orig, dest, True)
+        assert reduced.length == pytest.approx(full.length)
+        assert reduced.nodes[0] == orig and reduced.nodes[-1] == dest
+        assert path_length(G, reduced.nodes) == pytest.approx(reduced.length)
+
+def test_reduced_route_to_same_node():
+    G = chain_graph()
+    R = reduced_for(G)
+    inner = next(v for v in G if R.in_component(v) and v not in R.graph.index)
+    for node in (inner, next(iter(R.graph.ids()))):
+        route = plan(G, node, node, True)
+        assert route.nodes == [node]
+        assert route.length == 0.0
+
+def test_reduced_route_on_same_chain():
+    G = chain_graph()
+    R = reduced_for(G)
+    # eine Kette mit mindestens zwei inneren Knoten, in beiden Richtungen
+    (a, b), inner = next(item for item in R.chains.items() if len(item[1]) >= 2)
+    for orig, dest in ((inner[0], inner[-1]), (inner[-1], inner[0])):
+        full, reduced = plan(G, orig, dest, False), plan(G, orig, dest, True)
+        assert reduced.length == pytest.approx(full.length)
+        assert reduced.nodes[0] == orig and reduced.nodes[-1] == dest
+        assert path_length(G, reduced.nodes) == pytest.approx(reduced.length)
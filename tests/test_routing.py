@@ -0,0 +1,24 @@
+import pytest
+
+from conftest import nx_distances, path_length
+from instrumentation import SearchStats
+from routing import ALGORITHMS, find_route
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_find_route_matches_networkx(graph, name):
+    expected = nx_distances(graph, 4)
+    for dest in (9, 33, 58):
+        if dest not in expected:
+            continue
+        dist, pred, count, route = find_route(name, graph, 4, dest)
+        assert route[0] == 4 and route[-1] == dest
+        assert path_length(graph, route) == pytest.approx(expected[dest])
+
+def test_repeated_dijkstra_reports_its_own_search(graph):
+    """Ein wiederholter Start misst wieder die ganze Suche statt einen zwischengespeicherten Baum mit 0 zu zählen."""
+    first, second = SearchStats(), SearchStats()
+    _, _, count, _ = find_route('dijkstra', graph, 0, 30, first)
+    _, _, again, _ = find_route('dijkstra', graph, 0, 30, second)
+    assert count == again > 0
+    assert first.relaxations == second.relaxations > 0
+    assert first.labelled == second.labelled == len(nx_distances(graph, 0))
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from conftest import nx_distances, path_length, random_graph
+from csr import as_csr
+from service import RoutingService, solve
+
+def test_solve_batch_matches_networkx(graph):
+    C = as_csr(graph)
+    dests = [5, 17, 42, 0]
+    expected = nx_distances(graph, 0)
+    for answer, dest in zip(solve(C, 'bidirectional-a-star', 0, dests), dests):
+        assert answer['algorithm'] == 'dijkstra'
+        assert answer['length'] == pytest.approx(expected[dest])
+        assert answer['nodes'][0] == 0 and answer['nodes'][-1] == dest
+        assert path_length(graph, answer['nodes']) == pytest.approx(expected[dest])
+
+def test_solve_stops_after_last_target(graph):
+    """Die One-to-many-Suche schließt nur so viele Knoten ab, wie für das entfernteste Ziel nötig."""
+    C = as_csr(graph)
+    expected = nx_distances(graph, 0)
+    nearest = sorted(expected, key=expected.get)[1:4]
+    answers = solve(C, 'dijkstra', 0, nearest)
+    assert answers[0]['settled'] < len(expected)
+
+@pytest.mark.parametrize('algorithm', ['a-star', 'bidirectional-dijkstra', 'contraction-hierarchies'])
+def test_solve_single_destination(graph, algorithm):
+    C = as_csr(graph)
+    expected = nx_distances(graph, 3)
+    for dest in (10, 30, 59):
+        [answer] = solve(C, algorithm, 3, [dest])
+        assert answer['length'] == pytest.approx(expected.get(dest, float('inf')))
+
+def test_default_service_builds_no_hierarchy():
+    G = random_graph(seed=4)
+    with RoutingService({'demo': G}) as service:
+        C = service.graphs['demo']
+        assert 'ch' not in C.artefacts and 'landmarks' not in C.artefacts
+        assert 'contraction-hierarchies' not in service.algorithms
+
+def test_hierarchy_is_saved_and_loaded(tmp_path):
+    G = random_graph(seed=5)
+    path = str(tmp_path / 'demo-ch.npz')
+    algorithms = ('contraction-hierarchies',)
+    with RoutingService({'demo': G}, algorithms=algorithms, hierarchies={'demo': path}) as service:
+        built = service.graphs['demo'].artefacts['ch']
+    with RoutingService({'demo': random_graph(seed=5)}, algorithms=algorithms, hierarchies={'demo': path}) as service:
+        loaded = service.graphs['demo'].artefacts['ch']
+    assert (loaded.rank == built.rank).all()
+    with pytest.raises(ValueError):
+        RoutingService({'demo': random_graph(n=50, seed=6)}, algorithms=algorithms, hierarchies={'demo': path})
+
+def test_route_between_coordinates(graph):
+    coords = {v: (graph.nodes[v]['y'], graph.nodes[v]['x']) for v in (0, 25)}
+    expected = nx_distances(graph, 0).get(25)
+
+    async def ask(service):
+        return await asyncio.gather(*(service.route(coords[0], coords[25], algorithm=name)
+                                      for name in ('bidirectional-a-star', 'dijkstra')))
+
+    with RoutingService({'demo': graph}, workers=2) as service:
+        for result in asyncio.run(ask(service)):
+            assert result['orig_node'] == 0 and result['dest_node'] == 25
+            assert result['length'] == pytest.approx(expected)
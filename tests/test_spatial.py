@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import random_graph
+from spatial import SpatialIndex, spatial_index_for
+
+def brute_force_node(index, lat, lon):
+    x, y = index.project(lat, lon)
+    d = np.hypot(np.array(index.px) - x, np.array(index.py) - y)
+    return index.graph.to_id(int(np.argmin(d))), float(d.min())
+
+def brute_force_edge(index, lat, lon):
+    x, y = index.project(lat, lon)
+    best = float('inf')
+    sources, targets, _ = index.graph.edges()
+    for u, v in zip(sources.tolist(), targets.tolist()):
+        ax, ay, bx, by = index.px[u], index.py[u], index.px[v], index.py[v]
+        length = (bx - ax)**2 + (by - ay)**2
+        t = 0.0 if length == 0 else min(max(((x - ax) * (bx - ax) + (y - ay) * (by - ay)) / length, 0.0), 1.0)
+        best = min(best, float(np.hypot(ax + t * (bx - ax) - x, ay + t * (by - ay) - y)))
+    return best
+
+def queries(seed, count=40):
+    rng = random.Random(seed)
+    points = [(51.37 + rng.uniform(-0.01, 0.04), 7.69 + rng.uniform(-0.01, 0.055)) for _ in range(count)]
+    return points + [(51.9, 8.4), (7.69, 51.37)] # weit außerhalb bzw. Breite und Länge vertauscht
+
+@pytest.mark.parametrize('cell_size', [None, 50.0, 5000.0])
+def test_nearest_nodes_match_brute_force(graphs, cell_size):
+    index = SpatialIndex(graphs, cell_size=cell_size)
+    points = queries(1)
+    found = index.nearest_nodes(points, return_dist=True)
+    for (lat, lon), (node, dist) in zip(points, found):
+        expected, expected_dist = brute_force_node(index, lat, lon)
+        assert dist == pytest.approx(expected_dist)
+        assert node == expected
+    assert index.nearest_node(points[0]) == found[0][0]
+
+def test_nearest_edge_matches_brute_force(graph):
+    index = spatial_index_for(graph)
+    for lat, lon in queries(2, count=15):
+        u, v, t, dist = index.nearest_edge((lat, lon))
+        assert graph.has_edge(u, v) and 0 <= t <= 1
+        assert dist == pytest.approx(brute_force_edge(index, lat, lon))
+
+def test_index_is_cached_per_graph():
+    G = random_graph(seed=3)
+    assert spatial_index_for(G) is spatial_index_for(G)
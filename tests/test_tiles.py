@@ -0,0 +1,64 @@
+import networkx as nx
+import pytest
+
+from conftest import random_graph
+from csr import as_csr
+from tiles import TileStore
+
+class FakeDownload:
+    """Liefert wie osmnx (truncate_by_edge) die Knoten einer BBox samt aller ausgehenden Kanten und deren Zielknoten."""
+
+    def __init__(self, G):
+        self.G = G
+        self.calls = 0
+
+    def __call__(self, north, south, east, west, network_type):
+        self.calls += 1
+        inside = [v for v, data in self.G.nodes(data=True) if south <= data['y'] <= north and west <= data['x'] <= east]
+        edges = [(u, v, k) for u in inside for _, v, k in self.G.out_edges(u, keys=True)]
+        return self.G.edge_subgraph(edges).copy() if edges else self.G.subgraph(inside).copy()
+
+def distances(C, source):
+    G = nx.DiGraph()
+    ids = C.ids()
+    sources, targets, weights = C.edges()
+    G.add_weighted_edges_from((ids[u], ids[v], w) for u, v, w in zip(sources.tolist(), targets.tolist(), weights.tolist()))
+    return nx.single_source_dijkstra_path_length(G, source)
+
+@pytest.fixture
+def region():
+    return random_graph(n=150, seed=2)
+
+def test_assembled_region_matches_full_graph(tmp_path, region):
+    download = FakeDownload(region)
+    store = TileStore(str(tmp_path), tile_size=0.01, download=download)
+    keys = store.tiles_for_bbox(51.41, 51.36, 7.74, 7.68)
+    C = store.assemble(keys)
+    assert sorted(C.ids()) == sorted(region.nodes)
+    assert C.edge_count == as_csr(region).edge_count
+    for source in (0, 70, 149):
+        expected = nx.single_source_dijkstra_path_length(region, source, weight='length')
+        assert distances(C, source) == pytest.approx(expected)
+    assert store.assemble(keys) is C
+
+    # ein zweiter Speicher im selben Verzeichnis blendet die Kacheln nur noch ein
+    calls = download.calls
+    again = TileStore(str(tmp_path), tile_size=0.01, download=download).assemble(keys)
+    assert download.calls == calls and again.edge_count == C.edge_count
+
+def test_corridor_graph_never_shortens_routes(tmp_path, region):
+    store = TileStore(str(tmp_path), tile_size=0.01, download=FakeDownload(region))
+    a, b = region.nodes[3], region.nodes[120]
+    C = store.graph_for((a['y'], a['x']), (b['y'], b['x']), margin=0.005)
+    assert 3 in C.index and 120 in C.index
+    expected = nx.single_source_dijkstra_path_length(region, 3, weight='length')
+    for v, d in distances(C, 3).items():
+        assert d >= expected[v] - 1e-6
+
+def test_corridor_covers_the_straight_line():
+    store = TileStore('unused', tile_size=0.1)
+    keys = store.tiles_for_corridor((51.05, 7.25), (51.65, 8.55), margin=0.0)
+    for t in range(11):
+        lat, lon = 51.05 + t * 0.06, 7.25 + t * 0.13
+        assert store.tile_of(lat, lon) in keys
+    assert len(keys) < len(store.tiles_for_bbox(51.65, 51.05, 8.55, 7.25))
@@ -0,0 +1,73 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from csr import as_csr
+from utility import PriorityQueue, haversine, haversine_vec, heuristic_vector
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_random_operations_match_reference(lazy):
+    rng = random.Random(7)
+    pq = PriorityQueue(lazy=lazy)
+    reference = {}
+    for _ in range(2000):
+        op = rng.random()
+        if op < 0.5 or not reference:
+            item, priority = rng.randrange(300), rng.uniform(0, 100)
+            pq.push(item, priority)
+            reference[item] = priority
+        elif op < 0.8:
+            item = rng.choice(list(reference))
+            reference[item] = rng.uniform(0, 100)
+            pq.update(item, reference[item])
+        else:
+            item = pq.pop()
+            assert reference[item] == min(reference.values())
+            del reference[item]
+        assert len(pq) == len(reference)
+        if reference:
+            assert pq.priority(pq.peek()) == min(reference.values())
+    popped = [reference[pq.pop()] for _ in range(len(reference))]
+    assert popped == sorted(popped)
+
+def test_decrease_key_and_counters():
+    pq = PriorityQueue()
+    for item, priority in (('a', 5), ('b', 3), ('c', 4)):
+        pq.push(item, priority)
+    pq.update('a', 1)
+    pq.push('c', 0) # bereits enthalten: wird zu update
+    assert pq.is_in('a') and 'c' in pq
+    assert [pq.pop() for _ in range(3)] == ['c', 'a', 'b']
+    assert (pq.pushes, pq.updates, pq.pops, pq.max_size) == (3, 2, 3, 3)
+
+@pytest.mark.parametrize('mode', ['haversine', 'equirect'])
+def test_heuristic_vector_is_admissible(graphs, mode):
+    C = as_csr(graphs)
+    for t in (0, 21, len(graphs) - 1):
+        d = C.to_index(t)
+        h = heuristic_vector(C, d, mode)
+        xt, yt = graphs.nodes[t]['x'], graphs.nodes[t]['y']
+        for v in graphs:
+            exact = haversine(graphs.nodes[v]['x'], graphs.nodes[v]['y'], xt, yt) * 1000
+            if mode == 'haversine':
+                assert h[C.to_index(v)] == pytest.approx(exact, abs=1e-6)
+            else:
+                assert h[C.to_index(v)] <= exact + 1e-6
+        to_t = nx.single_source_dijkstra_path_length(graphs.reverse(copy=False), t, weight='length')
+        for v, dist in to_t.items():
+            assert h[C.to_index(v)] <= dist + 1e-6
+
+def test_haversine_vec_matches_scalar():
+    rng = random.Random(3)
+    points = [(7.6 + rng.random() * 0.2, 51.3 + rng.random() * 0.1) for _ in range(20)]
+    lon, lat = np.array(points).T
+    expected = [haversine(x, y, 7.7, 51.35) for x, y in points]
+    np.testing.assert_allclose(haversine_vec(lon, lat, 7.7, 51.35), expected, rtol=1e-12)
+
+def test_nodes_without_coordinates_get_zero_bound():
+    G = nx.MultiDiGraph()
+    G.add_edge(1, 2, length=3)
+    G.add_node(3, x=7.7, y=51.3)
+    assert heuristic_vector(as_csr(G), 0).tolist() == [0.0, 0.0, 0.0]
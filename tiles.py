@@ -0,0 +1,205 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from csr import CSRGraph, as_csr, from_arrays
+
+"""Diese Datei stellt einen kachelbasierten Speicher für den Regionalgraphen bereit.
+
+Statt für jedes Start-Ziel-Paar einen eigenen BBox-Graphen zu laden (überlappende Paare wie IS → HA und ISV → HA enthalten
+dieselben Straßen mehrfach), wird die Region in feste Kacheln (Breite/Länge, Standard 0.1°) zerlegt. Jede Kachel wird
+einmal geladen und als .npy-Dateien abgelegt, die per memmap eingeblendet werden:
+    - node_ids, x, y:        die Knoten, deren Koordinaten in der Kachel liegen
+    - sources, target_ids:   alle Kanten, die in der Kachel beginnen (Quelle als lokaler Index, Ziel als OSM-ID)
+    - weights:               Kantengewichte ('length')
+Kanten über den Rand zeigen auf Knoten der Nachbarkachel. Beim Zusammensetzen werden sie mit dieser verbunden, sofern sie
+ebenfalls geladen ist ("Nähte"), sonst verworfen.
+
+Eine Anfrage lädt nur die Kacheln entlang des Korridors zwischen Start und Ziel. Geladene Kacheln und zusammengesetzte
+Graphen werden (LRU) wiederverwendet, sodass z.B. Spatial-Index und Landmarken eines Korridors erhalten bleiben.
+"""
+
+TILE_VERSION = 1
+TILE_DIR = os.environ.get('SS2020_TILE_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'ss_2020', 'tiles'))
+TILE_ARRAYS = ('node_ids', 'x', 'y', 'sources', 'target_ids', 'weights')
+
+# Südwestfalen (north, south, east, west), umfasst alle Standorte aus constantCoords
+SUEDWESTFALEN = (51.70, 51.00, 8.60, 7.20)
+
+class Tile:
+    """Eine geladene Kachel (Arrays ggf. eingeblendet)."""
+
+    def __init__(self, key, node_ids, x, y, sources, target_ids, weights):
+        self.key = key
+        self.node_ids = node_ids
+        self.x = x
+        self.y = y
+        self.sources = sources
+        self.target_ids = target_ids
+        self.weights = weights
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in TILE_ARRAYS)
+
+def _download(north, south, east, west, network_type):
+    """Lädt den Graphen einer Kachel über osmnx; Kanten über den Rand bleiben samt Zielknoten erhalten."""
+    import osmnx as ox
+    return ox.graph_from_bbox(north, south, east, west, network_type=network_type, retain_all=True, truncate_by_edge=True)
+
+class TileStore:
+    """Kachelspeicher für einen network_type. download(north, south, east, west, network_type) liefert den
+    networkx-Graphen einer Kachel (Standard: osmnx); max_tiles begrenzt die Zahl der gleichzeitig geladenen Kacheln.
+    """
+
+    def __init__(self, directory: str=TILE_DIR, tile_size: float=0.1, network_type: str='drive', max_tiles: int=64,
+                 max_graphs: int=8, download=_download):
+        self.directory = os.path.join(directory, f"{network_type}-{tile_size:g}")
+        self.tile_size = tile_size
+        self.network_type = network_type
+        self.max_tiles = max_tiles
+        self.max_graphs = max_graphs
+        self.download = download
+        self._tiles = OrderedDict()
+        self._graphs = OrderedDict()
+
+    def tile_of(self, lat: float, lon: float):
+        """Schlüssel (Zeile, Spalte) der Kachel, die (lat, lon) enthält."""
+        return math.floor(lat / self.tile_size), math.floor(lon / self.tile_size)
+
+    def bounds(self, key):
+        """(north, south, east, west) einer Kachel."""
+        row, col = key
+        return (row + 1) * self.tile_size, row * self.tile_size, (col + 1) * self.tile_size, col * self.tile_size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key[0]}_{key[1]}")
+
+    def tiles_for_bbox(self, north, south, east, west):
+        """Alle Kacheln, die die BBox schneiden."""
+        r0, c0 = self.tile_of(south, west)
+        r1, c1 = self.tile_of(north, east)
+        return [(r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+
+    def tiles_for_corridor(self, orig_coords: tuple, dest_coords: tuple, margin: float=0.05):
+        """Kacheln, die höchstens margin Grad vom Luftlinien-Korridor zwischen orig_coords und dest_coords entfernt sind."""
+        (lat0, lon0), (lat1, lon1) = orig_coords[:2], dest_coords[:2]
+        scale = math.cos(math.radians((lat0 + lat1) / 2)) # Länge auf Breitengrade umrechnen
+        keys = self.tiles_for_bbox(max(lat0, lat1) + margin, min(lat0, lat1) - margin,
+                                   max(lon0, lon1) + margin / scale, min(lon0, lon1) - margin / scale)
+        ax, ay, bx, by = lon0 * scale, lat0, lon1 * scale, lat1
+        dx, dy = bx - ax, by - ay
+        length = dx*dx + dy*dy
+        half_diagonal = self.tile_size * math.hypot(scale, 1) / 2
+        result = []
+        for key in keys:
+            north, south, east, west = self.bounds(key)
+            px, py = (east + west) / 2 * scale, (north + south) / 2
+            t = 0.0 if length == 0 else min(max(((px - ax)*dx + (py - ay)*dy) / length, 0.0), 1.0)
+            if math.hypot(ax + t*dx - px, ay + t*dy - py) <= margin + half_diagonal:
+                result.append(key)
+        return result
+
+    def build_tile(self, key):
+        """Lädt eine Kachel herunter und legt sie ab (überschreibt eine vorhandene)."""
+        north, south, east, west = self.bounds(key)
+        # etwas Rand, damit Knoten direkt auf der Kachelgrenze trotz Rundung in genau einer Kachel landen
+        eps = self.tile_size * 1e-6
+        C = as_csr(self.download(north + eps, south - eps, east + eps, west - eps, self.network_type))
+        row = np.floor(C.y / self.tile_size)
+        col = np.floor(C.x / self.tile_size)
+        inside = (row == key[0]) & (col == key[1])
+
+        local = np.full(len(C), -1, dtype=np.int64)
+        local[inside] = np.arange(int(inside.sum()))
+        sources, targets, weights = C.edges()
+        keep = inside[sources]
+
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=self.directory)
+        arrays = {
+            'node_ids': np.asarray(C.node_ids[inside], dtype=np.int64),
+            'x': C.x[inside], 'y': C.y[inside],
+            'sources': local[sources[keep]].astype(np.int32),
+            'target_ids': np.asarray(C.node_ids[targets[keep]], dtype=np.int64),
+            'weights': np.asarray(weights[keep], dtype=np.float64),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, name + '.npy'), array)
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump({'version': TILE_VERSION, 'created': time.time(), 'key': list(key), 'bounds': self.bounds(key),
+                       'network_type': self.network_type, 'weight': C.weight}, f)
+        # erst vollständig schreiben, dann umbenennen (siehe GraphCache.store)
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.replace(tmp, path)
+        except OSError: # ein anderer Prozess hat die Kachel gerade abgelegt
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._tiles.pop(key, None)
+        print(f"**** tile {key} created ****")
+
+    def build_region(self, north, south, east, west):
+        """Legt alle noch fehlenden Kacheln einer Region an, z.B. build_region(*SUEDWESTFALEN)."""
+        for key in self.tiles_for_bbox(north, south, east, west):
+            if not self._exists(key):
+                self.build_tile(key)
+
+    def _exists(self, key):
+        try:
+            with open(os.path.join(self._path(key), 'meta.json')) as f:
+                return json.load(f).get('version') == TILE_VERSION
+        except (OSError, ValueError):
+            return False
+
+    def tile(self, key):
+        """Gibt eine Kachel zurück: aus dem Speicher, eingeblendet von der Festplatte oder neu heruntergeladen."""
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        if not self._exists(key):
+            self.build_tile(key)
+        path = self._path(key)
+        tile = Tile(key, **{name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in TILE_ARRAYS})
+        self._tiles[key] = tile
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def assemble(self, keys):
+        """Setzt die Kacheln keys zu einem CSRGraph zusammen (wird je Kachelmenge zwischengespeichert)."""
+        keys = tuple(sorted(set(keys)))
+        if keys in self._graphs:
+            self._graphs.move_to_end(keys)
+            return self._graphs[keys]
+
+        tiles = [self.tile(key) for key in keys]
+        node_ids = np.concatenate([t.node_ids for t in tiles])
+        offsets = np.cumsum([0] + [len(t.node_ids) for t in tiles])
+        sources = np.concatenate([t.sources.astype(np.int64) + offset for t, offset in zip(tiles, offsets)])
+        target_ids = np.concatenate([t.target_ids for t in tiles])
+        weights = np.concatenate([t.weights for t in tiles])
+
+        # Ziel-IDs über eine sortierte Kopie der Knoten-IDs auf Indizes abbilden; Kanten zu nicht geladenen Kacheln entfallen
+        order = np.argsort(node_ids)
+        position = np.searchsorted(node_ids[order], target_ids)
+        position[position == len(order)] = 0
+        found = node_ids[order][position] == target_ids if len(order) else np.zeros(len(target_ids), dtype=bool)
+        targets = order[position[found]]
+        C = from_arrays(node_ids, sources[found], targets, weights[found],
+                        np.concatenate([t.x for t in tiles]), np.concatenate([t.y for t in tiles]))
+
+        self._graphs[keys] = C
+        while len(self._graphs) > self.max_graphs:
+            self._graphs.popitem(last=False)
+        return C
+
+    def graph_for(self, orig_coords: tuple, dest_coords: tuple, margin: float=0.05) -> CSRGraph:
+        """CSRGraph aus allen Kacheln entlang des Korridors zwischen orig_coords und dest_coords."""
+        return self.assemble(self.tiles_for_corridor(orig_coords, dest_coords, margin))
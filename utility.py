@@ -1,9 +1,14 @@
 from math import radians, cos, sin, asin, sqrt
 import heapq
 
+import numpy as np
+
 """Diese Datei stellt immer wieder gebrauchte Funktionen zur Verfügung, die keinem spezifischen Bereich zugehörig sind
 """
 
+EARTH_RADIUS = 6371 # km, etwas kleiner als der von osmnx verwendete Radius -> Luftlinie bleibt eine untere Schranke
+EQUIRECT_SAFETY = 0.99 # Sicherheitsfaktor, damit die Näherung für regionale Entfernungen sicher unterschätzt
+
 # https://stackoverflow.com/questions/4913349/haversine-formula-in-python-bearing-and-distance-between-two-gps-points
 def haversine(lon1, lat1, lon2, lat2):
     """
@@ -18,48 +23,196 @@ def haversine(lon1, lat1, lon2, lat2):
     dlat = lat2 - lat1 
     a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
     c = 2 * asin(sqrt(a)) 
-    r = 6371 # Radius of earth in kilometers. Use 3956 for miles
+    r = EARTH_RADIUS # Radius of earth in kilometers. Use 3956 for miles
     return c * r
 
+def haversine_vec(lon1, lat1, lon2, lat2):
+    """Vektorisierte Variante von haversine für numpy-Arrays (oder Skalare, die gegen Arrays gebroadcastet werden).
+    Ergebnis in Kilometern.
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(a) for a in (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1)/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1)/2)**2
+    return 2 * np.arcsin(np.sqrt(np.minimum(a, 1))) * EARTH_RADIUS
+
+def node_trig(C):
+    """Gibt (Breite, Länge, cos(Breite)) aller Knoten von C im Bogenmaß zurück. Wird am Graphen zwischengespeichert,
+    damit eine Anfrage keine Winkelfunktionen mehr auf den Knotenattributen berechnen muss.
+    """
+    if 'trig' not in C.artefacts:
+        lat = np.radians(C.y)
+        lon = np.radians(C.x)
+        C.artefacts['trig'] = (lat, lon, np.cos(lat))
+    return C.artefacts['trig']
+
+def heuristic_vector(C, d: int, mode: str='haversine'):
+    """Luftlinien-Entfernung in Metern von jedem Knoten zum Knoten d (Index) als numpy-Array.
+    
+    * mode='haversine': exakte Großkreisentfernung
+    * mode='equirect': günstigere equirektangulare Näherung mit dem kleineren cos(Breite) beider Punkte und einem
+      Sicherheitsfaktor, sodass sie für regionale Entfernungen weiterhin unterschätzt (zulässig bleibt)
+    """
+    lat, lon, cos_lat = node_trig(C)
+    if mode == 'haversine':
+        a = np.sin((lat - lat[d])/2)**2 + cos_lat * cos_lat[d] * np.sin((lon - lon[d])/2)**2
+        h = 2 * np.arcsin(np.sqrt(np.minimum(a, 1))) * EARTH_RADIUS * 1000
+    elif mode == 'equirect':
+        dx = (lon - lon[d]) * np.minimum(cos_lat, cos_lat[d])
+        dy = lat - lat[d]
+        h = np.sqrt(dx*dx + dy*dy) * EARTH_RADIUS * 1000 * EQUIRECT_SAFETY
+    else:
+        raise ValueError(f"Unbekannter Modus: {mode}")
+    # Knoten ohne Koordinaten (z.B. im test_beispiel) bekommen die Schranke 0
+    return np.nan_to_num(h, nan=0.0)
+
 class PriorityQueue:
-    """Implementierung einer PriorityQueue mit Hilfe von heapq.
-    heapq verwaltet einen Heap, d.h. eine Liste von numerischen Werten mit schnellem Zugriff auf das 
-    kleinste Element.
+    """Implementierung einer PriorityQueue als adressierbarer binärer Heap.
+    Neben dem Heap (Liste aus [Priorität, Einfügenummer, Element]) wird eine Positionstabelle Element -> Heap-Index geführt.
+    Dadurch sind is_in/index in O(1) und update (decrease-key bzw. increase-key) in O(log n) möglich.
+    Als Elemente eignen sich beliebige hashbare Werte, insbesondere ganzzahlige Knoten-IDs.
+
+    Mit lazy=True wird stattdessen mit verzögertem Löschen gearbeitet: update legt einen neuen Eintrag an,
+    veraltete Einträge werden beim pop übersprungen. Das ist bei sehr vielen Updates oft etwas schneller.
     
     Übernommen von Prof. Gawron. Geänderte Inhalte gekennzeichnet.
     """
 
-    def __init__(self):
+    def __init__(self, lazy: bool=False):
         self._queue = []
-        self._index = 0
+        self._index = 0 # Einfügenummer, sorgt bei gleicher Priorität für FIFO-Reihenfolge
+        self._lazy = lazy # hinzugefügt
+        self._pos = {} # hinzugefügt: Element -> Heap-Index bzw. (lazy) Element -> aktuelle Priorität
+        # hinzugefügt: Zähler für Auswertungen (siehe benchmark.py)
+        self.pushes = 0
+        self.pops = 0
+        self.updates = 0
+        self.max_size = 0 # größte Länge der Warteschlange (siehe instrumentation.SearchStats.max_frontier)
 
     def __len__(self):
-        return self._index
+        return len(self._pos)
+
+    def __contains__(self, x): # hinzugefügt
+        return x in self._pos
     
     def push(self, item, priority):
-        heapq.heappush(self._queue, (priority, self._index, item))
+        """Fügt item ein. Ist item bereits enthalten, wird stattdessen seine Priorität aktualisiert."""
+        if item in self._pos: # hinzugefügt
+            self.update(item, priority)
+            return
+        self.pushes += 1
         self._index += 1
+        if len(self._pos) >= self.max_size:
+            self.max_size = len(self._pos) + 1
+        if self._lazy:
+            self._pos[item] = priority
+            heapq.heappush(self._queue, (priority, self._index, item))
+            return
+        self._queue.append([priority, self._index, item])
+        self._pos[item] = len(self._queue) - 1
+        self._sift_up(len(self._queue) - 1)
         
     def pop(self):
         """Gibt das Element mit der kleinsten Priorität zurück."""
-        self._index -= 1
-        return heapq.heappop(self._queue)[-1]
+        self.pops += 1
+        if self._lazy:
+            while True:
+                priority, _, item = heapq.heappop(self._queue)
+                # veraltete Einträge überspringen
+                if self._pos.get(item, None) == priority:
+                    del self._pos[item]
+                    return item
+        item = self._queue[0][2]
+        self._remove(0)
+        return item
+
+    def peek(self): # hinzugefügt
+        """Gibt das Element mit der kleinsten Priorität zurück, ohne es zu entfernen."""
+        if self._lazy:
+            while self._pos.get(self._queue[0][2], None) != self._queue[0][0]:
+                heapq.heappop(self._queue)
+        return self._queue[0][2]
+
+    def priority(self, x): # hinzugefügt
+        """Gibt die aktuelle Priorität von x zurück."""
+        if self._lazy:
+            return self._pos[x]
+        return self._queue[self._pos[x]][0]
 
     def show(self): # hinzugefügt
         print(self._queue)
 
     def is_in(self, x): # hinzugefügt
-        return self.index(x) != -1
+        return x in self._pos
 
     def index(self, x): # hinzugefügt
-        for elem in self._queue:
-            if x == elem[2]:
-                self._queue.index(elem)
-        return -1
+        """Gibt die Position von x im Heap zurück bzw. -1, falls x nicht enthalten ist (bei lazy=True nicht sinnvoll)."""
+        if self._lazy or x not in self._pos:
+            return -1
+        return self._pos[x]
 
     def update(self, item, priority): # hinzugefügt
-        index = self.index(item)
-        if index != -1:
-            self._queue.pop(index)
-            heapq.heapify(self._queue)
-            self.push(item, priority)
\ No newline at end of file
+        """Setzt die Priorität eines enthaltenen Elements neu (decrease-key/increase-key) in O(log n)."""
+        if item not in self._pos:
+            return
+        self.updates += 1
+        if self._lazy:
+            self._index += 1
+            self._pos[item] = priority
+            heapq.heappush(self._queue, (priority, self._index, item))
+            return
+        i = self._pos[item]
+        old = self._queue[i][0]
+        self._queue[i][0] = priority
+        if priority < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, item): # hinzugefügt
+        """Entfernt ein enthaltenes Element."""
+        if self._lazy:
+            self._pos.pop(item, None)
+        elif item in self._pos:
+            self._remove(self._pos[item])
+
+    def _remove(self, i):
+        queue = self._queue
+        del self._pos[queue[i][2]]
+        last = queue.pop()
+        if i < len(queue):
+            queue[i] = last
+            self._pos[last[2]] = i
+            self._sift_down(i)
+            self._sift_up(i)
+
+    def _sift_up(self, i):
+        queue = self._queue
+        pos = self._pos
+        entry = queue[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if queue[parent] <= entry:
+                break
+            queue[i] = queue[parent]
+            pos[queue[i][2]] = i
+            i = parent
+        queue[i] = entry
+        pos[entry[2]] = i
+
+    def _sift_down(self, i):
+        queue = self._queue
+        pos = self._pos
+        n = len(queue)
+        entry = queue[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and queue[child + 1] < queue[child]:
+                child += 1
+            if entry <= queue[child]:
+                break
+            queue[i] = queue[child]
+            pos[queue[i][2]] = i
+            i = child
+        queue[i] = entry
+        pos[entry[2]] = i